@@ -0,0 +1,86 @@
+"""
+Inference Backend Benchmark
+
+Compares the PyTorch, ONNX and int8-quantized ONNX backends for the embedder and
+the reranker on CPU: single-query latency, batch throughput, and score drift
+relative to PyTorch.
+
+Requires the ONNX extras: pip install sentence-transformers[onnx]
+"""
+
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+import time
+import argparse
+import numpy as np
+from src.evaluation import EVAL_QUESTIONS
+from src.rag.models import BACKENDS, get_embedder, get_reranker
+
+PASSAGES = [
+    "The transformer architecture relies entirely on self-attention to draw global dependencies between input and output.",
+    "GPT-3 is an autoregressive language model with 175 billion parameters released by OpenAI in 2020.",
+    "Recurrent neural networks process tokens sequentially, which limits parallelisation during training.",
+    "BERT is pre-trained with masked language modelling and next sentence prediction objectives.",
+    "Paris is the capital and most populous city of France.",
+    "Retrieval-augmented generation combines a retriever over a document store with a text generator.",
+    "Quantization reduces model weights to lower precision integers to speed up CPU inference.",
+    "Llama 2 is a family of open-weight large language models released by Meta in 2023.",
+]
+
+def _timed(fn, repeats: int):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return np.array(timings) * 1000
+
+def _spearman(a: np.ndarray, b: np.ndarray) -> float:
+    rank_a, rank_b = np.argsort(np.argsort(a)), np.argsort(np.argsort(b))
+    return float(np.corrcoef(rank_a, rank_b)[0, 1])
+
+def benchmark(backends, repeats: int, batch_size: int):
+    queries = [q["question"] for q in EVAL_QUESTIONS]
+    batch = (PASSAGES * (batch_size // len(PASSAGES) + 1))[:batch_size]
+    pairs = [[q, p] for q in queries for p in PASSAGES]
+
+    reference = {}
+    for backend in backends:
+        embedder = get_embedder(backend=backend)
+        reranker = get_reranker(backend=backend)
+
+        # Warm up so one-time graph optimisation is not measured
+        embedder.encode(queries[0])
+        reranker.predict(pairs[:2])
+
+        embed_ms = _timed(lambda: embedder.encode(queries[0]), repeats)
+        batch_ms = _timed(lambda: embedder.encode(batch), max(repeats // 10, 3))
+        rerank_ms = _timed(lambda: reranker.predict(pairs[:len(PASSAGES)]), repeats)
+
+        embeddings = embedder.encode(queries, normalize_embeddings=True)
+        scores = np.asarray(reranker.predict(pairs))
+        if backend == backends[0]:
+            reference = {"embeddings": embeddings, "scores": scores}
+
+        cosine = np.sum(embeddings * reference["embeddings"], axis=1)
+        score_drift = np.abs(scores - reference["scores"])
+
+        print(f"\n=== Backend: {backend} ===")
+        print(f"Embed 1 query:      p50 {np.percentile(embed_ms, 50):.1f} ms, p95 {np.percentile(embed_ms, 95):.1f} ms")
+        print(f"Embed throughput:   {batch_size / (np.median(batch_ms) / 1000):.0f} texts/s (batch {batch_size})")
+        print(f"Rerank {len(PASSAGES)} pairs:     p50 {np.percentile(rerank_ms, 50):.1f} ms, p95 {np.percentile(rerank_ms, 95):.1f} ms")
+        print(f"Drift vs {backends[0]}:")
+        print(f"   - Embedding cosine: min {cosine.min():.4f}, mean {cosine.mean():.4f}")
+        print(f"   - Rerank score |diff|: max {score_drift.max():.4f}, mean {score_drift.mean():.4f}")
+        print(f"   - Rerank rank correlation: {_spearman(scores, reference['scores']):.4f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark embedder/reranker inference backends")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS,
+                        help="Backends to compare; the first one is the drift reference")
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+    benchmark(args.backends, args.repeats, args.batch_size)
@@ -0,0 +1,51 @@
+"""
+Batch Retrieval Benchmark
+
+Runs the evaluation questions through MultiSourceRetriever one at a time and then
+through retrieve_batch, and reports queries/s for both plus how many of the
+sequential top-N the batch path returns. Use --warm to only run the batch path,
+which fills the vector and rerank score caches for the given questions.
+"""
+
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+import time
+import argparse
+from src.evaluation import EVAL_QUESTIONS
+from src.rag.rerank import document_key
+from src.rag.retrieval import MultiSourceRetriever
+
+def benchmark(repeat: int, warm: bool):
+    questions = [q["question"] for q in EVAL_QUESTIONS] * repeat
+    retriever = MultiSourceRetriever()
+    retriever.rerank_mode = "full"
+
+    start = time.perf_counter()
+    batched = retriever.retrieve_batch(questions)
+    batch_s = time.perf_counter() - start
+    print(f"\nBatch:      {len(questions)} queries in {batch_s:.2f}s ({len(questions) / batch_s:.1f} q/s)")
+    if warm:
+        return
+
+    # Score every pair fresh so the loop pays the same model cost as the batch did
+    retriever.reranker.score_cache = None
+    start = time.perf_counter()
+    sequential = [retriever.retrieve(q) for q in questions]
+    loop_s = time.perf_counter() - start
+    print(f"Sequential: {len(questions)} queries in {loop_s:.2f}s ({len(questions) / loop_s:.1f} q/s)")
+    print(f"Speed-up:   {loop_s / batch_s:.1f}x")
+
+    overlaps = []
+    for seq, bat in zip(sequential, batched):
+        seq_keys = {document_key(d) for d in seq}
+        overlaps.append(len(seq_keys & {document_key(d) for d in bat}) / len(seq_keys) if seq_keys else 1.0)
+    print(f"Top-N agreement: {sum(overlaps) / len(overlaps):.2%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare sequential and batched multi-source retrieval")
+    parser.add_argument("--repeat", type=int, default=1, help="Times to repeat the question set")
+    parser.add_argument("--warm", action="store_true", help="Only run the batch path to warm the caches")
+    args = parser.parse_args()
+    benchmark(args.repeat, args.warm)
@@ -0,0 +1,34 @@
+"""
+Local Index Builder
+
+Exports Qdrant collections into memory-mapped local indexes so the pipeline can run
+with VECTOR_BACKEND=local on machines without Qdrant.
+"""
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+from src.rag.qdrant_handler import QdrantHandler
+from src.rag.local_index import LocalIndex, LOCAL_INDEX_DIR
+from src.cache.retrieval_cache import bump_collection_version
+
+def build_local_indexes(collections, out_dir: str, dtype: str, hnsw: bool):
+    qdrant = QdrantHandler()
+    for collection in collections:
+        path = os.path.join(out_dir, collection)
+        index = LocalIndex.from_qdrant(qdrant.client, collection, path, dtype=dtype, hnsw=hnsw)
+        size_mb = os.path.getsize(os.path.join(path, "vectors.npy")) / 1e6
+        print(f"✓ {collection}: {len(index)} vectors ({dtype}, {size_mb:.1f} MB, "
+              f"{'HNSW' if index.hnsw is not None else 'exact'}) -> {path}")
+        bump_collection_version(collection)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build local vector indexes from Qdrant collections")
+    parser.add_argument("--collections", nargs="+", default=["wiki_rag", "arxiv_rag"])
+    parser.add_argument("--out", default=LOCAL_INDEX_DIR)
+    parser.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    parser.add_argument("--hnsw", action="store_true", help="Also build an HNSW graph (needs hnswlib)")
+    args = parser.parse_args()
+    build_local_indexes(args.collections, args.out, args.dtype, args.hnsw)
@@ -0,0 +1,53 @@
+"""
+Rerank Cascade Evaluation
+
+Runs every evaluation question through the multi-source retriever twice, once with
+full reranking and once with the adaptive cascade. It reports how many CrossEncoder
+pairs each mode scored and how much of the full-rerank top-N the cascade kept
+(recall@N against full reranking).
+"""
+
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+from src.evaluation import EVAL_QUESTIONS
+from src.rag.rerank import document_key
+from src.rag.retrieval import MultiSourceRetriever
+
+def evaluate_cascade():
+    retriever = MultiSourceRetriever()
+    # Score every pair fresh so both modes pay the true model cost: no cached pair
+    # scores, and no cached ranked results that would skip reranking altogether
+    retriever.reranker.score_cache = None
+    retriever.result_cache = None
+
+    full_pairs, cascade_pairs, recalls = 0, 0, []
+    for q_data in EVAL_QUESTIONS:
+        question = q_data["question"]
+
+        retriever.rerank_mode = "full"
+        full = retriever.retrieve(question)
+        full_pairs += retriever.last_rerank_stats.get("pairs_scored", 0)
+
+        retriever.rerank_mode = "cascade"
+        cascade = retriever.retrieve(question)
+        stats = retriever.last_rerank_stats
+        cascade_pairs += stats.get("pairs_scored", 0)
+
+        full_keys = {document_key(d) for d in full}
+        kept = len(full_keys & {document_key(d) for d in cascade})
+        recall = kept / len(full_keys) if full_keys else 1.0
+        recalls.append(recall)
+        print(f"[{stats.get('decision')}] recall={recall:.2f} pairs={stats.get('pairs_scored', 0)} "
+              f"{question[:50]}...")
+
+    n = len(EVAL_QUESTIONS)
+    print("\n=== Cascade vs Full Rerank ===")
+    print(f"Avg pairs scored (full):    {full_pairs / n:.1f}")
+    print(f"Avg pairs scored (cascade): {cascade_pairs / n:.1f}")
+    print(f"Avg recall vs full rerank:  {sum(recalls) / n:.2%}")
+    print(f"Decisions: {retriever.rerank_totals['decisions']}")
+
+if __name__ == "__main__":
+    evaluate_cascade()
@@ -0,0 +1,58 @@
+"""
+Semantic Cache Threshold Evaluation
+
+Embeds labelled question pairs (paraphrases and look-alikes with different meaning)
+and reports, for a range of similarity thresholds, how many paraphrases the Tier 0
+cache would answer (hit rate) and how many look-alikes it would wrongly answer
+(false-hit rate), with and without the key-term guard.
+"""
+
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+import argparse
+import numpy as np
+from src.cache.semantic_cache import key_terms
+from src.rag.models import get_embedder
+
+# (new question, cached question, same meaning)
+PAIRS = [
+    ("what is BERT", "What's BERT?", True),
+    ("Explain the transformer architecture", "How does the transformer architecture work?", True),
+    ("Who created GPT-3?", "Which company developed GPT-3?", True),
+    ("What is retrieval augmented generation?", "what is RAG (retrieval-augmented generation)", True),
+    ("How does attention work in neural networks?", "Explain the attention mechanism in neural nets", True),
+    ("What is the capital of France?", "Which city is France's capital?", True),
+    ("What is GPT-4?", "What is GPT-3?", False),
+    ("Best LLMs in 2023", "Best LLMs in 2021", False),
+    ("What is BERT?", "What is RoBERTa?", False),
+    ("How do I fine-tune Llama 2?", "How do I quantize Llama 2?", False),
+    ("What is the capital of France?", "What is the capital of Spain?", False),
+    ("Explain encoder-only transformers", "Explain decoder-only transformers", False),
+]
+
+def evaluate(thresholds):
+    embedder = get_embedder()
+    left = embedder.encode([a for a, _, _ in PAIRS], normalize_embeddings=True)
+    right = embedder.encode([b for _, b, _ in PAIRS], normalize_embeddings=True)
+    similarities = np.sum(left * right, axis=1)
+    guarded = np.array([key_terms(a) == key_terms(b) for a, b, _ in PAIRS])
+    same = np.array([label for _, _, label in PAIRS])
+
+    for (a, b, label), sim in zip(PAIRS, similarities):
+        print(f"{sim:.3f} {'same' if label else 'diff'}  '{a}' ~ '{b}'")
+
+    print(f"\n{'threshold':>9} | {'hit rate':>8} | {'false hits':>10} | {'false hits (guard)':>18}")
+    for threshold in thresholds:
+        matched = similarities >= threshold
+        hit_rate = (matched & same).sum() / same.sum()
+        false_hits = (matched & ~same).sum() / (~same).sum()
+        guarded_false = (matched & guarded & ~same).sum() / (~same).sum()
+        print(f"{threshold:>9.2f} | {hit_rate:>8.0%} | {false_hits:>10.0%} | {guarded_false:>18.0%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pick a similarity threshold for the semantic answer cache")
+    parser.add_argument("--thresholds", nargs="+", type=float, default=[0.80, 0.85, 0.88, 0.90, 0.92, 0.95])
+    args = parser.parse_args()
+    evaluate(args.thresholds)
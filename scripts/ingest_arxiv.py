@@ -1,23 +1,28 @@
 import arxiv
 import sys
+import argparse
 import os
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from sentence_transformers import SentenceTransformer
-from src.rag.qdrant_handler import QdrantHandler
+from src.rag.qdrant_handler import QdrantHandler, COLLECTION_PROFILES, COLLECTION_PROFILE
+from src.rag.models import get_embedder
+from src.rag.sparse import BM25SparseEncoder
+from src.cache.retrieval_cache import bump_collection_version
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 COLLECTION_NAME = "arxiv_rag"
 MAX_PAPERS = 50
 
-def ingest_arxiv():
+def ingest_arxiv(profile: str = COLLECTION_PROFILE):
     print("Initializing Qdrant and Model...")
     qdrant = QdrantHandler()
-    qdrant.create_collection(COLLECTION_NAME, vector_size=384)
+    qdrant.create_collection(COLLECTION_NAME, vector_size=384, profile=profile)
+    qdrant.create_payload_indexes(COLLECTION_NAME)
     
-    model = SentenceTransformer('all-MiniLM-L6-v2')
+    model = get_embedder()
+    sparse_encoder = BM25SparseEncoder()
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
     
     client = arxiv.Client()
@@ -41,11 +46,12 @@ def ingest_arxiv():
                 "source": "arxiv",
                 "title": result.title,
                 "url": result.entry_id,
-                "published": str(result.published)
+                "published": result.published.isoformat()  # RFC 3339 for the datetime index
             })
             
     print(f"Embedding {len(documents)} chunks...")
     embeddings = model.encode(documents).tolist()
+    sparse_vectors = sparse_encoder.encode_documents(documents)
     
     print("Uploading to Qdrant...")
     batch_size = 100
@@ -55,10 +61,18 @@ def ingest_arxiv():
             COLLECTION_NAME,
             documents[i:end],
             metadatas[i:end],
-            embeddings[i:end]
+            embeddings[i:end],
+            sparse_vectors[i:end],
+            start_id=i
         )
         
+    # Retrieval results cached before this ingestion are stale now
+    bump_collection_version(COLLECTION_NAME)
     print("ArXiv Ingestion complete!")
 
 if __name__ == "__main__":
-    ingest_arxiv()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profile", choices=COLLECTION_PROFILES, default=COLLECTION_PROFILE,
+                        help="Collection storage profile used when the collection is created")
+    args = parser.parse_args()
+    ingest_arxiv(args.profile)
@@ -1,13 +1,16 @@
 import wikipedia
 import uuid
 import sys
+import argparse
 import os
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from sentence_transformers import SentenceTransformer
-from src.rag.qdrant_handler import QdrantHandler
+from src.rag.qdrant_handler import QdrantHandler, COLLECTION_PROFILES, COLLECTION_PROFILE
+from src.rag.models import get_embedder
+from src.rag.sparse import BM25SparseEncoder
+from src.cache.retrieval_cache import bump_collection_version
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 # Configuration
@@ -24,12 +27,14 @@ def get_wiki_content(title):
         print(f"Error fetching {title}: {e}")
         return None, []
 
-def ingest_wiki():
+def ingest_wiki(profile: str = COLLECTION_PROFILE, max_pages: int = MAX_PAGES):
     print("Initializing Qdrant and Model...")
     qdrant = QdrantHandler()
-    qdrant.create_collection(COLLECTION_NAME, vector_size=384)
+    qdrant.create_collection(COLLECTION_NAME, vector_size=384, profile=profile)
+    qdrant.create_payload_indexes(COLLECTION_NAME)
     
-    model = SentenceTransformer('all-MiniLM-L6-v2')
+    model = get_embedder()
+    sparse_encoder = BM25SparseEncoder()
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
 
     visited = set()
@@ -40,7 +45,7 @@ def ingest_wiki():
     
     print(f"Starting crawl from '{ROOT_ARTICLE}'...")
     
-    while queue and len(visited) < MAX_PAGES:
+    while queue and len(visited) < max_pages:
         title, depth = queue.pop(0)
         if title in visited:
             continue
@@ -65,6 +70,7 @@ def ingest_wiki():
     
     print(f"Embedding {len(documents)} chunks...")
     embeddings = model.encode(documents).tolist()
+    sparse_vectors = sparse_encoder.encode_documents(documents)
     
     print("Uploading to Qdrant...")
     # Upload in batches of 100
@@ -75,10 +81,19 @@ def ingest_wiki():
             COLLECTION_NAME,
             documents[i:end],
             metadatas[i:end],
-            embeddings[i:end]
+            embeddings[i:end],
+            sparse_vectors[i:end],
+            start_id=i
         )
     
+    # Retrieval results cached before this ingestion are stale now
+    bump_collection_version(COLLECTION_NAME)
     print("Ingestion complete!")
 
 if __name__ == "__main__":
-    ingest_wiki()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profile", choices=COLLECTION_PROFILES, default=COLLECTION_PROFILE,
+                        help="Collection storage profile used when the collection is created")
+    parser.add_argument("--max-pages", type=int, default=MAX_PAGES)
+    args = parser.parse_args()
+    ingest_wiki(args.profile, args.max_pages)
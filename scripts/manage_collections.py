@@ -0,0 +1,56 @@
+"""
+Qdrant Collection Admin
+
+Shows collection storage settings, creates empty collections with a storage profile,
+and moves existing collections between profiles:
+
+    python scripts/manage_collections.py info
+    python scripts/manage_collections.py create my_collection --profile int8
+    python scripts/manage_collections.py create wiki_rag --recreate   # drop and re-create (e.g. add BM25)
+    python scripts/manage_collections.py apply-profile wiki_rag on_disk
+"""
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+from src.rag.qdrant_handler import QdrantHandler, COLLECTION_PROFILES, COLLECTION_PROFILE
+
+def show_info(qdrant: QdrantHandler, collections):
+    names = collections or [c.name for c in qdrant.client.get_collections().collections]
+    for name in names:
+        print(f"\n📦 {name}")
+        for key, value in qdrant.collection_info(name).items():
+            print(f"   - {key}: {value}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage Qdrant collection storage profiles")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    info = sub.add_parser("info", help="Show storage settings")
+    info.add_argument("collections", nargs="*")
+
+    create = sub.add_parser("create", help="Create an empty collection")
+    create.add_argument("collection")
+    create.add_argument("--profile", choices=COLLECTION_PROFILES, default=COLLECTION_PROFILE)
+    create.add_argument("--vector-size", type=int, default=384)
+    create.add_argument("--recreate", action="store_true", help="Delete the collection first if it exists")
+
+    apply = sub.add_parser("apply-profile", help="Switch an existing collection to another profile")
+    apply.add_argument("collection")
+    apply.add_argument("profile", choices=COLLECTION_PROFILES)
+
+    args = parser.parse_args()
+    qdrant = QdrantHandler()
+    if args.command == "info":
+        show_info(qdrant, args.collections)
+    elif args.command == "create":
+        qdrant.create_collection(args.collection, vector_size=args.vector_size, profile=args.profile,
+                                 recreate=args.recreate)
+    elif args.command == "apply-profile":
+        qdrant.apply_profile(args.collection, args.profile)
+        show_info(qdrant, [args.collection])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Cache Key Replay
+
+Replays the questions recorded in the run logs (logs/*.json) in time order and
+counts how many would hit the exact-match answer cache under each normalisation
+setting: raw text (the old keys), the default rules, and the default rules plus
+stopword stripping. Entries older than --ttl seconds are treated as expired.
+"""
+
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+import json
+import argparse
+from pathlib import Path
+from src.cache.normalize import QueryNormalizer
+
+def load_questions(log_dir: str):
+    runs = []
+    for log_file in Path(log_dir).glob("*.json"):
+        try:
+            with open(log_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            continue
+        if data.get("question"):
+            runs.append((data.get("start_time", 0), data["question"]))
+    runs.sort()
+    return runs
+
+def replay(runs, key_fn, ttl: float):
+    seen = {}
+    hits = 0
+    for timestamp, question in runs:
+        key = key_fn(question)
+        if key in seen and timestamp - seen[key] <= ttl:
+            hits += 1
+        else:
+            seen[key] = timestamp  # a miss writes a fresh entry
+    return hits, len(seen)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure answer-cache hit rates under key normalisation rules")
+    parser.add_argument("--log-dir", default="logs")
+    parser.add_argument("--ttl", type=float, default=3600, help="Answer TTL in seconds")
+    args = parser.parse_args()
+
+    runs = load_questions(args.log_dir)
+    if not runs:
+        print(f"No logged questions found in {args.log_dir}")
+        sys.exit(0)
+
+    settings = {
+        "raw": lambda q: q,
+        "default": QueryNormalizer(strip_punctuation=True, strip_stopwords=False),
+        "default+stopwords": QueryNormalizer(strip_punctuation=True, strip_stopwords=True),
+    }
+    print(f"Replaying {len(runs)} questions (TTL {args.ttl:.0f}s)\n")
+    print(f"{'setting':>18} | {'hits':>5} | {'hit rate':>8} | {'distinct keys':>13}")
+    baseline = None
+    for name, key_fn in settings.items():
+        hits, distinct = replay(runs, key_fn, args.ttl)
+        baseline = hits if baseline is None else baseline
+        print(f"{name:>18} | {hits:>5} | {hits / len(runs):>8.1%} | {distinct:>13}  (+{hits - baseline} vs raw)")
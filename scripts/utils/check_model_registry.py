@@ -0,0 +1,32 @@
+"""
+Model Registry Check
+Builds the multi-source retriever and reports how many models were loaded,
+how long each took and how much memory each holds.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+from src.rag.models import get_model_registry, _rss_bytes
+from src.rag.retrieval import MultiSourceRetriever
+
+def main():
+    rss_start = _rss_bytes()
+    retriever = MultiSourceRetriever()
+
+    # Both retrievers must hold the very same model objects
+    shared = (retriever.wiki_retriever.model is retriever.arxiv_retriever.model and
+              retriever.wiki_retriever.reranker.model is retriever.arxiv_retriever.reranker.model)
+    print(f"\nModels shared between retrievers: {'✓' if shared else '✗'}")
+
+    print("\n=== Loaded Models ===")
+    for key, stats in get_model_registry().get_stats().items():
+        print(f"{key}")
+        print(f"   - Load time: {stats['load_time_s']:.2f}s")
+        print(f"   - Parameters: {stats['param_bytes'] / 1e6:.1f} MB")
+        print(f"   - RSS growth: {stats['rss_delta_bytes'] / 1e6:.1f} MB")
+
+    print(f"\nTotal RSS growth: {(_rss_bytes() - rss_start) / 1e6:.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ sys.path.append(os.path.abspath('.'))
 
 import redis
 from src.cache import RedisCache
+from src.cache.redis_client import REDIS_URL
 
 def check_redis_connection():
     """Check if Redis server is running and accessible."""
@@ -15,7 +16,7 @@ def check_redis_connection():
     print("REDIS STATUS CHECK")
     print("=" * 60)
     
-    redis_url = "redis://localhost:6379"
+    redis_url = REDIS_URL
     print(f"\n📍 Checking Redis at: {redis_url}")
     
     try:
@@ -93,9 +94,10 @@ def test_redis_cache():
         if stats:
             print(f"\n📈 Cache Statistics:")
             print(f"   - Total keys: {stats.get('total_keys', 0)}")
-            print(f"   - Cache hits: {stats.get('hits', 0)}")
-            print(f"   - Cache misses: {stats.get('misses', 0)}")
-            print(f"   - Hit rate: {stats.get('hit_rate', 0):.2%}")
+            for tier, tier_stats in stats.get('tiers', {}).items():
+                print(f"   - {tier}: {tier_stats['hits']:.0f} hits / {tier_stats['misses']:.0f} misses "
+                      f"({tier_stats['hit_rate']:.2%}), get {tier_stats['avg_get_ms']:.2f} ms, "
+                      f"set {tier_stats['avg_set_ms']:.2f} ms")
         
         print("\n✅ Redis cache wrapper is working correctly!")
         return True
@@ -0,0 +1,68 @@
+"""
+Vector Cache Memory Report
+
+Shows the bytes per cached embedding for the legacy pickle format and the binary
+float32 / float16 encodings. It prints the payload size and, when Redis is
+reachable, what Redis actually uses per key (MEMORY USAGE). It can also drop
+the pre-namespace vector:{hash} entries (--purge-legacy): the cache never reads
+them, since current keys carry the normalizer version and generation.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+import uuid
+import pickle
+import argparse
+import numpy as np
+import redis
+from src.cache.namespace import unlink_keys
+from src.cache.vector_codec import encode_vector
+from src.rag.models import EMBEDDING_MODEL, model_id
+
+def sample_formats(dim: int):
+    vector = np.random.default_rng(0).standard_normal(dim).astype(np.float32)
+    return {
+        "pickle (legacy)": pickle.dumps(vector.tolist()),
+        "float32": encode_vector(vector, model_id(EMBEDDING_MODEL), dtype="float32"),
+        "float16": encode_vector(vector, model_id(EMBEDDING_MODEL), dtype="float16"),
+    }
+
+def report(client, dim: int):
+    print(f"Per-key cost of a {dim}-d embedding:")
+    print(f"{'format':>16} | {'payload':>8} | {'redis MEMORY USAGE':>18}")
+    for name, value in sample_formats(dim).items():
+        usage = "n/a"
+        if client is not None:
+            key = f"vector:memcheck:{uuid.uuid4().hex}"
+            client.set(key, value)
+            usage = f"{client.memory_usage(key, samples=0)} B"
+            client.delete(key)
+        print(f"{name:>16} | {len(value):>6} B | {usage:>18}")
+
+def purge_legacy(client):
+    legacy, freed = [], 0
+    for key in client.scan_iter(match="vector:*", count=500):
+        if len(key.split(b":")) < 4:  # vector:{normver}:g{n}:{hash} is the live layout
+            legacy.append(key)
+            freed += client.memory_usage(key, samples=0) or 0
+    removed = unlink_keys(client, legacy)
+    print(f"\nRemoved {removed} legacy vector keys, {freed / 1e6:.2f} MB freed")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory per key of the Redis vector cache")
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379"))
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--purge-legacy", action="store_true", help="Delete unreachable vector:{hash} entries")
+    args = parser.parse_args()
+
+    client = redis.from_url(args.redis_url, socket_connect_timeout=2)
+    try:
+        client.ping()
+    except Exception as e:
+        print(f"Redis not reachable ({e}); showing payload sizes only\n")
+        client = None
+
+    report(client, args.dim)
+    if args.purge_legacy and client is not None:
+        purge_legacy(client)
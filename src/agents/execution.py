@@ -1,3 +1,4 @@
+from typing import Tuple
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from src.rag.generation import LLMClient
@@ -26,6 +27,10 @@ class ExecutionAgent:
         self.chain = self.prompt | self.llm | StrOutputParser()
         
     def execute_plan(self, gaps: list, queries: list) -> str:
+        return self.run_plan(gaps, queries)[0]
+    
+    def run_plan(self, gaps: list, queries: list) -> Tuple[str, bool]:
+        """``execute_plan`` plus whether any web search actually returned results."""
         try:
             # Get LLM's analysis
             analysis = self.chain.invoke({
@@ -35,14 +40,16 @@ class ExecutionAgent:
             
             # Execute tools based on queries
             results = []
+            found = False
             for query in queries[:3]:  # Limit to 3 queries
                 # Try web search first
                 try:
                     web_result = self.tools["web_search"].invoke(query)
                     results.append(f"Web Search for '{query}':\n{web_result}")
+                    found = found or bool(web_result)
                 except Exception as e:
                     results.append(f"Web search failed: {e}")
                     
-            return "\n\n".join(results) if results else "No additional information found."
+            return ("\n\n".join(results) if results else "No additional information found."), found
         except Exception as e:
-            return f"Execution failed: {e}"
+            return f"Execution failed: {e}", False
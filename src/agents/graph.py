@@ -1,35 +1,59 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import TypedDict, List
 from langgraph.graph import StateGraph, END
 from src.rag.retrieval import MultiSourceRetriever
+from src.rag.context import ContextPacker
+from src.rag.filters import RetrievalFilter
 from src.rag.generation import AnswerGenerator
 from src.agents.validation import ValidationAgent, ValidationReport
 from src.agents.execution import ExecutionAgent
 from src.agents.synthesis import SynthesisAgent
-from src.cache import RedisCache
+from src.cache import SemanticAnswerCache, SemanticHit, SingleFlight, get_cache
+from src.cache.semantic_cache import SEMANTIC_CACHE_ENABLED
+from src.cache.single_flight import SINGLE_FLIGHT_ENABLED
 from src.observability import get_tracker
 
+# Threads refreshing stale answers in the background
+ANSWER_REFRESH_WORKERS = int(os.getenv("ANSWER_REFRESH_WORKERS", "2"))
+
+# Window and evidence needed for an outdated answer to be refreshed from recent arXiv chunks alone
+RECENT_DAYS = int(os.getenv("RECENT_DAYS", "365"))
+MIN_RECENT_DOCS = int(os.getenv("MIN_RECENT_DOCS", "2"))
+
 class GraphState(TypedDict):
     question: str
     context: str
     initial_answer: str
     validation_report: dict
     new_info: str
+    from_web: bool
     final_answer: str
 
 class RAGGraph:
     def __init__(self):
         self.retriever = MultiSourceRetriever()
+        self.packer = ContextPacker()
         self.generator = AnswerGenerator()
         self.validator = ValidationAgent()
         self.executor = ExecutionAgent()
         self.synthesizer = SynthesisAgent()
         
-        # Initialize cache
-        try:
-            self.cache = RedisCache()
-        except Exception as e:
-            print(f"Redis cache not available: {e}")
-            self.cache = None
+        # Shared with the retrievers through one connection pool
+        self.cache = get_cache()
+        
+        # Tier 0: answers for paraphrases of earlier questions, matched by embedding
+        self.semantic_cache = self._semantic_cache() if SEMANTIC_CACHE_ENABLED else None
+        
+        # Identical concurrent questions run the pipeline once across all workers
+        self.single_flight = SingleFlight(self.cache) if self.cache and SINGLE_FLIGHT_ENABLED else None
+        
+        # Stale answers are returned at once and recomputed here, one refresh per question
+        self.refresher = ThreadPoolExecutor(max_workers=ANSWER_REFRESH_WORKERS,
+                                            thread_name_prefix="answer-refresh")
+        self._refreshing = set()
+        self._refreshing_lock = threading.Lock()
         
         self.workflow = StateGraph(GraphState)
         
@@ -60,15 +84,31 @@ class RAGGraph:
         
         self.app = self.workflow.compile()
         
+    def _semantic_cache(self):
+        """Tier 0 cache on the retriever's Qdrant client; None without one (VECTOR_BACKEND=local)."""
+        client = self.retriever.wiki_retriever.client
+        if client is None:
+            print("Semantic cache disabled: no Qdrant client for the current vector backend")
+            return None
+        try:
+            return SemanticAnswerCache(embed=self.retriever.wiki_retriever.embed_query, client=client,
+                                       cache=self.cache)
+        except Exception as e:
+            print(f"Semantic cache not available: {e}")
+            return None
+    
     def retrieve_node(self, state: GraphState):
         print("---RETRIEVE---")
         docs = self.retriever.retrieve(state["question"])
-        context = "\n\n".join([d.page_content for d in docs])
+        # De-duplicated, rerank-ordered context within the token budget
+        context, docs = self.packer.pack(docs)
         
         # Log retrieval
         tracker = get_tracker()
         tracker.log_retrieval("multi_source", state["question"], 
-                            [{"page_content": d.page_content, "metadata": d.metadata} for d in docs])
+                            [{"page_content": d.page_content, "metadata": d.metadata} for d in docs],
+                            scores=[d.metadata.get("rerank_score") for d in docs])
+        tracker.log_rerank(self.retriever.last_rerank_stats)
         
         return {"context": context}
     
@@ -123,8 +163,32 @@ class RAGGraph:
         report = state["validation_report"]
         gaps = report.get("gaps", [])
         queries = report.get("search_queries", [])
-        new_info = self.executor.execute_plan(gaps, queries)
-        return {"new_info": new_info}
+        
+        # Outdated answers first try recent arXiv chunks via an indexed date filter
+        recent_info = ""
+        if report.get("is_outdated", False):
+            recent = self.retriever.retrieve(
+                state["question"], source="arxiv",
+                filters=RetrievalFilter.recent(RECENT_DAYS, source="arxiv")
+            )
+            # CrossEncoder logits above 0 indicate a relevant passage (unscored = cascade kept it)
+            relevant = [d for d in recent if d.metadata.get("rerank_score", 1.0) > 0]
+            if relevant:
+                recent_info = "Recent ArXiv papers:\n" + "\n\n".join(
+                    f"[ArXiv: {d.metadata.get('title', '')} ({d.metadata.get('published', '')[:10]})]\n{d.page_content}"
+                    for d in relevant
+                )
+            if len(relevant) >= MIN_RECENT_DOCS:
+                print(f"Using {len(relevant)} recent ArXiv chunks, skipping web search")
+                # Indexed papers do not go stale like web results; keep the normal answer TTL
+                return {"new_info": recent_info, "from_web": False}
+        
+        web_info, from_web = self.executor.run_plan(gaps, queries)
+        if not recent_info:
+            return {"new_info": web_info, "from_web": from_web}
+        # Only web results shorten the answer TTL; a fruitless search leaves the arXiv chunks alone
+        new_info = recent_info + "\n\n" + web_info if from_web else recent_info
+        return {"new_info": new_info, "from_web": from_web}
     
     def synthesize_node(self, state: GraphState):
         print("---SYNTHESIZE---")
@@ -144,33 +208,103 @@ class RAGGraph:
         
         return {"final_answer": final}
         
+    def _execute(self, question: str):
+        """Runs the graph and caches the final answer (Tier 1, and Tier 0 for paraphrases)."""
+        inputs = {"question": question}
+        result = self.app.invoke(inputs)
+        
+        if "final_answer" in result:
+            # Use shorter TTL if answer includes web-sourced info
+            has_web_info = bool(result.get("from_web"))
+            if self.cache:
+                if has_web_info:
+                    self.cache.set_web_answer(question, result["final_answer"])
+                else:
+                    self.cache.set_answer(question, result["final_answer"])
+            if self.semantic_cache:
+                self.semantic_cache.store(question, result["final_answer"], web=has_web_info)
+        return result
+    
+    def _refresh_in_background(self, question: str):
+        """Schedules one recomputation of a stale answer; repeat calls while it runs are no-ops."""
+        key = self.cache._key("answer", question)
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self.refresher.submit(self._refresh, question, key)
+    
+    def _refresh(self, question: str, key: str):
+        lease = None
+        tracker = None
+        try:
+            if self.single_flight:
+                lease = self.single_flight.acquire(question)
+                if lease is None:
+                    return  # another worker is already recomputing it
+            # Its own run on this thread, so the steps stay out of foreground requests' logs
+            tracker = get_tracker()
+            tracker.start_run(question, refresh=True)
+            self._execute(question)
+            print(f"Refreshed stale answer for '{question[:30]}...'")
+        except Exception as e:
+            print(f"Background refresh failed for '{question[:30]}...': {e}")
+        finally:
+            if tracker:
+                tracker.end_run()
+            if lease:
+                lease.release()
+            with self._refreshing_lock:
+                self._refreshing.discard(key)
+    
     def run(self, question: str):
         # Start tracking
         tracker = get_tracker()
         run_id = tracker.start_run(question)
         
         try:
-            # Check Tier 1 cache for exact query match
+            # Check Tier 1 cache for exact query match; past its soft TTL the answer is
+            # still returned at once while one background run refreshes it
             if self.cache:
-                cached_answer = self.cache.get_answer(question)
-                if cached_answer:
-                    print(f"Cache hit: answer for '{question[:30]}...'")
-                    tracker.log_cache_hit(cached_answer)
+                cached = self.cache.get_answer_entry(question)
+                if cached:
+                    if cached.stale:
+                        print(f"Stale cache hit: answer for '{question[:30]}...', refreshing in background")
+                        self._refresh_in_background(question)
+                    else:
+                        print(f"Cache hit: answer for '{question[:30]}...'")
+                    tracker.log_cache_hit(cached.answer, stale=cached.stale)
                     tracker.end_run()
-                    return {"final_answer": cached_answer, "question": question}
+                    return {"final_answer": cached.answer, "question": question, "stale": cached.stale}
             
-            # Execute the graph 
-            inputs = {"question": question}
-            result = self.app.invoke(inputs)
+            # Check Tier 0 cache for a paraphrase of an earlier question
+            if self.semantic_cache:
+                hit = self.semantic_cache.lookup(question)
+                if hit:
+                    print(f"Semantic cache hit ({hit.similarity:.3f}): '{hit.question[:30]}...'")
+                    tracker.log_cache_hit(hit.answer, tier="semantic", similarity=hit.similarity,
+                                          matched_question=hit.question)
+                    tracker.end_run()
+                    return {"final_answer": hit.answer, "question": question,
+                            "cached_question": hit.question, "cache_similarity": hit.similarity}
             
-            # Cache the final answer (Tier 1)
-            if self.cache and "final_answer" in result:
-                # Use shorter TTL if answer includes web-sourced info
-                has_web_info = "new_info" in result and result.get("new_info")
-                if has_web_info:
-                    self.cache.set_web_answer(question, result["final_answer"])
-                else:
-                    self.cache.set_answer(question, result["final_answer"])
+            # Wait for an identical in-flight question instead of running it again
+            lease = None
+            if self.single_flight:
+                answer, lease = self.single_flight.join(question, lambda: self.cache.get_answer(question))
+                if answer is not None:
+                    print(f"Coalesced with in-flight run for '{question[:30]}...'")
+                    tracker.log_cache_hit(answer, tier="coalesced")
+                    tracker.end_run()
+                    return {"final_answer": answer, "question": question}
+            
+            try:
+                # Execute the graph 
+                result = self._execute(question)
+            finally:
+                # Answer is cached before release, so woken followers find it
+                if lease:
+                    lease.release()
             
             # End tracking and save log
             tracker.end_run()
@@ -179,3 +313,17 @@ class RAGGraph:
         except Exception as e:
             tracker.end_run()
             raise e
+    
+    def report_wrong_answer(self, result: dict) -> bool:
+        """User feedback that an answer returned by ``run`` did not fit the question.
+
+        A paraphrase answer from the semantic cache is counted as a false hit and its
+        entry dropped, so the question goes through the pipeline next time. Returns
+        whether the answer came from the semantic cache.
+        """
+        if not self.semantic_cache or not result.get("cached_question"):
+            return False
+        self.semantic_cache.mark_false_hit(SemanticHit(answer=result.get("final_answer", ""),
+                                                       question=result["cached_question"],
+                                                       similarity=result.get("cache_similarity", 0.0)))
+        return True
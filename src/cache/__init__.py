@@ -1,4 +1,11 @@
 # Cache module initialization
-from .redis_cache import RedisCache
+from .redis_cache import RedisCache, get_cache
+from .redis_client import CircuitOpenError, get_redis_client
+from .local_cache import LocalCache
+from .metrics import CacheMetrics
+from .score_cache import RerankScoreCache
+from .semantic_cache import SemanticAnswerCache, SemanticHit
+from .retrieval_cache import RetrievalResultCache
+from .single_flight import SingleFlight
 
-__all__ = ['RedisCache']
+__all__ = ['RedisCache', 'get_cache', 'get_redis_client', 'CircuitOpenError', 'LocalCache', 'CacheMetrics', 'RerankScoreCache', 'SemanticAnswerCache', 'SemanticHit', 'RetrievalResultCache', 'SingleFlight']
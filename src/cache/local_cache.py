@@ -0,0 +1,187 @@
+import os
+import json
+import time
+import uuid
+import fnmatch
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+L1_CACHE_ENABLED = os.getenv("L1_CACHE_ENABLED", "true").lower() == "true"
+L1_MAX_ENTRIES = int(os.getenv("L1_MAX_ENTRIES", "4096"))
+L1_MAX_BYTES = int(os.getenv("L1_MAX_BYTES", str(64 * 1024 * 1024)))
+# Upper bound on how long a worker can serve a value another worker has overwritten
+L1_TTL = float(os.getenv("L1_TTL", "60"))
+INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "cache:invalidate")
+
+
+class LocalCache:
+    """Bounded in-process LRU with per-entry TTL, holding raw Redis values by Redis key.
+
+    Bounded both by entry count and by payload bytes; the oldest entries are evicted
+    first. Memory is accounted per tier (the key prefix before the first ``:``).
+    """
+
+    def __init__(self, max_entries: int = L1_MAX_ENTRIES, max_bytes: int = L1_MAX_BYTES,
+                 ttl: float = L1_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.tier_bytes: Dict[str, int] = {}
+        self.stats = {"evictions": 0, "expirations": 0, "invalidations": 0}
+        # Called with the tier of every evicted entry (cache metrics)
+        self.on_evict: Optional[Callable[[str], None]] = None
+
+    @staticmethod
+    def _tier(key: str) -> str:
+        return key.split(":", 1)[0]
+
+    def _drop(self, key: str):
+        _, value = self._entries.pop(key)
+        self.bytes -= len(value)
+        tier = self._tier(key)
+        self.tier_bytes[tier] -= len(value)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._drop(key)
+                self.stats["expirations"] += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        """Stores ``value`` for at most the L1 TTL (or ``ttl`` if shorter)."""
+        if len(value) > self.max_bytes:
+            return
+        ttl = min(ttl, self.ttl) if ttl else self.ttl
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self.bytes += len(value)
+            tier = self._tier(key)
+            self.tier_bytes[tier] = self.tier_bytes.get(tier, 0) + len(value)
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.stats["evictions"] += 1
+                if self.on_evict is not None:
+                    self.on_evict(self._tier(oldest))
+
+    def invalidate(self, pattern: str) -> int:
+        """Drops keys matching a Redis-style glob; returns how many were dropped."""
+        with self._lock:
+            keys = [k for k in self._entries if fnmatch.fnmatchcase(k, pattern)]
+            for key in keys:
+                self._drop(key)
+            self.stats["invalidations"] += len(keys)
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self.stats["invalidations"] += len(self._entries)
+            self._entries.clear()
+            self.bytes = 0
+            self.tier_bytes = {}
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "tier_bytes": {tier: size for tier, size in self.tier_bytes.items() if size},
+                **self.stats
+            }
+
+
+class InvalidationBus:
+    """Broadcasts L1 invalidations to every worker over Redis pub/sub.
+
+    ``publish`` sends a key pattern (``None`` means everything); a daemon thread
+    applies messages from other workers to the local cache. While the subscription
+    is down, invalidations can be missed, so the local cache is cleared on reconnect.
+    """
+
+    def __init__(self, client, local: LocalCache, channel: str = INVALIDATION_CHANNEL, generations=None):
+        self.client = client
+        self.local = local
+        self.generations = generations
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self.stats = {"published": 0, "received": 0, "reconnects": 0}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._listen, name="l1-invalidation", daemon=True)
+        self._thread.start()
+
+    def publish(self, pattern: Optional[str] = None, pipe=None, generations: Optional[Dict[str, int]] = None):
+        """Sends the invalidation now, or queues it on ``pipe`` for the caller to execute.
+
+        ``generations`` carries bumped namespace generations to the other workers.
+        """
+        message = json.dumps({"origin": self.origin, "pattern": pattern, "generations": generations})
+        if pipe is not None:
+            pipe.publish(self.channel, message)
+            self.stats["published"] += 1
+            return
+        try:
+            self.client.publish(self.channel, message)
+            self.stats["published"] += 1
+        except Exception as e:
+            print(f"Cache invalidation publish error: {e}")
+
+    def _apply(self, data: bytes):
+        message = json.loads(data)
+        if message.get("origin") == self.origin:
+            return  # already applied locally
+        self.stats["received"] += 1
+        if self.generations is not None:
+            for tier, generation in (message.get("generations") or {}).items():
+                self.generations.update(tier, generation)
+        if message.get("pattern") is None:
+            self.local.clear()
+        else:
+            self.local.invalidate(message["pattern"])
+
+    def _listen(self):
+        connected = True
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                if not connected:
+                    print("Cache invalidation channel reconnected; clearing L1 cache")
+                    self.local.clear()
+                    self.stats["reconnects"] += 1
+                connected = True
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message["type"] == "message":
+                        self._apply(message["data"])
+            except Exception as e:
+                if connected:
+                    print(f"Cache invalidation channel lost: {e}")
+                connected = False
+                # Nothing guarantees we saw every invalidation; stop serving from L1
+                self.local.clear()
+                self._stop.wait(5.0)
+            finally:
+                try:
+                    if pubsub is not None:
+                        pubsub.close()
+                except Exception:
+                    pass
+
+    def close(self):
+        self._stop.set()
+
@@ -0,0 +1,147 @@
+import os
+import time
+import threading
+from collections import defaultdict
+from typing import Dict, Optional
+
+METRICS_KEY = "cache_metrics:{}"
+METRICS_TIERS_KEY = "cache_metrics:tiers"
+# Seconds between pushes of this process's counters to Redis
+METRICS_FLUSH_INTERVAL = float(os.getenv("CACHE_METRICS_FLUSH_INTERVAL", "10"))
+
+COUNTERS = ("l1_hits", "l2_hits", "misses", "gets", "sets", "errors",
+            "bytes_read", "bytes_written", "evictions")
+TIMERS = ("get_ms", "set_ms")
+
+
+def _derive(counts: Dict[str, float]) -> Dict[str, float]:
+    """Adds hit rates, mean latencies and mean payload sizes to raw counters.
+
+    Tier-specific counters outside COUNTERS are passed through unchanged.
+    """
+    stats = {**counts, **{field: counts.get(field, 0) for field in COUNTERS + TIMERS}}
+    lookups = stats["l1_hits"] + stats["l2_hits"] + stats["misses"]
+    hits = stats["l1_hits"] + stats["l2_hits"]
+    stats.update({
+        "lookups": lookups,
+        "hits": hits,
+        "hit_rate": hits / lookups if lookups else 0.0,
+        "l1_hit_rate": stats["l1_hits"] / lookups if lookups else 0.0,
+        "l2_hit_rate": stats["l2_hits"] / lookups if lookups else 0.0,
+        "avg_get_ms": stats["get_ms"] / stats["gets"] if stats["gets"] else 0.0,
+        "avg_set_ms": stats["set_ms"] / stats["sets"] if stats["sets"] else 0.0,
+        "avg_read_bytes": stats["bytes_read"] / hits if hits else 0.0,
+        "avg_write_bytes": stats["bytes_written"] / stats["sets"] if stats["sets"] else 0.0
+    })
+    return stats
+
+
+class CacheMetrics:
+    """Per-tier cache counters kept in the application, aggregated across processes.
+
+    Each process counts locally and periodically adds its deltas to one Redis
+    hash per tier (HINCRBY/HINCRBYFLOAT in a single pipeline), so recording stays
+    off the request path. Tiers are created on first use.
+    """
+
+    def __init__(self, client=None, flush_interval: float = METRICS_FLUSH_INTERVAL):
+        self.client = client
+        self.flush_interval = flush_interval
+        self._totals: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._pending: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+
+    def record(self, tier: str, field: str, n: float = 1):
+        if not n:
+            return
+        with self._lock:
+            self._totals[tier][field] += n
+            self._pending[tier][field] += n
+        if self._flusher is None and self.client is not None:
+            self._start_flusher()
+
+    def observe(self, tier: str, op: str, seconds: float, nbytes: int = 0, calls: int = 1):
+        """Records ``calls`` get or set operations that took ``seconds`` and moved ``nbytes``."""
+        self.record(tier, f"{op}s", calls)
+        self.record(tier, f"{op}_ms", seconds * 1000)
+        self.record(tier, "bytes_read" if op == "get" else "bytes_written", nbytes)
+
+    def _start_flusher(self):
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name="cache-metrics", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self) -> bool:
+        """Adds this process's unflushed counters to the shared Redis hashes."""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(lambda: defaultdict(float))
+        if not pending or self.client is None:
+            return True
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for tier, counts in pending.items():
+                key = METRICS_KEY.format(tier)
+                for field, value in counts.items():
+                    if field in TIMERS:
+                        pipe.hincrbyfloat(key, field, value)
+                    else:
+                        pipe.hincrby(key, field, int(value))
+                pipe.sadd(METRICS_TIERS_KEY, tier)
+            pipe.execute()
+            return True
+        except Exception as e:
+            print(f"Cache metrics flush error: {e}")
+            # Keep the deltas for the next attempt
+            with self._lock:
+                for tier, counts in pending.items():
+                    for field, value in counts.items():
+                        self._pending[tier][field] += value
+            return False
+
+    def local_stats(self) -> Dict[str, Dict[str, float]]:
+        """Counters of this process only."""
+        with self._lock:
+            return {tier: _derive(counts) for tier, counts in self._totals.items()}
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Counters summed over every process sharing this Redis (this process's if unreachable)."""
+        if self.client is None or not self.flush():
+            return self.local_stats()
+        try:
+            tiers = sorted(t.decode() if isinstance(t, bytes) else t
+                           for t in self.client.smembers(METRICS_TIERS_KEY))
+            pipe = self.client.pipeline(transaction=False)
+            for tier in tiers:
+                pipe.hgetall(METRICS_KEY.format(tier))
+            stats = {}
+            for tier, raw in zip(tiers, pipe.execute()):
+                counts = {(k.decode() if isinstance(k, bytes) else k): float(v) for k, v in raw.items()}
+                stats[tier] = _derive(counts)
+            return stats
+        except Exception as e:
+            print(f"Cache metrics read error: {e}")
+            return self.local_stats()
+
+    def reset(self):
+        """Drops the shared counters (e.g. after changing TTLs) and this process's totals."""
+        with self._lock:
+            self._totals.clear()
+            self._pending.clear()
+        if self.client is not None:
+            try:
+                tiers = self.client.smembers(METRICS_TIERS_KEY)
+                pipe = self.client.pipeline(transaction=False)
+                for tier in tiers:
+                    pipe.unlink(METRICS_KEY.format(tier.decode() if isinstance(tier, bytes) else tier))
+                pipe.unlink(METRICS_TIERS_KEY)
+                pipe.execute()
+            except Exception as e:
+                print(f"Cache metrics reset error: {e}")
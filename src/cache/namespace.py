@@ -0,0 +1,133 @@
+import os
+import time
+import threading
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+# Tiers whose keys carry a namespace generation; leases and locks keep stable keys
+NAMESPACED_TIERS = ("answer", "vector", "retrieval", "rerank")
+# Tier-0 answers live in Qdrant; their generation is stored in each point's payload
+SEMANTIC_TIER = "semantic"
+GENERATION_KEY = "cache_gen:{}"
+# How long a worker trusts its copy of a generation when no pub/sub update arrives
+GENERATION_REFRESH = float(os.getenv("CACHE_GENERATION_REFRESH", "5"))
+
+CACHE_REAPER_ENABLED = os.getenv("CACHE_REAPER_ENABLED", "true").lower() == "true"
+REAPER_BATCH_SIZE = int(os.getenv("CACHE_REAPER_BATCH_SIZE", "500"))
+# Pause between UNLINK batches so reaping never saturates Redis
+REAPER_PAUSE = float(os.getenv("CACHE_REAPER_PAUSE", "0.01"))
+
+
+class NamespaceGenerations:
+    """Per-tier generation counters stored in Redis and cached in-process.
+
+    Bumping a tier's generation is a single INCR: keys written under older
+    generations are simply never read again and expire (or get reaped).
+    """
+
+    def __init__(self, client, refresh: float = GENERATION_REFRESH):
+        self.client = client
+        self.refresh = refresh
+        self._known: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, tier: str) -> int:
+        known = self._known.get(tier)
+        if known and time.monotonic() - known[1] < self.refresh:
+            return known[0]
+        try:
+            generation = int(self.client.get(GENERATION_KEY.format(tier)) or 0)
+        except Exception:
+            # Redis unreachable: keep using the last generation we saw
+            return known[0] if known else 0
+        self.update(tier, generation)
+        return generation
+
+    def update(self, tier: str, generation: int):
+        """Records ``generation`` unless a newer one is already known (e.g. from pub/sub)."""
+        with self._lock:
+            known = self._known.get(tier)
+            if known is None or generation >= known[0]:
+                self._known[tier] = (generation, time.monotonic())
+
+    def bump(self, tier: str) -> int:
+        generation = int(self.client.incr(GENERATION_KEY.format(tier)))
+        self.update(tier, generation)
+        return generation
+
+
+def unlink_keys(client, keys: Iterable, batch_size: int = REAPER_BATCH_SIZE, pause: float = 0.0) -> int:
+    """UNLINKs ``keys`` in pipelined batches (one round trip per batch); returns how many went."""
+    batch, removed = [], 0
+    for key in keys:
+        batch.append(key)
+        if len(batch) >= batch_size:
+            removed += _unlink(client, batch)
+            batch = []
+            if pause:
+                time.sleep(pause)
+    if batch:
+        removed += _unlink(client, batch)
+    return removed
+
+
+def _unlink(client, keys) -> int:
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        pipe.unlink(key)
+    return sum(int(n or 0) for n in pipe.execute())
+
+
+class CacheReaper:
+    """Background deletion of keys from superseded generations.
+
+    Walks ``{tier}:*`` with SCAN and removes keys whose generation is not the
+    current one in pipelined UNLINK batches, off the request path.
+    """
+
+    def __init__(self, client, generations: NamespaceGenerations,
+                 batch_size: int = REAPER_BATCH_SIZE, pause: float = REAPER_PAUSE):
+        self.client = client
+        self.generations = generations
+        self.batch_size = batch_size
+        self.pause = pause
+        self.stats = {"runs": 0, "reaped": 0}
+        self._pending: Set[str] = set()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, tiers: Iterable[str]):
+        with self._lock:
+            self._pending.update(tiers)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="cache-reaper", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                tiers, self._pending = self._pending, set()
+            for tier in tiers:
+                try:
+                    self.reap(tier)
+                except Exception as e:
+                    print(f"Cache reaper error on '{tier}': {e}")
+
+    def reap(self, tier: str) -> int:
+        """Unlinks every ``tier`` key outside the current generation; returns how many."""
+        current = f"g{self.generations.get(tier)}"
+
+        def superseded(key) -> bool:
+            parts = (key.decode("utf-8") if isinstance(key, bytes) else key).split(":")
+            return len(parts) < 4 or parts[2] != current
+
+        keys = self.client.scan_iter(match=f"{tier}:*", count=self.batch_size)
+        reaped = unlink_keys(self.client, filter(superseded, keys), self.batch_size, self.pause)
+        self.stats["runs"] += 1
+        self.stats["reaped"] += reaped
+        if reaped:
+            print(f"Reaped {reaped} '{tier}' keys from old cache generations")
+        return reaped
@@ -0,0 +1,61 @@
+import os
+import re
+import unicodedata
+from typing import Optional
+
+# Bump whenever the rules below change so old cache entries are never served
+NORMALIZER_VERSION = "n1"
+
+CACHE_STRIP_PUNCTUATION = os.getenv("CACHE_STRIP_PUNCTUATION", "true").lower() == "true"
+CACHE_STRIP_STOPWORDS = os.getenv("CACHE_STRIP_STOPWORDS", "false").lower() == "true"
+
+# Filler words only; question words (what/when/who/...) change the meaning and stay
+CACHE_STOPWORDS = frozenset("""
+a an the please can could would you me i tell about explain describe
+""".split())
+
+# Punctuation at a word boundary; keeps "gpt-3.5", "what's" and "llama-2" intact
+_EDGE_PUNCT_RE = re.compile(r"(?<!\w)[^\w\s]+|[^\w\s]+(?!\w)")
+
+
+class QueryNormalizer:
+    """Canonical form of a question for cache keys.
+
+    Always applies Unicode NFKC, case folding and whitespace collapse; punctuation
+    and stopword stripping are optional. ``version`` names the rules in effect and
+    is part of every cache key, so entries written under other rules never match.
+    """
+
+    def __init__(self, strip_punctuation: Optional[bool] = None, strip_stopwords: Optional[bool] = None):
+        self.strip_punctuation = CACHE_STRIP_PUNCTUATION if strip_punctuation is None else strip_punctuation
+        self.strip_stopwords = CACHE_STRIP_STOPWORDS if strip_stopwords is None else strip_stopwords
+
+    @property
+    def version(self) -> str:
+        flags = ("p" if self.strip_punctuation else "") + ("s" if self.strip_stopwords else "")
+        return f"{NORMALIZER_VERSION}{flags}"
+
+    def normalize(self, text: str) -> str:
+        text = unicodedata.normalize("NFKC", text).casefold()
+        if self.strip_punctuation:
+            text = _EDGE_PUNCT_RE.sub(" ", text)
+        words = text.split()
+        if self.strip_stopwords:
+            kept = [w for w in words if w not in CACHE_STOPWORDS]
+            words = kept or words  # never reduce a question to nothing
+        return " ".join(words)
+
+    __call__ = normalize
+
+
+_normalizer = None
+
+def get_normalizer() -> QueryNormalizer:
+    """Get or create the process-wide normalizer configured from the environment."""
+    global _normalizer
+    if _normalizer is None:
+        _normalizer = QueryNormalizer()
+    return _normalizer
+
+def normalize_query(text: str) -> str:
+    return get_normalizer().normalize(text)
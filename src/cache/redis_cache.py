@@ -1,120 +1,358 @@
-import redis
+import os
+import re
 import json
+import time
+import struct
+import threading
 import hashlib
-import pickle
+from dataclasses import dataclass
 from typing import Optional, List, Any
 from datetime import timedelta
+import numpy as np
+from .vector_codec import VectorFormatError, decode_vector, encode_vector
+from .normalize import QueryNormalizer, get_normalizer
+from .redis_client import get_redis_client
+from .local_cache import L1_CACHE_ENABLED, InvalidationBus, LocalCache
+from .metrics import CacheMetrics
+from .namespace import (CACHE_REAPER_ENABLED, NAMESPACED_TIERS, SEMANTIC_TIER, CacheReaper,
+                        NamespaceGenerations, unlink_keys)
+
+# Answers past their soft TTL are served as stale (and refreshed) until the hard TTL
+STALE_WHILE_REVALIDATE = os.getenv("ANSWER_STALE_WHILE_REVALIDATE", "true").lower() == "true"
+ANSWER_HARD_TTL = int(os.getenv("ANSWER_HARD_TTL", "86400"))
+WEB_DATA_HARD_TTL = int(os.getenv("WEB_DATA_HARD_TTL", "7200"))
+
+# magic, soft expiry (unix time); the UTF-8 answer follows
+_ANSWER_HEADER = struct.Struct("<4sd")
+_ANSWER_MAGIC = b"SWR1"
+
+
+@dataclass
+class CachedAnswer:
+    answer: str
+    stale: bool
+    soft_expires_at: Optional[float] = None
+
+
+def encode_answer(answer: str, soft_expires_at: float) -> bytes:
+    return _ANSWER_HEADER.pack(_ANSWER_MAGIC, soft_expires_at) + answer.encode('utf-8')
+
+
+def decode_answer(data: bytes, now: Optional[float] = None) -> CachedAnswer:
+    """Reads an answer entry; plain UTF-8 values from before soft TTLs count as fresh."""
+    if data[:len(_ANSWER_MAGIC)] != _ANSWER_MAGIC:
+        return CachedAnswer(bytes(data).decode('utf-8'), stale=False)
+    _, soft_expires_at = _ANSWER_HEADER.unpack_from(data)
+    answer = bytes(data[_ANSWER_HEADER.size:]).decode('utf-8')
+    return CachedAnswer(answer, stale=(now or time.time()) >= soft_expires_at, soft_expires_at=soft_expires_at)
+
 
 class RedisCache:
-    """Two-tier caching system for RAG pipeline."""
+    """Two-tier caching system for RAG pipeline.
+
+    Answer and vector lookups check a bounded in-process L1 cache before Redis (L2).
+    Invalidations are broadcast over pub/sub so every worker drops its L1 copies.
+    """
     
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
-        self.client = redis.from_url(redis_url, decode_responses=False)
+    def __init__(self, redis_url: Optional[str] = None, normalizer: Optional[QueryNormalizer] = None,
+                 local: Optional[LocalCache] = None, l1_enabled: bool = L1_CACHE_ENABLED, client=None):
+        # Pooled, circuit-broken client shared by every cache in the process (REDIS_URL by default)
+        self.client = client if client is not None else get_redis_client(redis_url)
+        # Reaper sweeps and batch writes use the longer-timeout bulk pool
+        self.bulk_client = client if client is not None else get_redis_client(redis_url, bulk=True)
+        # Case, whitespace, punctuation and Unicode variants share one key
+        self.normalizer = normalizer or get_normalizer()
         
-        # TTL settings (in seconds)
+        # TTL settings (in seconds); answer TTLs are soft, the hard TTLs bound stale serving
         self.ANSWER_TTL = 3600  # 1 hour for final answers
         self.VECTOR_TTL = 86400  # 24 hours for embedded vectors
         self.WEB_DATA_TTL = 1800  # 30 minutes for web-sourced info (fresher)
+        self.ANSWER_HARD_TTL = ANSWER_HARD_TTL
+        self.WEB_DATA_HARD_TTL = WEB_DATA_HARD_TTL
+        self.stale_while_revalidate = STALE_WHILE_REVALIDATE
+
+        # Keys carry a per-tier generation, so invalidating a whole tier is one INCR
+        self.generations = NamespaceGenerations(self.client)
+        self.reaper = CacheReaper(self.bulk_client, self.generations) if CACHE_REAPER_ENABLED else None
+        
+        # Per-tier hits, misses, latency, bytes and evictions, summed across processes in Redis
+        self.metrics = CacheMetrics(self.client)
+        
+        self.local = (local or LocalCache()) if l1_enabled else None
+        self.bus = (InvalidationBus(self.client, self.local, generations=self.generations)
+                    if self.local is not None else None)
+        if self.local is not None:
+            self.local.on_evict = lambda tier: self.metrics.record(tier, "evictions")
         
     def _hash_key(self, text: str) -> str:
         """Generate consistent hash for cache keys."""
         return hashlib.sha256(text.encode()).hexdigest()[:16]
     
+    def _prefix(self, tier: str) -> str:
+        """``{tier}:{normalizer version}`` plus ``:g{generation}`` for NAMESPACED_TIERS (not leases)."""
+        prefix = f"{tier}:{self.normalizer.version}"
+        if tier in NAMESPACED_TIERS:
+            prefix += f":g{self.generations.get(tier)}"
+        return prefix
+    
+    def _key(self, tier: str, text: str) -> str:
+        """Versioned key: ``{tier}:{normalizer version}:g{generation}:{hash of the normalised text}``."""
+        return f"{self._prefix(tier)}:{self._hash_key(self.normalizer.normalize(text))}"
+    
+    def _lookup(self, tier: str, key: str) -> Optional[bytes]:
+        """Raw value from L1, else from Redis (copied into L1)."""
+        start = time.perf_counter()
+        outcome, value = "misses", None
+        try:
+            if self.local is not None:
+                value = self.local.get(key)
+                if value is not None:
+                    outcome = "l1_hits"
+                    return value
+            try:
+                value = self.client.get(key)
+            except Exception:
+                self.metrics.record(tier, "errors")
+                raise
+            if value is not None:
+                outcome = "l2_hits"
+                if self.local is not None:
+                    self.local.set(key, value)
+            return value
+        finally:
+            self.metrics.record(tier, outcome)
+            self.metrics.observe(tier, "get", time.perf_counter() - start, len(value) if value else 0)
+    
+    def _observe_set(self, tier: str, start: float, nbytes: int, calls: int = 1):
+        self.metrics.observe(tier, "set", time.perf_counter() - start, nbytes, calls)
+    
     # ----- TIER 1: Final Answer Caching -----
     
-    def get_answer(self, query: str) -> Optional[str]:
-        """Get cached final answer for exact query match."""
-        key = f"answer:{self._hash_key(query)}"
+    def get_answer_entry(self, query: str) -> Optional[CachedAnswer]:
+        """Cached answer up to its hard TTL, flagged stale once past its soft TTL."""
+        key = self._key("answer", query)
         try:
-            cached = self.client.get(key)
+            cached = self._lookup("answer", key)
             if cached:
-                return cached.decode('utf-8')
+                return decode_answer(cached)
         except Exception as e:
             print(f"Cache get error: {e}")
         return None
     
-    def set_answer(self, query: str, answer: str, ttl: Optional[int] = None):
-        """Cache final answer for query."""
-        key = f"answer:{self._hash_key(query)}"
+    def get_answer(self, query: str) -> Optional[str]:
+        """Get cached final answer for the same question up to normalisation (fresh answers only)."""
+        entry = self.get_answer_entry(query)
+        if entry and not entry.stale:
+            return entry.answer
+        return None
+    
+    def set_answer(self, query: str, answer: str, ttl: Optional[int] = None, hard_ttl: Optional[int] = None):
+        """Cache final answer for query: fresh for ``ttl``, kept (as stale) until ``hard_ttl``."""
+        key = self._key("answer", query)
         ttl = ttl or self.ANSWER_TTL
+        hard_ttl = max(hard_ttl or self.ANSWER_HARD_TTL, ttl) if self.stale_while_revalidate else ttl
+        value = encode_answer(answer, time.time() + ttl)
+        start = time.perf_counter()
         try:
-            self.client.setex(key, ttl, answer.encode('utf-8'))
+            pipe = self.client.pipeline(transaction=False)
+            pipe.setex(key, hard_ttl, value)
+            if self.bus is not None:
+                # Same round trip: other workers drop the answer this one replaces
+                self.bus.publish(key, pipe=pipe)
+            pipe.execute()
+            if self.local is not None:
+                self.local.set(key, value, hard_ttl)
+            self._observe_set("answer", start, len(value))
         except Exception as e:
+            self.metrics.record("answer", "errors")
             print(f"Cache set error: {e}")
     
     def set_web_answer(self, query: str, answer: str):
-        """Cache answer with web-sourced data (shorter TTL for freshness)."""
-        self.set_answer(query, answer, ttl=self.WEB_DATA_TTL)
+        """Cache answer with web-sourced data (shorter TTLs for freshness)."""
+        self.set_answer(query, answer, ttl=self.WEB_DATA_TTL, hard_ttl=self.WEB_DATA_HARD_TTL)
     
     # ----- TIER 2: Vector Embedding Caching -----
     
-    def get_vector(self, text: str) -> Optional[List[float]]:
-        """Get cached embedding vector for text."""
-        key = f"vector:{self._hash_key(text)}"
+    def _decode_vector(self, data: bytes, model_id: str) -> Optional[np.ndarray]:
+        """Decoded vector, or None if unreadable or embedded by another model."""
+        try:
+            vector, stored_model = decode_vector(data)
+        except VectorFormatError as e:
+            print(f"Ignoring unreadable cached vector: {e}")
+            return None
+        if model_id and stored_model and stored_model != model_id:
+            return None
+        return vector
+    
+    def get_vector(self, text: str, model_id: str = "") -> Optional[np.ndarray]:
+        """Get cached embedding vector for text as a read-only float array.
+
+        Vectors stored for a different ``model_id`` are treated as misses.
+        """
+        key = self._key("vector", text)
         try:
-            cached = self.client.get(key)
+            cached = self._lookup("vector", key)
             if cached:
-                return pickle.loads(cached)
+                return self._decode_vector(cached, model_id)
         except Exception as e:
             print(f"Vector cache get error: {e}")
         return None
     
-    def set_vector(self, text: str, vector: List[float]):
-        """Cache embedding vector for reuse."""
-        key = f"vector:{self._hash_key(text)}"
+    def set_vector(self, text: str, vector, model_id: str = ""):
+        """Cache embedding vector for reuse (binary float32, or float16 via VECTOR_CACHE_DTYPE)."""
+        key = self._key("vector", text)
+        value = encode_vector(vector, model_id)
+        start = time.perf_counter()
         try:
-            self.client.setex(key, self.VECTOR_TTL, pickle.dumps(vector))
+            self.client.setex(key, self.VECTOR_TTL, value)
+            if self.local is not None:
+                self.local.set(key, value)
+            self._observe_set("vector", start, len(value))
         except Exception as e:
+            self.metrics.record("vector", "errors")
             print(f"Vector cache set error: {e}")
     
-    def get_batch_vectors(self, texts: List[str]) -> List[Optional[List[float]]]:
+    def get_batch_vectors(self, texts: List[str], model_id: str = "") -> List[Optional[np.ndarray]]:
         """Get multiple cached vectors at once."""
-        keys = [f"vector:{self._hash_key(t)}" for t in texts]
+        keys = [self._key("vector", t) for t in texts]
+        start = time.perf_counter()
         try:
-            cached = self.client.mget(keys)
-            return [pickle.loads(v) if v else None for v in cached]
+            cached = [self.local.get(k) for k in keys] if self.local is not None else [None] * len(keys)
+            l1_hits = sum(value is not None for value in cached)
+            missing = [i for i, value in enumerate(cached) if value is None]
+            self.metrics.record("vector", "l1_hits", l1_hits)
+            if missing:
+                try:
+                    fetched = self.client.mget([keys[i] for i in missing])
+                except Exception:
+                    self.metrics.record("vector", "misses", len(missing))
+                    self.metrics.record("vector", "errors")
+                    raise
+                for i, value in zip(missing, fetched):
+                    cached[i] = value
+                    if value is not None and self.local is not None:
+                        self.local.set(keys[i], value)
+            l2_hits = sum(cached[i] is not None for i in missing)
+            self.metrics.record("vector", "l2_hits", l2_hits)
+            self.metrics.record("vector", "misses", len(missing) - l2_hits)
+            self.metrics.observe("vector", "get", time.perf_counter() - start,
+                                 sum(len(value) for value in cached if value), calls=len(keys))
+            return [self._decode_vector(value, model_id) if value else None for value in cached]
         except Exception as e:
             print(f"Batch vector cache error: {e}")
             return [None] * len(texts)
     
-    def set_batch_vectors(self, texts: List[str], vectors: List[List[float]]):
+    def set_batch_vectors(self, texts: List[str], vectors, model_id: str = ""):
         """Cache multiple vectors at once."""
         try:
-            pipe = self.client.pipeline()
+            start = time.perf_counter()
+            pipe = self.bulk_client.pipeline()
+            values = {}
             for text, vector in zip(texts, vectors):
-                key = f"vector:{self._hash_key(text)}"
-                pipe.setex(key, self.VECTOR_TTL, pickle.dumps(vector))
+                key = self._key("vector", text)
+                values[key] = encode_vector(vector, model_id)
+                pipe.setex(key, self.VECTOR_TTL, values[key])
             pipe.execute()
+            if self.local is not None:
+                for key, value in values.items():
+                    self.local.set(key, value)
+            self._observe_set("vector", start, sum(len(value) for value in values.values()), calls=len(values))
         except Exception as e:
+            self.metrics.record("vector", "errors")
             print(f"Batch vector cache set error: {e}")
     
     # ----- Cache Management -----
     
-    def invalidate_pattern(self, pattern: str):
-        """Invalidate all keys matching pattern (e.g., "answer:*")."""
+    def invalidate_tier(self, tier: str) -> Optional[int]:
+        """Invalidate a whole namespaced tier in O(1) by bumping its generation.
+
+        Old keys are no longer read; they expire or are removed by the background reaper.
+        """
+        return self._bump_generations([tier])
+    
+    def _bump_generations(self, tiers: List[str], pattern: Optional[str] = "") -> Optional[int]:
         try:
-            for key in self.client.scan_iter(match=pattern):
-                self.client.delete(key)
+            generations = {tier: self.generations.bump(tier) for tier in tiers}
         except Exception as e:
             print(f"Cache invalidation error: {e}")
+            return None
+        if pattern == "":
+            pattern = f"{tiers[0]}:*" if len(tiers) == 1 else None
+        if self.local is not None:
+            if pattern is None:
+                self.local.clear()
+            else:
+                self.local.invalidate(pattern)
+            self.bus.publish(pattern, generations=generations)
+        if self.reaper is not None:
+            self.reaper.schedule(tiers)
+        return generations[tiers[-1]]
     
-    def clear_all(self):
-        """Clear entire cache (use with caution)."""
+    def invalidate_pattern(self, pattern: str):
+        """Invalidate all keys matching pattern (e.g., "answer:*") in Redis and every worker's L1.
+
+        A whole namespaced tier is a generation bump; other patterns are removed
+        with SCAN and pipelined UNLINK batches.
+        """
+        whole_tier = re.fullmatch(r"(\w+):\*", pattern)
+        if whole_tier and whole_tier.group(1) in NAMESPACED_TIERS:
+            self.invalidate_tier(whole_tier.group(1))
+            return
+        if self.local is not None:
+            self.local.invalidate(pattern)
+            self.bus.publish(pattern)
         try:
-            self.client.flushdb()
+            unlink_keys(self.bulk_client, self.bulk_client.scan_iter(match=pattern, count=1000))
         except Exception as e:
-            print(f"Cache clear error: {e}")
+            print(f"Cache invalidation error: {e}")
+    
+    def clear_all(self):
+        """Invalidate every cached answer, vector, retrieval result, rerank score and
+        semantic answer (use with caution).
+
+        Bumps every tier generation instead of FLUSHDB, so collection versions and
+        in-flight leases survive and nothing blocks Redis. Rerank LRUs and the semantic
+        collection key their entries by generation too, so they miss at once.
+        """
+        self._bump_generations(list(NAMESPACED_TIERS) + [SEMANTIC_TIER], pattern=None)
     
     def get_stats(self) -> dict:
-        """Get cache statistics."""
+        """Get cache statistics.
+
+        ``tiers`` holds this application's counters per tier summed over every process
+        (hits, misses, latencies, payload bytes, L1 evictions); ``process`` the same for
+        this process only. ``server`` keeps Redis's own keyspace counters, which cover
+        every client of the server and are no measure of this cache's hit rate.
+        """
+        stats = {
+            'tiers': self.metrics.get_stats(),
+            'process': self.metrics.local_stats(),
+            'l1': {**self.local.get_stats(), **self.bus.stats} if self.local is not None else None
+        }
         try:
             info = self.client.info('stats')
-            return {
+            stats.update({
                 'total_keys': self.client.dbsize(),
-                'hits': info.get('keyspace_hits', 0),
-                'misses': info.get('keyspace_misses', 0),
-                'hit_rate': info.get('keyspace_hits', 0) / max(info.get('keyspace_hits', 0) + info.get('keyspace_misses', 1), 1)
-            }
+                'server': {
+                    'keyspace_hits': info.get('keyspace_hits', 0),
+                    'keyspace_misses': info.get('keyspace_misses', 0),
+                    'evicted_keys': info.get('evicted_keys', 0)
+                },
+                'circuit': self.client.breaker.state if hasattr(self.client, 'breaker') else None
+            })
         except Exception as e:
             print(f"Stats error: {e}")
-            return {}
+        return stats
+
+# Global cache instance
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> RedisCache:
+    """Get or create the process-wide RedisCache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = RedisCache()
+    return _cache
@@ -0,0 +1,161 @@
+import os
+import time
+import threading
+from typing import Dict, Optional, Tuple
+import redis
+from redis.backoff import NoBackoff
+from redis.retry import Retry
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+# Cache calls must fail fast: a slow Redis should cost milliseconds, not seconds
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.25"))
+# SCAN/UNLINK sweeps and large pipelines run on their own pool with a longer timeout
+REDIS_BULK_SOCKET_TIMEOUT = float(os.getenv("REDIS_BULK_SOCKET_TIMEOUT", "5"))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "0.25"))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+# Consecutive failures that open the breaker, and seconds before a trial call
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("REDIS_BREAKER_FAILURES", "3"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("REDIS_BREAKER_RESET", "30"))
+
+
+class CircuitOpenError(redis.ConnectionError):
+    """Raised instead of contacting Redis while the breaker is open."""
+
+
+class CircuitBreaker:
+    """Closed -> open after ``failure_threshold`` consecutive failures; after
+    ``reset_timeout`` one trial call is let through (half-open) and its outcome
+    closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+        self.stats = {"opened": 0, "rejected": 0}
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return
+            self.stats["rejected"] += 1
+        raise CircuitOpenError("Redis circuit open, skipping cache")
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    print(f"Redis unavailable after {self.failures} failures; caching disabled for "
+                          f"{self.reset_timeout:.0f}s")
+                    self.stats["opened"] += 1
+                # A failed trial call re-opens the circuit for another reset_timeout
+                self.opened_at = time.monotonic()
+                self._trial_running = False
+
+
+class _GuardedPipeline:
+    def __init__(self, pipeline, guard: "GuardedRedis"):
+        self._pipeline = pipeline
+        self._guard = guard
+
+    def execute(self, *args, **kwargs):
+        return self._guard._call(self._pipeline.execute, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._pipeline, name)
+
+
+class GuardedRedis:
+    """Redis client whose commands go through a circuit breaker.
+
+    Connection errors and timeouts count as failures; while the circuit is open every
+    command raises CircuitOpenError immediately, which the cache tiers treat as a miss.
+    """
+
+    def __init__(self, client: redis.Redis, breaker: CircuitBreaker):
+        self._client = client
+        self.breaker = breaker
+
+    def _call(self, fn, *args, **kwargs):
+        self.breaker.before_call()
+        failed = False
+        try:
+            return fn(*args, **kwargs)
+        except (redis.ConnectionError, redis.TimeoutError):
+            failed = True
+            raise
+        finally:
+            # Any other error (e.g. WRONGTYPE) means Redis answered; either way a
+            # half-open trial ends here
+            if failed:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+
+    def pipeline(self, *args, **kwargs):
+        return _GuardedPipeline(self._client.pipeline(*args, **kwargs), self)
+
+    def pubsub(self, **kwargs):
+        # Subscriptions are long-lived and reconnect on their own; they bypass the breaker
+        return self._client.pubsub(**kwargs)
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+        return lambda *args, **kwargs: self._call(attr, *args, **kwargs)
+
+
+_clients: Dict[Tuple[str, bool], GuardedRedis] = {}
+_clients_lock = threading.Lock()
+
+def _connect(url: str, socket_timeout: float, breaker: CircuitBreaker) -> GuardedRedis:
+    pool = redis.ConnectionPool.from_url(
+        url,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        socket_timeout=socket_timeout,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+        # No client-side retries: the breaker decides when to try again
+        retry=Retry(NoBackoff(), 0)
+    )
+    return GuardedRedis(redis.Redis(connection_pool=pool), breaker)
+
+def get_redis_client(redis_url: Optional[str] = None, bulk: bool = False) -> GuardedRedis:
+    """Process-wide pooled client per URL (default REDIS_URL), shared by all cache tiers.
+
+    ``bulk=True`` returns the client for reaper sweeps and large pipelines: its own pool
+    with REDIS_BULK_SOCKET_TIMEOUT, sharing the request client's circuit breaker.
+    """
+    url = redis_url or REDIS_URL
+    if (url, bulk) not in _clients:
+        with _clients_lock:
+            if (url, False) not in _clients:
+                _clients[(url, False)] = _connect(url, REDIS_SOCKET_TIMEOUT, CircuitBreaker())
+            if (url, True) not in _clients:
+                _clients[(url, True)] = _connect(url, REDIS_BULK_SOCKET_TIMEOUT, _clients[(url, False)].breaker)
+    return _clients[(url, bulk)]
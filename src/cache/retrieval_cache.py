@@ -0,0 +1,88 @@
+import os
+import json
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from .redis_cache import RedisCache, get_cache
+
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", "3600"))
+
+VERSION_KEY = "collection_version:{}"
+
+
+class RetrievalResultCache:
+    """Ranked retrieval results keyed by normalised query and collection versions.
+
+    An entry stores only point ids and scores, per collection; callers rehydrate the
+    payloads with one batched ``retrieve`` per collection. Every collection has a
+    version counter that ingestion bumps, and the versions are part of the key, so
+    results computed before new data arrived are never served.
+    """
+
+    def __init__(self, cache: RedisCache, ttl: Optional[int] = None):
+        self.cache = cache
+        self.ttl = ttl or RESULT_CACHE_TTL
+        self.stats = {"hits": 0, "misses": 0}
+
+    # ----- Collection versions -----
+
+    def versions(self, collections: Iterable[str]) -> Dict[str, int]:
+        names = sorted(collections)
+        values = self.cache.client.mget([VERSION_KEY.format(name) for name in names])
+        return {name: int(value or 0) for name, value in zip(names, values)}
+
+    def bump_version(self, collection: str) -> int:
+        """Invalidates every cached result that includes ``collection``."""
+        return int(self.cache.client.incr(VERSION_KEY.format(collection)))
+
+    # ----- Results -----
+
+    def key(self, query: str, collections: Iterable[str], params: Optional[Dict[str, Any]] = None) -> str:
+        """Cache key for ``query`` over ``collections`` at their current versions.
+
+        ``params`` holds everything else that changes the ranking (top_n, filters, rerank mode).
+        """
+        versions = ",".join(f"{name}@{version}" for name, version in self.versions(collections).items())
+        spec = json.dumps(params or {}, sort_keys=True, default=str)
+        # Only the query is normalised; filters match exactly, so "GPT-3" and "gpt-3" differ
+        text = f"{self.cache.normalizer.normalize(query)}|{versions}|{spec}"
+        return f"{self.cache._prefix('retrieval')}:{self.cache._hash_key(text)}"
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Ranked entries (``collection``, ``id``, scores) or None on a miss."""
+        start = time.perf_counter()
+        try:
+            cached = self.cache.client.get(key)
+        except Exception as e:
+            print(f"Result cache get error: {e}")
+            self.cache.metrics.record("retrieval", "errors")
+            cached = None
+        self.cache.metrics.observe("retrieval", "get", time.perf_counter() - start, len(cached or b""))
+        if cached is None:
+            self.stats["misses"] += 1
+            self.cache.metrics.record("retrieval", "misses")
+            return None
+        self.stats["hits"] += 1
+        self.cache.metrics.record("retrieval", "l2_hits")
+        return json.loads(cached)
+
+    def set(self, key: str, entries: List[Dict[str, Any]]):
+        value = json.dumps(entries)
+        start = time.perf_counter()
+        try:
+            self.cache.client.setex(key, self.ttl, value)
+            self.cache.metrics.observe("retrieval", "set", time.perf_counter() - start, len(value))
+        except Exception as e:
+            self.cache.metrics.record("retrieval", "errors")
+            print(f"Result cache set error: {e}")
+
+
+def bump_collection_version(collection: str, cache: Optional[RedisCache] = None) -> Optional[int]:
+    """Marks ``collection`` as changed so cached retrieval results over it are no longer served."""
+    try:
+        version = RetrievalResultCache(cache or get_cache()).bump_version(collection)
+        print(f"Collection '{collection}' is now at version {version}")
+        return version
+    except Exception as e:
+        print(f"Could not bump version of '{collection}': {e}")
+        return None
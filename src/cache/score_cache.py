@@ -0,0 +1,92 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+from .normalize import QueryNormalizer, get_normalizer
+from .redis_cache import RedisCache
+
+class RerankScoreCache:
+    """CrossEncoder pair scores keyed by (normalised query, chunk key).
+
+    Chunk keys carry a hash of the chunk text (``rerank.score_key``), so scores never
+    outlive a re-ingest that reuses point ids. Query keys carry the ``rerank`` tier
+    generation, so ``invalidate_tier("rerank")`` or ``clear_all`` also retires LRU entries.
+
+    An in-process LRU sits in front of Redis; Redis holds one hash per query so a
+    whole candidate list is fetched with a single HMGET.
+    """
+
+    def __init__(self, cache: Optional[RedisCache] = None, model_id: str = "",
+                 max_entries: int = 20000, ttl: Optional[int] = None,
+                 normalizer: Optional[QueryNormalizer] = None):
+        self.cache = cache
+        self.normalizer = normalizer or (cache.normalizer if cache else get_normalizer())
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.ttl = ttl or (cache.VECTOR_TTL if cache else 86400)
+
+        self._lru: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"local_hits": 0, "redis_hits": 0, "misses": 0}
+
+    def _query_key(self, query: str) -> str:
+        text = f"{self.model_id}|{self.normalizer.normalize(query)}"
+        generation = self.cache.generations.get("rerank") if self.cache else 0
+        return f"{self.normalizer.version}:g{generation}:{hashlib.sha256(text.encode()).hexdigest()[:16]}"
+
+    def _remember(self, qkey: str, scores: Dict[str, float]):
+        with self._lock:
+            for doc_key, score in scores.items():
+                self._lru[(qkey, doc_key)] = score
+                self._lru.move_to_end((qkey, doc_key))
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def get_many(self, query: str, doc_keys: Iterable[str]) -> Dict[str, float]:
+        """Returns cached scores for the given chunk keys; misses are simply absent."""
+        qkey = self._query_key(query)
+        found: Dict[str, float] = {}
+        missing = []
+        with self._lock:
+            for doc_key in doc_keys:
+                score = self._lru.get((qkey, doc_key))
+                if score is None:
+                    missing.append(doc_key)
+                else:
+                    self._lru.move_to_end((qkey, doc_key))
+                    found[doc_key] = score
+        self.stats["local_hits"] += len(found)
+
+        from_redis: Dict[str, float] = {}
+        if missing and self.cache:
+            try:
+                values = self.cache.client.hmget(f"rerank:{qkey}", missing)
+                from_redis = {k: float(v) for k, v in zip(missing, values) if v is not None}
+            except Exception as e:
+                print(f"Rerank cache get error: {e}")
+        if from_redis:
+            self._remember(qkey, from_redis)
+            found.update(from_redis)
+        self.stats["redis_hits"] += len(from_redis)
+        self.stats["misses"] += len(missing) - len(from_redis)
+        if self.cache:
+            self.cache.metrics.record("rerank", "l1_hits", len(found) - len(from_redis))
+            self.cache.metrics.record("rerank", "l2_hits", len(from_redis))
+            self.cache.metrics.record("rerank", "misses", len(missing) - len(from_redis))
+        return found
+
+    def set_many(self, query: str, scores: Dict[str, float]):
+        """Stores freshly computed pair scores in both tiers."""
+        if not scores:
+            return
+        qkey = self._query_key(query)
+        self._remember(qkey, scores)
+        if self.cache:
+            try:
+                key = f"rerank:{qkey}"
+                pipe = self.cache.client.pipeline()
+                pipe.hset(key, mapping={k: repr(float(v)) for k, v in scores.items()})
+                pipe.expire(key, self.ttl)
+                pipe.execute()
+            except Exception as e:
+                print(f"Rerank cache set error: {e}")
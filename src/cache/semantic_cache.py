@@ -0,0 +1,235 @@
+import os
+import re
+import time
+import uuid
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+from .normalize import normalize_query
+from .metrics import CacheMetrics
+from .redis_cache import RedisCache
+from .namespace import SEMANTIC_TIER
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_COLLECTION = os.getenv("SEMANTIC_CACHE_COLLECTION", "semantic_cache")
+# Cosine similarity a cached question needs to answer a new one
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "10000"))
+# Stores between evictions; the collection may exceed max_entries by this much meanwhile
+SEMANTIC_CACHE_EVICT_EVERY = int(os.getenv("SEMANTIC_CACHE_EVICT_EVERY", "100"))
+
+METRICS_TIER = "semantic"
+
+# Tokens that change the meaning of otherwise near-identical questions (GPT-3 vs GPT-4, 2022 vs 2023)
+_KEY_TERM_RE = re.compile(r"\w*\d[\w.\-]*")
+
+
+def key_terms(question: str) -> set:
+    return set(_KEY_TERM_RE.findall(question.lower()))
+
+
+@dataclass
+class SemanticHit:
+    answer: str
+    question: str  # the cached question that matched
+    similarity: float
+
+
+class SemanticAnswerCache:
+    """Tier 0 answer cache keyed by question meaning rather than exact text.
+
+    Question embeddings live in a Qdrant collection with the answer in the payload. A
+    lookup returns the nearest unexpired question above ``threshold``, unless the two
+    questions disagree on numbered terms such as model versions or years. Entries
+    expire by TTL; every ``evict_every`` stores, expired entries, entries from older
+    generations (``RedisCache.clear_all``) and the least recently hit ones past
+    ``max_entries`` are evicted. Hits and misses are recorded as the ``semantic`` tier
+    of the shared cache metrics.
+    """
+
+    def __init__(self, embed: Callable[[str], List[float]], client: Optional[QdrantClient] = None,
+                 cache: Optional[RedisCache] = None, collection_name: Optional[str] = None,
+                 threshold: Optional[float] = None, max_entries: Optional[int] = None,
+                 ttl: Optional[int] = None, web_ttl: Optional[int] = None,
+                 evict_every: Optional[int] = None):
+        self.embed = embed
+        self.client = client or QdrantClient(url=os.getenv("QDRANT_URL", "http://localhost:6333"))
+        self.cache = cache
+        self.collection_name = collection_name or SEMANTIC_CACHE_COLLECTION
+        self.threshold = threshold if threshold is not None else SEMANTIC_CACHE_THRESHOLD
+        self.max_entries = max_entries if max_entries is not None else SEMANTIC_CACHE_MAX_ENTRIES
+        self.ttl = ttl if ttl is not None else (cache.ANSWER_TTL if cache else 3600)
+        self.web_ttl = web_ttl if web_ttl is not None else (cache.WEB_DATA_TTL if cache else 1800)
+        self.evict_every = evict_every if evict_every is not None else SEMANTIC_CACHE_EVICT_EVERY
+        # Counted in-process and flushed to Redis in the background with the other tiers
+        self.metrics = cache.metrics if cache else CacheMetrics()
+
+        self._ready = False
+        self._lock = threading.Lock()
+        self._stores = 0
+
+    @staticmethod
+    def _point_id(question: str) -> str:
+        return str(uuid.UUID(hashlib.sha256(normalize_query(question).encode()).hexdigest()[:32]))
+
+    def _ensure_collection(self, vector_size: int):
+        if self._ready:
+            return
+        with self._lock:
+            if self._ready:
+                return
+            if not self.client.collection_exists(self.collection_name):
+                self.client.create_collection(
+                    collection_name=self.collection_name,
+                    vectors_config=models.VectorParams(size=vector_size, distance=models.Distance.COSINE)
+                )
+                for field in ("expires_at", "last_hit_at"):
+                    self.client.create_payload_index(self.collection_name, field,
+                                                     field_schema=models.PayloadSchemaType.FLOAT)
+                self.client.create_payload_index(self.collection_name, "generation",
+                                                 field_schema=models.PayloadSchemaType.INTEGER)
+            self._ready = True
+
+    def _generation(self) -> int:
+        return self.cache.generations.get(SEMANTIC_TIER) if self.cache else 0
+
+    def _count(self, field: str, n: int = 1):
+        self.metrics.record(METRICS_TIER, field, n)
+
+    # ----- Lookup and store -----
+
+    def lookup(self, question: str, vector: Optional[List[float]] = None) -> Optional[SemanticHit]:
+        """Returns the cached answer of the closest paraphrase, or None."""
+        try:
+            vector = vector if vector is not None else self.embed(question)
+            self._ensure_collection(len(vector))
+            start = time.perf_counter()
+            points = self.client.query_points(
+                collection_name=self.collection_name,
+                query=np.asarray(vector, dtype=np.float32).tolist(),
+                limit=1,
+                score_threshold=self.threshold,
+                query_filter=models.Filter(must=[
+                    models.FieldCondition(key="expires_at", range=models.Range(gt=time.time())),
+                    models.FieldCondition(key="generation", match=models.MatchValue(value=self._generation()))
+                ]),
+                with_payload=True
+            ).points
+            self.metrics.observe(METRICS_TIER, "get", time.perf_counter() - start)
+        except Exception as e:
+            print(f"Semantic cache lookup error: {e}")
+            self._count("errors")
+            return None
+
+        if not points:
+            self._count("misses")
+            return None
+        point = points[0]
+        cached_question = point.payload.get("question", "")
+        if key_terms(question) != key_terms(cached_question):
+            print(f"Semantic cache: rejected '{cached_question[:30]}...' (different key terms)")
+            self._count("guard_rejections")
+            self._count("misses")
+            return None
+
+        self._count("l2_hits")
+        try:
+            # LRU bookkeeping for eviction
+            self.client.set_payload(self.collection_name, payload={"last_hit_at": time.time()},
+                                    points=[point.id])
+        except Exception as e:
+            print(f"Semantic cache touch error: {e}")
+        return SemanticHit(answer=point.payload.get("answer", ""), question=cached_question,
+                           similarity=float(point.score))
+
+    def store(self, question: str, answer: str, web: bool = False, vector: Optional[List[float]] = None):
+        """Caches an answer; web-sourced answers get the shorter freshness TTL."""
+        try:
+            vector = vector if vector is not None else self.embed(question)
+            self._ensure_collection(len(vector))
+            now = time.time()
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=[models.PointStruct(
+                    id=self._point_id(question),
+                    vector=np.asarray(vector, dtype=np.float32).tolist(),
+                    payload={
+                        "question": question,
+                        "answer": answer,
+                        "created_at": now,
+                        "last_hit_at": now,
+                        "expires_at": now + (self.web_ttl if web else self.ttl),
+                        "generation": self._generation(),
+                    }
+                )]
+            )
+            with self._lock:
+                self._stores += 1
+                due = self._stores >= self.evict_every
+                if due:
+                    self._stores = 0
+            if due:
+                self.evict()
+        except Exception as e:
+            print(f"Semantic cache store error: {e}")
+
+    def mark_false_hit(self, hit: SemanticHit):
+        """Records that a served answer did not fit the question and drops the entry."""
+        self._count("false_hits")
+        try:
+            self.client.delete(self.collection_name,
+                               points_selector=models.PointIdsList(points=[self._point_id(hit.question)]))
+        except Exception as e:
+            print(f"Semantic cache delete error: {e}")
+
+    # ----- Maintenance -----
+
+    def evict(self) -> int:
+        """Deletes expired and superseded entries, then the least recently hit ones beyond ``max_entries``."""
+        if not self._ready:
+            return 0
+        self.client.delete(
+            self.collection_name,
+            points_selector=models.FilterSelector(filter=models.Filter(should=[
+                models.FieldCondition(key="expires_at", range=models.Range(lte=time.time())),
+                models.Filter(must_not=[
+                    models.FieldCondition(key="generation", match=models.MatchValue(value=self._generation()))
+                ])
+            ]))
+        )
+        excess = self.client.count(self.collection_name, exact=True).count - self.max_entries
+        if excess <= 0:
+            return 0
+        oldest, _ = self.client.scroll(
+            self.collection_name,
+            limit=excess,
+            order_by=models.OrderBy(key="last_hit_at", direction=models.Direction.ASC),
+            with_payload=False
+        )
+        self.client.delete(self.collection_name,
+                           points_selector=models.PointIdsList(points=[p.id for p in oldest]))
+        return len(oldest)
+
+    def clear(self):
+        if self.client.collection_exists(self.collection_name):
+            self.client.delete_collection(self.collection_name)
+        self._ready = False
+
+    def get_stats(self) -> Dict:
+        """Hit, miss and false-hit counters with derived rates (all processes when Redis is shared)."""
+        tier = self.metrics.get_stats().get(METRICS_TIER, {})
+        stats = {
+            "hits": int(tier.get("hits", 0)),
+            "misses": int(tier.get("misses", 0)),
+            "guard_rejections": int(tier.get("guard_rejections", 0)),
+            "false_hits": int(tier.get("false_hits", 0)),
+            "avg_lookup_ms": tier.get("avg_get_ms", 0.0)
+        }
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["false_hit_rate"] = stats["false_hits"] / stats["hits"] if stats["hits"] else 0.0
+        return stats
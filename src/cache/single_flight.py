@@ -0,0 +1,207 @@
+import os
+import time
+import uuid
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+from .redis_cache import RedisCache
+
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+# The leader renews its lease every third of the TTL, so a crashed leader is noticed within one TTL
+SINGLE_FLIGHT_LEASE_TTL = float(os.getenv("SINGLE_FLIGHT_LEASE_TTL", "15"))
+# Followers give up and run the pipeline themselves after this long
+SINGLE_FLIGHT_MAX_WAIT = float(os.getenv("SINGLE_FLIGHT_MAX_WAIT", "120"))
+SINGLE_FLIGHT_POLL = float(os.getenv("SINGLE_FLIGHT_POLL", "0.5"))
+SINGLE_FLIGHT_CHANNEL = "inflight:done"
+
+# Delete and notify only if we still hold the lease (it may have expired and moved on)
+_RELEASE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    redis.call('del', KEYS[1])
+    redis.call('publish', ARGV[2], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+_RENEW = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class Lease:
+    """Right to compute one question. ``held`` is False when Redis was unreachable
+    and the caller runs without coordination; releasing such a lease is a no-op."""
+
+    def __init__(self, flight: "SingleFlight", key: str, token: Optional[str]):
+        self.flight = flight
+        self.key = key
+        self.token = token
+        self._stop = threading.Event()
+        if self.held:
+            threading.Thread(target=self._renew, name="single-flight-lease", daemon=True).start()
+
+    @property
+    def held(self) -> bool:
+        return self.token is not None
+
+    def _renew(self):
+        interval = self.flight.lease_ttl / 3
+        while not self._stop.wait(interval):
+            try:
+                if not self.flight.client.eval(_RENEW, 1, self.key, self.token,
+                                               int(self.flight.lease_ttl * 1000)):
+                    print(f"Lost single-flight lease {self.key}")
+                    return
+            except Exception as e:
+                print(f"Single-flight lease renewal error: {e}")
+
+    def release(self):
+        """Ends the lease and wakes the followers waiting on it."""
+        self._stop.set()
+        if not self.held:
+            return
+        try:
+            self.flight.client.eval(_RELEASE, 1, self.key, self.token, self.flight.channel(self.key))
+        except Exception as e:
+            # The lease still expires on its own; followers then take over
+            print(f"Single-flight release error: {e}")
+
+
+class SingleFlight:
+    """Coalesces identical concurrent questions across workers.
+
+    The first request takes a Redis lease (SET NX PX) on the normalised question and
+    runs the pipeline; the others wait for the lease to be released (pub/sub, with
+    polling as a fallback) and then read the answer from the cache. If the leader
+    dies, its lease stops being renewed and expires, and a follower takes over.
+    """
+
+    def __init__(self, cache: RedisCache, lease_ttl: float = SINGLE_FLIGHT_LEASE_TTL,
+                 max_wait: float = SINGLE_FLIGHT_MAX_WAIT, poll_interval: float = SINGLE_FLIGHT_POLL):
+        self.cache = cache
+        self.client = cache.client
+        self.lease_ttl = lease_ttl
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self.stats = {"leaders": 0, "followers": 0, "coalesced": 0, "takeovers": 0, "timeouts": 0}
+
+        self._waiters: Dict[str, List[threading.Event]] = {}
+        self._waiters_lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+
+    def key(self, question: str) -> str:
+        return self.cache._key("inflight", question)
+
+    @staticmethod
+    def channel(key: str) -> str:
+        return f"{SINGLE_FLIGHT_CHANNEL}:{key}"
+
+    # ----- Leader -----
+
+    def acquire(self, question: str) -> Optional[Lease]:
+        """A lease if this caller should compute the answer, None if another worker is."""
+        key = self.key(question)
+        token = uuid.uuid4().hex
+        try:
+            if not self.client.set(key, token, nx=True, px=int(self.lease_ttl * 1000)):
+                return None
+        except Exception as e:
+            print(f"Single-flight unavailable, running uncoordinated: {e}")
+            return Lease(self, key, None)
+        self.stats["leaders"] += 1
+        return Lease(self, key, token)
+
+    # ----- Followers -----
+
+    def _listen(self):
+        while True:
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(f"{SINGLE_FLIGHT_CHANNEL}:*")
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message["type"] == "pmessage":
+                        channel = message["channel"]
+                        if isinstance(channel, bytes):
+                            channel = channel.decode("utf-8")
+                        self._notify(channel[len(SINGLE_FLIGHT_CHANNEL) + 1:])
+            except Exception:
+                # Followers keep polling meanwhile
+                time.sleep(5.0)
+            finally:
+                try:
+                    if pubsub is not None:
+                        pubsub.close()
+                except Exception:
+                    pass
+
+    def _notify(self, key: str):
+        with self._waiters_lock:
+            for event in self._waiters.get(key, []):
+                event.set()
+
+    def _ensure_listener(self):
+        with self._waiters_lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name="single-flight", daemon=True)
+                self._listener.start()
+
+    def _wait(self, key: str, check: Callable[[], Optional[str]], deadline: float) -> Optional[str]:
+        """Waits until ``check`` finds the answer or the lease on ``key`` is gone."""
+        event = threading.Event()
+        with self._waiters_lock:
+            self._waiters.setdefault(key, []).append(event)
+        try:
+            while True:
+                answer = check()
+                if answer is not None:
+                    return answer
+                try:
+                    if not self.client.exists(key):
+                        # Released without an answer, or expired: look once more, then take over
+                        return check()
+                except Exception:
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                event.wait(min(self.poll_interval, remaining))
+                event.clear()
+        finally:
+            with self._waiters_lock:
+                self._waiters[key].remove(event)
+                if not self._waiters[key]:
+                    del self._waiters[key]
+
+    def join(self, question: str, check: Callable[[], Optional[str]]) -> Tuple[Optional[str], Optional[Lease]]:
+        """Either the answer another worker computed, or a lease to compute it here.
+
+        ``check`` reads the cached answer. Returns ``(answer, None)`` when coalesced and
+        ``(None, lease)`` otherwise; the caller must release the lease when done.
+        """
+        lease = self.acquire(question)
+        if lease is not None:
+            return None, lease
+
+        self.stats["followers"] += 1
+        self._ensure_listener()
+        key = self.key(question)
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            answer = self._wait(key, check, deadline)
+            if answer is not None:
+                self.stats["coalesced"] += 1
+                return answer, None
+            if time.monotonic() >= deadline:
+                print(f"Gave up waiting for in-flight answer to '{question[:30]}...'")
+                self.stats["timeouts"] += 1
+                return None, Lease(self, key, None)
+            lease = self.acquire(question)
+            if lease is not None:
+                # The leader crashed or failed before caching an answer
+                self.stats["takeovers"] += 1
+                return None, lease
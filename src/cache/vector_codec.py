@@ -0,0 +1,49 @@
+import os
+import struct
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Storage precision of cached embeddings: "float32" (exact) or "float16" (half the bytes)
+VECTOR_CACHE_DTYPE = os.getenv("VECTOR_CACHE_DTYPE", "float32")
+
+MAGIC = b"RV"
+FORMAT_VERSION = 1
+DTYPES = {"float32": (0, np.dtype("<f4")), "float16": (1, np.dtype("<f2"))}
+_BY_CODE = {code: dtype for code, dtype in DTYPES.values()}
+
+# magic, format version, dtype code, model id length, dimension
+_HEADER = struct.Struct("<2sBBBxI")
+
+
+class VectorFormatError(ValueError):
+    """Raised for cache values that are not encoded vectors."""
+
+
+def encode_vector(vector, model_id: str = "", dtype: Optional[str] = None) -> bytes:
+    """Header (dimension, dtype, model id) followed by raw little-endian floats.
+
+    The model id is padded so the float data starts 4-byte aligned.
+    """
+    code, np_dtype = DTYPES[dtype or VECTOR_CACHE_DTYPE]
+    array = np.asarray(vector, dtype=np_dtype).ravel()
+    model = model_id.encode("utf-8")[:255]
+    padding = b"\0" * (-(_HEADER.size + len(model)) % 4)
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, code, len(model), array.size) + model + padding + array.tobytes()
+
+
+def decode_vector(data: bytes) -> Tuple[np.ndarray, str]:
+    """Returns a read-only NumPy view over ``data`` (no copy) and the stored model id."""
+    if len(data) < _HEADER.size:
+        raise VectorFormatError("value too short for a vector header")
+    magic, version, code, model_len, dim = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION or code not in _BY_CODE:
+        raise VectorFormatError("not an encoded vector")
+    model_end = _HEADER.size + model_len
+    offset = model_end + (-model_end % 4)
+    model_id = bytes(data[_HEADER.size:model_end]).decode("utf-8")
+    return np.frombuffer(data, dtype=_BY_CODE[code], count=dim, offset=offset), model_id
+
+
+def is_encoded(data: bytes) -> bool:
+    return data[:len(MAGIC)] == MAGIC
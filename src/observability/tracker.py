@@ -12,27 +12,40 @@ class RAGTracker:
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(exist_ok=True)
         
-        self.current_run = None
+        self._local = threading.local()
         self.lock = threading.Lock()
+    
+    @property
+    def current_run(self) -> Optional[Dict]:
+        """Run of the calling thread, so concurrent requests and background refreshes log separately."""
+        return getattr(self._local, "run", None)
+    
+    @current_run.setter
+    def current_run(self, run: Optional[Dict]):
+        self._local.run = run
         
-    def start_run(self, question: str) -> str:
-        """Start tracking a new query run."""
+    def start_run(self, question: str, refresh: bool = False) -> str:
+        """Start tracking a new query run; ``refresh`` marks a background recomputation."""
         run_id = f"run_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
         
         with self.lock:
             self.current_run = {
                 "run_id": run_id,
                 "question": question,
+                "refresh": refresh,
                 "start_time": time.time(),
                 "steps": [],
                 "metrics": {
                     "total_tokens": 0,
+                    "rerank_pairs": 0,
                     "retrieval_time": 0,
                     "generation_time": 0,
                     "total_time": 0
                 },
                 "final_answer": None,
-                "cache_hit": False
+                "cache_hit": False,
+                "cache_tier": None,
+                "cache_stale": False
             }
         
         return run_id
@@ -59,6 +72,19 @@ class RAGTracker:
                 "timestamp": time.time()
             })
     
+    def log_rerank(self, stats: Dict):
+        """Log reranker work for this query (decision, candidates, pairs scored)."""
+        if not self.current_run:
+            return
+            
+        with self.lock:
+            self.current_run["steps"].append({
+                "step": "rerank",
+                **stats,
+                "timestamp": time.time()
+            })
+            self.current_run["metrics"]["rerank_pairs"] += stats.get("pairs_scored", 0)
+    
     def log_generation(self, answer: str, tokens: int = 0):
         """Log answer generation."""
         if not self.current_run:
@@ -122,14 +148,23 @@ class RAGTracker:
             self.current_run["metrics"]["total_tokens"] += tokens
             self.current_run["final_answer"] = final_answer
     
-    def log_cache_hit(self, answer: str):
-        """Log cache hit."""
+    def log_cache_hit(self, answer: str, tier: str = "exact", similarity: Optional[float] = None,
+                      matched_question: Optional[str] = None, stale: bool = False):
+        """Log cache hit; semantic hits also record the matched question and its similarity.
+
+        ``stale`` marks an answer past its soft TTL that was served while being refreshed.
+        """
         if not self.current_run:
             return
             
         with self.lock:
             self.current_run["cache_hit"] = True
+            self.current_run["cache_tier"] = tier
+            self.current_run["cache_stale"] = stale
             self.current_run["final_answer"] = answer
+            if similarity is not None:
+                self.current_run["cache_similarity"] = similarity
+                self.current_run["cache_matched_question"] = matched_question
     
     def end_run(self) -> Dict:
         """End run and save log."""
@@ -158,7 +193,7 @@ class RAGTracker:
         if not all_logs:
             return {}
         
-        total_runs = len(all_logs)
+        total_runs = 0
         cache_hits = 0
         avg_time = 0
         avg_tokens = 0
@@ -167,6 +202,9 @@ class RAGTracker:
             try:
                 with open(log_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
+                    if data.get("refresh"):
+                        continue  # background refreshes answer no request
+                    total_runs += 1
                     if data.get("cache_hit"):
                         cache_hits += 1
                     avg_time += data.get("metrics", {}).get("total_time", 0)
@@ -0,0 +1,174 @@
+import os
+import time
+import queue
+import bisect
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+BATCHING_ENABLED = os.getenv("BATCHING_ENABLED", "false").lower() == "true"
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "32"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "5"))
+
+WAIT_BUCKETS_MS = [0.5, 1, 2, 5, 10, 20, 50, 100, float("inf")]
+SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, float("inf")]
+
+
+class Histogram:
+    """Fixed-bucket histogram; each count is for values <= the bucket bound."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = list(bounds)
+        self.counts = [0] * len(self.bounds)
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.n += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "buckets": {("+Inf" if b == float("inf") else str(b)): c for b, c in zip(self.bounds, self.counts)},
+            "count": self.n,
+            "mean": self.total / self.n if self.n else 0.0,
+        }
+
+
+class _Request:
+    __slots__ = ("items", "future", "enqueued")
+
+    def __init__(self, items: list):
+        self.items = items
+        self.future: Future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class MicroBatcher:
+    """Collects work from concurrent callers and runs it as one forward pass.
+
+    A batch is closed when ``max_batch_size`` items are queued or ``max_wait_ms`` has
+    passed since its first request. ``fn`` maps a list of items to a list of results
+    of the same length; each caller gets its own slice back through a future.
+    """
+
+    def __init__(self, fn: Callable[[list], Sequence], max_batch_size: int = BATCH_MAX_SIZE,
+                 max_wait_ms: float = BATCH_MAX_WAIT_MS, name: str = "batcher"):
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.queue_wait_ms = Histogram(WAIT_BUCKETS_MS)
+        self.batch_size = Histogram(SIZE_BUCKETS)
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._start_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._worker.start()
+
+    def submit(self, items: list) -> Future:
+        """Queues items; the future resolves to their results in order."""
+        request = _Request(list(items))
+        if not request.items:
+            request.future.set_result([])
+            return request.future
+        self._ensure_worker()
+        self._queue.put(request)
+        return request.future
+
+    def __call__(self, items: list) -> list:
+        return self.submit(items).result()
+
+    def _collect(self) -> List[_Request]:
+        batch = [self._queue.get()]
+        size = len(batch[0].items)
+        deadline = batch[0].enqueued + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.items)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            items = [item for request in batch for item in request.items]
+
+            with self._stats_lock:
+                self.batch_size.observe(len(items))
+                for request in batch:
+                    self.queue_wait_ms.observe((started - request.enqueued) * 1000)
+
+            try:
+                results = self.fn(items)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            offset = 0
+            for request in batch:
+                request.future.set_result(results[offset:offset + len(request.items)])
+                offset += len(request.items)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "queue_wait_ms": self.queue_wait_ms.to_dict(),
+                "batch_size": self.batch_size.to_dict(),
+            }
+
+
+class BatchedEmbedder:
+    """SentenceTransformer stand-in whose ``encode`` goes through a MicroBatcher.
+
+    Calls with extra encode options bypass the batcher; every other attribute is
+    forwarded to the wrapped model.
+    """
+
+    def __init__(self, model, **batcher_kwargs):
+        self.model = model
+        self.batcher = MicroBatcher(lambda texts: self.model.encode(texts), name="embed-batcher", **batcher_kwargs)
+
+    def encode(self, sentences, **kwargs):
+        if kwargs:
+            return self.model.encode(sentences, **kwargs)
+        single = isinstance(sentences, str)
+        results = self.batcher([sentences] if single else sentences)
+        return results[0] if single else np.asarray(results)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+class BatchedReranker:
+    """CrossEncoder stand-in whose ``predict`` goes through a MicroBatcher."""
+
+    def __init__(self, model, **batcher_kwargs):
+        self.model = model
+        self.batcher = MicroBatcher(lambda pairs: self.model.predict(pairs), name="rerank-batcher", **batcher_kwargs)
+
+    def predict(self, pairs, **kwargs):
+        if kwargs:
+            return self.model.predict(pairs, **kwargs)
+        return np.asarray(self.batcher(pairs))
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
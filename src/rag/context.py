@@ -0,0 +1,127 @@
+import os
+import re
+from typing import List, Optional, Set, Tuple
+from langchain_core.documents import Document
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+# Counts are estimates of the generator's (Gemini) tokenizer; this share of the
+# budget is held back so an undercount cannot overflow it
+CONTEXT_TOKEN_HEADROOM = float(os.getenv("CONTEXT_TOKEN_HEADROOM", "0.15"))
+SEPARATOR = "\n\n"
+
+_WORD_RE = re.compile(r"\w+")
+
+
+class TokenCounter:
+    """Estimates token counts: tiktoken when installed, else ~4 chars/token.
+
+    The generator is Gemini, whose tokenizer is only reachable through a remote
+    ``count_tokens`` call (one round trip per chunk). cl100k_base is a close local
+    stand-in, so counts are approximate; ContextPacker keeps headroom for that.
+    """
+
+    def __init__(self, encoding: str = "cl100k_base"):
+        try:
+            import tiktoken
+            self._encoding = tiktoken.get_encoding(encoding)
+        except Exception as e:
+            print(f"tiktoken unavailable, estimating token counts: {e}")
+            self._encoding = None
+
+    def count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return (len(text) + 3) // 4
+
+
+def _shingles(text: str, n: int = 3) -> Set[Tuple[str, ...]]:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < n:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+
+def _overlap(left: str, right: str, min_overlap: int, max_overlap: int) -> int:
+    """Length of the longest suffix of ``left`` that is also a prefix of ``right``."""
+    for size in range(min(len(left), len(right), max_overlap), min_overlap - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+class ContextPacker:
+    """Builds the LLM context from reranked chunks under a token budget.
+
+    Chunks are taken in rerank order. Text shared with an already packed neighbour
+    chunk (splitter overlap) is trimmed, near-duplicates by word-shingle Jaccard are
+    dropped, and packing stops adding chunks once the budget, less ``headroom``, is full.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None, near_duplicate_threshold: float = 0.8,
+                 min_overlap: int = 20, max_overlap: int = 200, counter: Optional[TokenCounter] = None,
+                 headroom: Optional[float] = None):
+        self.max_tokens = max_tokens or CONTEXT_TOKEN_BUDGET
+        self.headroom = CONTEXT_TOKEN_HEADROOM if headroom is None else headroom
+        # Estimated tokens actually packed
+        self.limit = int(self.max_tokens * (1 - self.headroom))
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.min_overlap = min_overlap
+        self.max_overlap = max_overlap
+        self.counter = counter or TokenCounter()
+
+    @staticmethod
+    def _score(doc: Document) -> float:
+        meta = doc.metadata
+        score = meta.get("rerank_score")
+        if score is None:
+            # Retrieval scores of different sources are only comparable once merged
+            score = meta.get("merge_score", meta.get("retrieval_score"))
+        return score if score is not None else float("-inf")
+
+    def _trim_overlap(self, text: str, kept: List[str]) -> str:
+        for other in kept:
+            head = _overlap(other, text, self.min_overlap, self.max_overlap)
+            if head:
+                text = text[head:]
+            tail = _overlap(text, other, self.min_overlap, self.max_overlap)
+            if tail:
+                text = text[:-tail]
+        return text.strip()
+
+    def _is_near_duplicate(self, shingles: Set, kept_shingles: List[Set]) -> bool:
+        if not shingles:
+            return True
+        for other in kept_shingles:
+            common = len(shingles & other)
+            if common / len(shingles | other) >= self.near_duplicate_threshold:
+                return True
+            # Chunk is (almost) entirely contained in one already packed
+            if common / len(shingles) >= self.near_duplicate_threshold:
+                return True
+        return False
+
+    def pack(self, docs: List[Document]) -> Tuple[str, List[Document]]:
+        """Returns the packed context string and the documents it was built from."""
+        kept_texts: List[str] = []
+        kept_shingles: List[Set] = []
+        packed: List[Document] = []
+        used = 0
+        sep_tokens = self.counter.count(SEPARATOR)
+
+        for doc in sorted(docs, key=self._score, reverse=True):
+            text = self._trim_overlap(doc.page_content.strip(), kept_texts)
+            shingles = _shingles(text)
+            if self._is_near_duplicate(shingles, kept_shingles):
+                continue
+
+            cost = self.counter.count(text) + (sep_tokens if packed else 0)
+            if used + cost > self.limit:
+                # A shorter, lower-ranked chunk may still fit
+                continue
+
+            used += cost
+            kept_texts.append(text)
+            kept_shingles.append(shingles)
+            packed.append(Document(page_content=text, metadata={**doc.metadata, "context_tokens": cost}))
+
+        return SEPARATOR.join(kept_texts), packed
@@ -0,0 +1,95 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Union
+from qdrant_client.http import models
+
+DateLike = Union[datetime, str]
+
+# Payload fields indexed at ingestion, with their Qdrant index types
+PAYLOAD_INDEXES = {
+    "source": models.PayloadSchemaType.KEYWORD,
+    "title": models.PayloadSchemaType.KEYWORD,
+    "published": models.PayloadSchemaType.DATETIME,
+}
+
+
+def _parse_date(value: DateLike) -> datetime:
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    # Treat naive timestamps as UTC so they compare with stored offsets
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class RetrievalFilter:
+    """Payload restrictions for a retrieval call.
+
+    ``source`` and ``title`` match exactly (a list matches any of its values);
+    ``published_after`` / ``published_before`` bound the publication date inclusively.
+    """
+    source: Optional[Union[str, List[str]]] = None
+    title: Optional[Union[str, List[str]]] = None
+    published_after: Optional[DateLike] = None
+    published_before: Optional[DateLike] = None
+
+    @classmethod
+    def recent(cls, days: int, source: Optional[str] = None) -> "RetrievalFilter":
+        """Only chunks published in the last ``days`` days (from the start of today, UTC).
+
+        Day granularity keeps the filter stable within a day so its results can be cached.
+        """
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        return cls(source=source, published_after=today - timedelta(days=days))
+
+    def is_empty(self) -> bool:
+        return all(v is None for v in (self.source, self.title, self.published_after, self.published_before))
+
+    @staticmethod
+    def _match(key: str, value: Union[str, List[str]]) -> models.FieldCondition:
+        if isinstance(value, (list, tuple, set)):
+            return models.FieldCondition(key=key, match=models.MatchAny(any=list(value)))
+        return models.FieldCondition(key=key, match=models.MatchValue(value=value))
+
+    def to_qdrant(self) -> Optional[models.Filter]:
+        """Qdrant filter; indexed fields let Qdrant pre-filter during HNSW search."""
+        if self.is_empty():
+            return None
+        must = []
+        if self.source is not None:
+            must.append(self._match("source", self.source))
+        if self.title is not None:
+            must.append(self._match("title", self.title))
+        if self.published_after is not None or self.published_before is not None:
+            must.append(models.FieldCondition(
+                key="published",
+                range=models.DatetimeRange(
+                    gte=_parse_date(self.published_after) if self.published_after is not None else None,
+                    lte=_parse_date(self.published_before) if self.published_before is not None else None
+                )
+            ))
+        return models.Filter(must=must)
+
+    def matches(self, payload: Dict[str, Any]) -> bool:
+        """Same semantics as ``to_qdrant``, evaluated in Python (for the local index)."""
+        for key, expected in (("source", self.source), ("title", self.title)):
+            if expected is None:
+                continue
+            allowed = expected if isinstance(expected, (list, tuple, set)) else [expected]
+            if payload.get(key) not in allowed:
+                return False
+
+        if self.published_after is not None or self.published_before is not None:
+            published = payload.get("published")
+            if not published:
+                return False
+            try:
+                date = _parse_date(published)
+            except ValueError:
+                return False
+            if self.published_after is not None and date < _parse_date(self.published_after):
+                return False
+            if self.published_before is not None and date > _parse_date(self.published_before):
+                return False
+        return True
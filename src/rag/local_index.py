@@ -0,0 +1,265 @@
+import os
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", "data/local_index")
+SEARCH_CHUNK_ROWS = 65536
+
+
+@dataclass
+class LocalPoint:
+    """Search hit with the same fields HybridRetriever reads from a Qdrant ScoredPoint."""
+    id: Any
+    score: float
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+
+class LocalIndex:
+    """Embedded, memory-mapped dense index for one collection.
+
+    Vectors are L2-normalised at build time and stored as a float32 or float16 .npy
+    matrix that is memory-mapped on load, so cosine search is a vectorised
+    matrix-vector product. An HNSW graph (hnswlib) is used when it was built and the
+    package is installed; otherwise search is exact.
+    """
+
+    def __init__(self, path: str, ids: List[Any], vectors: np.ndarray, payloads: List[Dict[str, Any]],
+                 hnsw=None):
+        self.path = path
+        self.ids = ids
+        self.vectors = vectors
+        self.payloads = payloads
+        self.hnsw = hnsw
+        self._rows: Optional[Dict[Any, int]] = None
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+    # ----- Building -----
+
+    @classmethod
+    def build(cls, path: str, ids: List[Any], vectors, payloads: List[Dict[str, Any]],
+              dtype: str = "float32", hnsw: bool = False) -> "LocalIndex":
+        """Writes an index to ``path`` and returns it loaded (memory-mapped)."""
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported dtype '{dtype}', expected float32 or float16")
+        os.makedirs(path, exist_ok=True)
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.maximum(norms, 1e-12)
+
+        # Write then rename so a reader never maps a half-written or truncated file
+        tmp_path = os.path.join(path, "vectors.tmp.npy")
+        np.save(tmp_path, matrix.astype(dtype))
+        os.replace(tmp_path, os.path.join(path, "vectors.npy"))
+        with open(os.path.join(path, "ids.json"), "w", encoding="utf-8") as f:
+            json.dump(list(ids), f)
+        with open(os.path.join(path, "payloads.jsonl"), "w", encoding="utf-8") as f:
+            for payload in payloads:
+                f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+
+        built_hnsw = False
+        if hnsw and len(matrix):
+            try:
+                import hnswlib
+                graph = hnswlib.Index(space="ip", dim=matrix.shape[1])
+                graph.init_index(max_elements=len(matrix), ef_construction=200, M=16)
+                graph.add_items(matrix, np.arange(len(matrix)))
+                graph.save_index(os.path.join(path, "hnsw.bin"))
+                built_hnsw = True
+            except ImportError:
+                print("hnswlib not installed; index will use exact search")
+
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"dim": int(matrix.shape[1]) if matrix.ndim == 2 else 0, "dtype": dtype,
+                       "count": len(payloads), "hnsw": built_hnsw}, f)
+        return cls.load(path)
+
+    @classmethod
+    def from_qdrant(cls, client, collection_name: str, path: str, dtype: str = "float32",
+                    hnsw: bool = False, batch_size: int = 256) -> "LocalIndex":
+        """Exports a Qdrant collection (dense vectors + payloads) into a local index."""
+        ids, vectors, payloads = [], [], []
+        offset = None
+        while True:
+            points, offset = client.scroll(
+                collection_name=collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+            for point in points:
+                vector = point.vector
+                if isinstance(vector, dict):  # named vectors: the dense one is unnamed
+                    vector = vector.get("")
+                ids.append(point.id)
+                vectors.append(vector)
+                payloads.append(point.payload or {})
+            if offset is None:
+                break
+        print(f"Exported {len(ids)} points from '{collection_name}'")
+        return cls.build(path, ids, vectors, payloads, dtype=dtype, hnsw=hnsw)
+
+    # ----- Loading and search -----
+
+    @classmethod
+    def load(cls, path: str) -> "LocalIndex":
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        with open(os.path.join(path, "ids.json"), encoding="utf-8") as f:
+            ids = json.load(f)
+        with open(os.path.join(path, "payloads.jsonl"), encoding="utf-8") as f:
+            payloads = [json.loads(line) for line in f if line.strip()]
+
+        graph = None
+        if meta.get("hnsw"):
+            try:
+                import hnswlib
+                graph = hnswlib.Index(space="ip", dim=meta["dim"])
+                graph.load_index(os.path.join(path, "hnsw.bin"), max_elements=meta["count"])
+                graph.set_ef(int(os.getenv("LOCAL_HNSW_EF", "64")))
+            except ImportError:
+                print("hnswlib not installed; using exact search")
+        return cls(path, ids, vectors, payloads, hnsw=graph)
+
+    def _exact(self, query: np.ndarray, limit: int, allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        scores = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), SEARCH_CHUNK_ROWS):
+            block = self.vectors[start:start + SEARCH_CHUNK_ROWS]
+            scores[start:start + len(block)] = block.astype(np.float32, copy=False) @ query
+        if allowed is not None:
+            scores = scores[allowed]
+            limit = min(limit, len(scores))
+        if limit < len(scores):
+            top = np.argpartition(-scores, limit)[:limit]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        rows = allowed[top] if allowed is not None else top
+        return rows, scores[top]
+
+    def search(self, query_vector, limit: int = 10,
+               predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[LocalPoint]:
+        """Cosine similarity search; returns hits sorted by score.
+
+        ``predicate`` restricts the search to points whose payload it accepts.
+        """
+        if not len(self):
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        allowed = None
+        if predicate is not None:
+            allowed = np.array([i for i, p in enumerate(self.payloads) if predicate(p)], dtype=np.int64)
+            if not len(allowed):
+                return []
+        limit = min(limit, len(self) if allowed is None else len(allowed))
+
+        rows = None
+        if self.hnsw is not None:
+            label_filter = None
+            if allowed is not None:
+                allowed_set = set(allowed.tolist())
+                label_filter = lambda label: label in allowed_set
+            try:
+                labels, distances = self.hnsw.knn_query(query, k=limit, filter=label_filter)
+                rows, scores = labels[0], 1.0 - distances[0]  # hnswlib "ip" distance is 1 - dot
+            except RuntimeError:
+                # A selective filter can leave the graph walk with fewer than k hits
+                rows = None
+        if rows is None:
+            rows, scores = self._exact(query, limit, allowed)
+
+        return [LocalPoint(id=self.ids[row], score=float(score), payload=self.payloads[row])
+                for row, score in zip(rows, scores)]
+
+    def retrieve(self, ids: List[Any]) -> List[LocalPoint]:
+        """Points by id (unknown ids are skipped), like ``QdrantClient.retrieve``."""
+        if self._rows is None:
+            self._rows = {point_id: row for row, point_id in enumerate(self.ids)}
+        return [LocalPoint(id=point_id, score=0.0, payload=self.payloads[self._rows[point_id]])
+                for point_id in ids if point_id in self._rows]
+
+
+class LocalVectorStore:
+    """QdrantHandler-compatible store that keeps each collection as a LocalIndex on disk."""
+
+    def __init__(self, root: Optional[str] = None, dtype: str = "float32", hnsw: bool = False):
+        self.root = root or LOCAL_INDEX_DIR
+        self.dtype = dtype
+        self.hnsw = hnsw
+        self._indexes: Dict[str, LocalIndex] = {}
+
+    def _path(self, collection_name: str) -> str:
+        return os.path.join(self.root, collection_name)
+
+    def collection_exists(self, collection_name: str) -> bool:
+        return os.path.exists(os.path.join(self._path(collection_name), "meta.json"))
+
+    def get_index(self, collection_name: str) -> LocalIndex:
+        if collection_name not in self._indexes:
+            self._indexes[collection_name] = LocalIndex.load(self._path(collection_name))
+        return self._indexes[collection_name]
+
+    def create_collection(self, collection_name: str, vector_size: int = 384, **kwargs):
+        """Creates an empty collection if it doesn't exist."""
+        if not self.collection_exists(collection_name):
+            LocalIndex.build(self._path(collection_name), [], np.zeros((0, vector_size)), [], dtype=self.dtype)
+            print(f"Collection '{collection_name}' created.")
+        else:
+            print(f"Collection '{collection_name}' already exists.")
+
+    def create_payload_indexes(self, collection_name: str, fields: Optional[Dict[str, Any]] = None):
+        """No-op: local filters are evaluated against the in-memory payloads."""
+        print(f"Payload filters on local collection '{collection_name}' need no index.")
+
+    def add_documents(self, collection_name: str, documents: List[str], metadatas: List[Dict[str, Any]],
+                      embeddings: List[List[float]], sparse_vectors=None, start_id: Optional[int] = None):
+        """Upserts documents; sparse vectors are accepted for compatibility and ignored.
+
+        Point ids are ``start_id`` + position like in QdrantHandler, replacing points
+        with the same id; without ``start_id`` the documents are appended after the
+        highest existing id.
+        """
+        index = self.get_index(collection_name)
+        if start_id is None:
+            start_id = max((i for i in index.ids if isinstance(i, int)), default=-1) + 1
+        rows = {point_id: row for row, point_id in enumerate(index.ids)}
+        ids = list(index.ids)
+        vectors = np.array(index.vectors, dtype=np.float32)  # writable copy of the memory map
+        new_vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(documents), -1)
+        payloads = list(index.payloads)
+        appended = []
+        for offset, (doc, meta, vector) in enumerate(zip(documents, metadatas, new_vectors)):
+            point_id = start_id + offset
+            payload = {"text": doc, **meta}
+            if point_id in rows:
+                vectors[rows[point_id]] = vector
+                payloads[rows[point_id]] = payload
+            else:
+                ids.append(point_id)
+                payloads.append(payload)
+                appended.append(vector)
+        if appended:
+            vectors = np.concatenate([vectors, np.asarray(appended)])
+
+        self._indexes[collection_name] = LocalIndex.build(
+            self._path(collection_name), ids, vectors, payloads, dtype=self.dtype, hnsw=self.hnsw
+        )
+        print(f"Added {len(documents)} documents to '{collection_name}'.")
+
+    def search(self, collection_name: str, query_vector: List[float], limit: int = 5,
+               predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[LocalPoint]:
+        """Searches for similar vectors."""
+        return self.get_index(collection_name).search(query_vector, limit, predicate)
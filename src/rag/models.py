@@ -0,0 +1,174 @@
+import os
+import time
+import threading
+from typing import Any, Callable, Dict, Optional
+from src.rag.batching import BATCHING_ENABLED, BatchedEmbedder, BatchedReranker
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+RERANKER_MODEL = os.getenv("RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+
+# Inference backend: "torch" (fp32 PyTorch), "onnx" (ONNX Runtime fp32) or "onnx-int8"
+# (dynamically quantized ONNX). The ONNX backends need `pip install sentence-transformers[onnx]`.
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "torch")
+BACKENDS = ("torch", "onnx", "onnx-int8")
+ONNX_INT8_FILE = os.getenv("ONNX_INT8_FILE", "onnx/model_qint8_avx512_vnni.onnx")
+ONNX_QUANT_CONFIG = os.getenv("ONNX_QUANT_CONFIG", "avx2")
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "models")
+
+
+def model_id(model_name: str, backend: Optional[str] = None) -> str:
+    """Identity of a loaded model, for registry and cache keys: its name and backend.
+
+    Backends produce slightly different outputs, so cached vectors and scores must
+    not be shared across them.
+    """
+    return f"{model_name}:{backend or MODEL_BACKEND}"
+
+
+def _rss_bytes() -> int:
+    """Current resident set size of this process (0 if unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return 0
+
+
+def _param_bytes(model: Any) -> int:
+    """Bytes held by the model's torch parameters and buffers."""
+    module = getattr(model, "model", model)  # CrossEncoder wraps an nn.Module
+    try:
+        tensors = list(module.parameters()) + list(module.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    except Exception:
+        return 0
+
+
+def _load_model(cls, model_name: str, backend: str):
+    """Loads a SentenceTransformer or CrossEncoder on the requested backend.
+
+    Both backends expose the same encode/predict interface.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown model backend '{backend}', expected one of {BACKENDS}")
+    if backend == "torch":
+        return cls(model_name)
+    if backend == "onnx":
+        return cls(model_name, backend="onnx")
+    
+    # Prefer a pre-quantized file published with the model, else quantize locally once
+    try:
+        return cls(model_name, backend="onnx", model_kwargs={"file_name": ONNX_INT8_FILE})
+    except Exception as e:
+        print(f"No pre-quantized ONNX file for '{model_name}' ({e}); quantizing locally...")
+    return _load_locally_quantized(cls, model_name)
+
+
+def _load_locally_quantized(cls, model_name: str):
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+    
+    export_dir = os.path.join(MODEL_CACHE_DIR, model_name.replace("/", "__") + "-onnx")
+    file_name = f"onnx/model_qint8_{ONNX_QUANT_CONFIG}.onnx"
+    if not os.path.exists(os.path.join(export_dir, file_name)):
+        model = cls(model_name, backend="onnx")
+        model.save_pretrained(export_dir)
+        export_dynamic_quantized_onnx_model(model, ONNX_QUANT_CONFIG, export_dir)
+    return cls(export_dir, backend="onnx", model_kwargs={"file_name": file_name})
+
+
+class ModelRegistry:
+    """Process-wide, lazily initialised registry of embedding and re-ranking models.
+
+    Every retriever, ingestion script and evaluator should go through the registry so
+    each model is loaded exactly once per process.
+    """
+
+    def __init__(self):
+        self._models: Dict[str, Any] = {}
+        self._batched: Dict[str, Any] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: str, loader: Callable[[], Any]) -> Any:
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            # Double-checked: another thread may have loaded it while we waited
+            model = self._models.get(key)
+            if model is not None:
+                return model
+
+            rss_before = _rss_bytes()
+            start = time.perf_counter()
+            model = loader()
+            load_time = time.perf_counter() - start
+
+            self._stats[key] = {
+                "load_time_s": round(load_time, 3),
+                "param_bytes": _param_bytes(model),
+                "rss_delta_bytes": max(_rss_bytes() - rss_before, 0),
+            }
+            self._models[key] = model
+            print(f"Loaded model '{key}' in {load_time:.2f}s "
+                  f"({self._stats[key]['param_bytes'] / 1e6:.1f} MB params)")
+            return model
+
+    def _with_batching(self, key: str, model: Any, wrapper_cls) -> Any:
+        """Wraps a model in its shared micro-batcher when BATCHING_ENABLED is set."""
+        if not BATCHING_ENABLED:
+            return model
+        with self._lock:
+            if key not in self._batched:
+                self._batched[key] = wrapper_cls(model)
+            return self._batched[key]
+
+    def get_embedder(self, model_name: str = EMBEDDING_MODEL, backend: Optional[str] = None):
+        """Shared SentenceTransformer instance."""
+        backend = backend or MODEL_BACKEND
+        def load():
+            from sentence_transformers import SentenceTransformer
+            return _load_model(SentenceTransformer, model_name, backend)
+        key = f"embedder:{model_id(model_name, backend)}"
+        return self._with_batching(key, self._get(key, load), BatchedEmbedder)
+
+    def get_reranker(self, model_name: str = RERANKER_MODEL, backend: Optional[str] = None):
+        """Shared CrossEncoder instance."""
+        backend = backend or MODEL_BACKEND
+        def load():
+            from sentence_transformers import CrossEncoder
+            return _load_model(CrossEncoder, model_name, backend)
+        key = f"reranker:{model_id(model_name, backend)}"
+        return self._with_batching(key, self._get(key, load), BatchedReranker)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Load time and memory footprint per loaded model."""
+        with self._lock:
+            return {key: dict(stats) for key, stats in self._stats.items()}
+
+    def get_batching_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Queue-wait and batch-size histograms per micro-batched model."""
+        with self._lock:
+            wrappers = dict(self._batched)
+        return {key: wrapper.batcher.get_stats() for key, wrapper in wrappers.items()}
+
+
+# Global registry instance
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_model_registry() -> ModelRegistry:
+    """Get or create the global model registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
+
+def get_embedder(model_name: str = EMBEDDING_MODEL, backend: Optional[str] = None):
+    return get_model_registry().get_embedder(model_name, backend)
+
+def get_reranker(model_name: str = RERANKER_MODEL, backend: Optional[str] = None):
+    return get_model_registry().get_reranker(model_name, backend)
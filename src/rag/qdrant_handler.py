@@ -1,37 +1,224 @@
 import os
+import json
+from dataclasses import dataclass, field
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from src.rag.sparse import SPARSE_VECTOR_NAME
+from src.rag.filters import PAYLOAD_INDEXES
+
+# Payload fields the pipeline actually reads; everything else stays on the server
+DEFAULT_PAYLOAD_FIELDS = ["text", "title", "url", "published"]
+
+@dataclass
+class QueryProfile:
+    """What a vector query returns and how hard Qdrant searches.
+
+    ``hnsw_ef`` trades recall for latency (None = collection default), ``exact``
+    bypasses the HNSW graph, and ``rescore``/``oversampling`` apply to quantized
+    collections. Vectors are never returned.
+    """
+    payload_fields: List[str] = field(default_factory=lambda: list(DEFAULT_PAYLOAD_FIELDS))
+    hnsw_ef: Optional[int] = None
+    exact: bool = False
+    rescore: Optional[bool] = None
+    oversampling: Optional[float] = None
+
+    def search_params(self) -> Optional[models.SearchParams]:
+        quantization = None
+        if self.rescore is not None or self.oversampling is not None:
+            quantization = models.QuantizationSearchParams(rescore=self.rescore, oversampling=self.oversampling)
+        if self.hnsw_ef is None and not self.exact and quantization is None:
+            return None
+        return models.SearchParams(hnsw_ef=self.hnsw_ef, exact=self.exact, quantization=quantization)
+
+    def query_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments for ``QdrantClient.query_points``."""
+        return {
+            "with_payload": models.PayloadSelectorInclude(include=self.payload_fields),
+            "with_vectors": False,
+            "search_params": self.search_params()
+        }
+
+# Per-collection search profiles; QDRANT_HNSW_EF overrides ef for all of them
+_DEFAULT_EF = int(os.getenv("QDRANT_HNSW_EF", "0")) or None
+QUERY_PROFILES: Dict[str, QueryProfile] = {
+    "wiki_rag": QueryProfile(hnsw_ef=_DEFAULT_EF or 64, rescore=True),
+    "arxiv_rag": QueryProfile(hnsw_ef=_DEFAULT_EF or 64, rescore=True),
+}
+
+def get_query_profile(collection_name: str) -> QueryProfile:
+    return QUERY_PROFILES.get(collection_name) or QueryProfile(hnsw_ef=_DEFAULT_EF)
+
+def estimate_response_bytes(points) -> int:
+    """Approximate bytes a query moved: JSON size of the returned ids, scores and payloads.
+
+    Works for scored points and for the records returned by ``retrieve``.
+    """
+    return sum(
+        len(json.dumps({"id": p.id, "score": getattr(p, "score", None), "payload": p.payload}, default=str))
+        for p in points
+    )
+
+# Named storage layouts for collections:
+#   memory  - full float32 vectors and HNSW graph in RAM (fastest, biggest)
+#   int8    - scalar int8 quantized vectors in RAM, originals on disk for rescoring (~4x less RAM)
+#   on_disk - vectors, HNSW graph and payload memory-mapped from disk (least RAM)
+COLLECTION_PROFILES = ("memory", "int8", "on_disk")
+COLLECTION_PROFILE = os.getenv("COLLECTION_PROFILE", "memory")
+MEMMAP_THRESHOLD_KB = int(os.getenv("QDRANT_MEMMAP_THRESHOLD_KB", "20000"))
+
+def collection_profile_config(profile: str) -> Dict[str, Any]:
+    """Storage settings for a named collection profile."""
+    if profile == "memory":
+        return {"on_disk": False, "quantization": None, "hnsw_on_disk": False,
+                "on_disk_payload": False, "memmap_threshold": None}
+    if profile == "int8":
+        return {
+            "on_disk": True,
+            "quantization": models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=True
+                )
+            ),
+            "hnsw_on_disk": False,
+            "on_disk_payload": True,
+            "memmap_threshold": None
+        }
+    if profile == "on_disk":
+        return {"on_disk": True, "quantization": None, "hnsw_on_disk": True,
+                "on_disk_payload": True, "memmap_threshold": MEMMAP_THRESHOLD_KB}
+    raise ValueError(f"Unknown collection profile '{profile}', expected one of {COLLECTION_PROFILES}")
 
 class QdrantHandler:
     def __init__(self, url: str = None, api_key: str = None):
         self.url = url or os.getenv("QDRANT_URL", "http://localhost:6333")
         self.client = QdrantClient(url=self.url, api_key=api_key)
 
-    def create_collection(self, collection_name: str, vector_size: int = 384):
-        """Creates a collection if it doesn't exist."""
-        if not self.client.collection_exists(collection_name):
+    def create_collection(self, collection_name: str, vector_size: int = 384, sparse: bool = True,
+                          profile: Optional[str] = None, recreate: bool = False):
+        """Creates a collection if it doesn't exist.
+
+        With ``sparse`` a BM25 sparse vector is stored next to the dense one; Qdrant
+        applies the IDF weighting at query time. ``profile`` picks one of
+        COLLECTION_PROFILES (default COLLECTION_PROFILE). ``recreate`` drops an
+        existing collection first, e.g. to add BM25 vectors to a dense-only one.
+        """
+        exists = self.client.collection_exists(collection_name)
+        if exists and recreate:
+            self.client.delete_collection(collection_name)
+            print(f"Collection '{collection_name}' deleted for re-creation.")
+            exists = False
+        if not exists:
+            profile = profile or COLLECTION_PROFILE
+            config = collection_profile_config(profile)
+            sparse_config = None
+            if sparse:
+                sparse_config = {
+                    SPARSE_VECTOR_NAME: models.SparseVectorParams(modifier=models.Modifier.IDF)
+                }
+            optimizers_config = None
+            if config["memmap_threshold"] is not None:
+                optimizers_config = models.OptimizersConfigDiff(memmap_threshold=config["memmap_threshold"])
             self.client.create_collection(
                 collection_name=collection_name,
                 vectors_config=models.VectorParams(
                     size=vector_size,
-                    distance=models.Distance.COSINE
-                )
+                    distance=models.Distance.COSINE,
+                    on_disk=config["on_disk"]
+                ),
+                sparse_vectors_config=sparse_config,
+                quantization_config=config["quantization"],
+                hnsw_config=models.HnswConfigDiff(on_disk=config["hnsw_on_disk"]),
+                optimizers_config=optimizers_config,
+                on_disk_payload=config["on_disk_payload"]
             )
-            print(f"Collection '{collection_name}' created.")
+            print(f"Collection '{collection_name}' created with profile '{profile}'.")
+        elif sparse and not self.has_sparse(collection_name):
+            print(f"Collection '{collection_name}' already exists without '{SPARSE_VECTOR_NAME}' sparse vectors; "
+                  f"documents are stored dense-only and search stays dense-only. Re-create it "
+                  f"(create_collection(..., recreate=True)) and re-ingest to enable hybrid search.")
         else:
             print(f"Collection '{collection_name}' already exists.")
 
-    def add_documents(self, collection_name: str, documents: List[str], metadatas: List[Dict[str, Any]], embeddings: List[List[float]]):
-        """Adds documents to the collection."""
-        points = [
-            models.PointStruct(
-                id=idx,
-                vector=embedding,
-                payload={"text": doc, **meta}
+    def has_sparse(self, collection_name: str) -> bool:
+        """Whether the collection was created with the BM25 sparse vector."""
+        params = self.client.get_collection(collection_name).config.params
+        return SPARSE_VECTOR_NAME in (params.sparse_vectors or {})
+
+    def create_payload_indexes(self, collection_name: str, fields: Optional[Dict[str, Any]] = None):
+        """Indexes filterable payload fields (source, title, published) so filters pre-filter."""
+        for field_name, schema in (fields or PAYLOAD_INDEXES).items():
+            try:
+                self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field_name,
+                    field_schema=schema
+                )
+            except Exception as e:
+                print(f"Payload index on '{field_name}' failed: {e}")
+        print(f"Payload indexes ready on '{collection_name}'.")
+
+    def apply_profile(self, collection_name: str, profile: str):
+        """Moves an existing collection to another storage profile in place.
+
+        Qdrant rebuilds segments in the background; payload storage location is
+        fixed at creation and is not changed here.
+        """
+        config = collection_profile_config(profile)
+        self.client.update_collection(
+            collection_name=collection_name,
+            vectors_config={"": models.VectorParamsDiff(on_disk=config["on_disk"])},
+            quantization_config=config["quantization"] or models.Disabled.DISABLED,
+            hnsw_config=models.HnswConfigDiff(on_disk=config["hnsw_on_disk"]),
+            optimizers_config=models.OptimizersConfigDiff(
+                memmap_threshold=config["memmap_threshold"] or 0
             )
-            for idx, (doc, meta, embedding) in enumerate(zip(documents, metadatas, embeddings))
-        ]
+        )
+        print(f"Collection '{collection_name}' switched to profile '{profile}'.")
+
+    def collection_info(self, collection_name: str) -> Dict[str, Any]:
+        """Point count and storage settings of a collection."""
+        info = self.client.get_collection(collection_name)
+        vectors = info.config.params.vectors
+        return {
+            "points": info.points_count,
+            "status": str(info.status),
+            "vectors_on_disk": getattr(vectors, "on_disk", None),
+            "quantization": type(info.config.quantization_config).__name__ if info.config.quantization_config else None,
+            "hnsw_on_disk": info.config.hnsw_config.on_disk,
+            "payload_on_disk": info.config.params.on_disk_payload,
+            "memmap_threshold": info.config.optimizer_config.memmap_threshold
+        }
+
+    def add_documents(self, collection_name: str, documents: List[str], metadatas: List[Dict[str, Any]], embeddings: List[List[float]],
+                      sparse_vectors: Optional[List[Tuple[List[int], List[float]]]] = None, start_id: int = 0):
+        """Adds documents to the collection, with optional (indices, values) sparse vectors.
+
+        Point ids are ``start_id`` + position, so batched uploads must pass their offset.
+        Collections created before hybrid search have no sparse vector; their documents
+        are uploaded dense-only.
+        """
+        if sparse_vectors is not None and not self.has_sparse(collection_name):
+            print(f"Collection '{collection_name}' has no '{SPARSE_VECTOR_NAME}' sparse vector; "
+                  f"uploading dense vectors only.")
+            sparse_vectors = None
+        points = []
+        for idx, (doc, meta, embedding) in enumerate(zip(documents, metadatas, embeddings)):
+            vector = embedding
+            if sparse_vectors is not None:
+                indices, values = sparse_vectors[idx]
+                vector = {
+                    "": embedding,
+                    SPARSE_VECTOR_NAME: models.SparseVector(indices=indices, values=values)
+                }
+            points.append(models.PointStruct(
+                id=start_id + idx,
+                vector=vector,
+                payload={"text": doc, **meta}
+            ))
         
         # Batch upload (simplified for now, ideally chunked)
         self.client.upsert(
@@ -40,10 +227,14 @@ class QdrantHandler:
         )
         print(f"Added {len(points)} documents to '{collection_name}'.")
 
-    def search(self, collection_name: str, query_vector: List[float], limit: int = 5):
+    def search(self, collection_name: str, query_vector: List[float], limit: int = 5,
+               profile: Optional[QueryProfile] = None, query_filter: Optional[models.Filter] = None):
         """Searches for similar vectors."""
-        return self.client.search(
+        profile = profile or get_query_profile(collection_name)
+        return self.client.query_points(
             collection_name=collection_name,
-            query_vector=query_vector,
-            limit=limit
-        )
+            query=query_vector,
+            limit=limit,
+            query_filter=query_filter,
+            **profile.query_kwargs()
+        ).points
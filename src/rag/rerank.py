@@ -0,0 +1,192 @@
+import os
+import hashlib
+from typing import Dict, List, Optional
+from langchain_core.documents import Document
+from src.rag.models import get_reranker
+
+
+def _text_hash(text: str) -> str:
+    normalized = " ".join(text.split()).lower()
+    return hashlib.sha256(normalized.encode()).hexdigest()[:16]
+
+
+def _text_key(text: str) -> str:
+    return "text:" + _text_hash(text)
+
+
+def document_key(doc: Document) -> str:
+    """Identity of a retrieved chunk: its Qdrant point, or its text when the id is unknown."""
+    meta = doc.metadata
+    if meta.get("point_id") is not None:
+        return f"{meta.get('collection', '')}:{meta['point_id']}"
+    return _text_key(doc.page_content)
+
+
+def score_key(doc: Document) -> str:
+    """Score cache field of a chunk: its identity plus a hash of its text.
+
+    Re-ingesting restarts point ids, so an id alone could pick up the score of the
+    chunk that used to live under it.
+    """
+    key = document_key(doc)
+    if key.startswith("text:"):
+        return key
+    return f"{key}#{_text_hash(doc.page_content)}"
+
+
+def dedupe_documents(docs: List[Document]) -> List[Document]:
+    """Drops repeated chunks, keeping the first occurrence."""
+    seen = set()
+    unique = []
+    for doc in docs:
+        # Same point twice, or the same text stored in two collections
+        keys = {document_key(doc), _text_key(doc.page_content)}
+        if keys & seen:
+            continue
+        seen.update(keys)
+        unique.append(doc)
+    return unique
+
+
+def _retrieval_score(doc: Document) -> float:
+    """Score the candidate pool is ordered by: the merge score across sources, else retrieval score."""
+    meta = doc.metadata
+    score = meta["merge_score"] if meta.get("merge_score") is not None else meta.get("retrieval_score")
+    return score or 0.0
+
+
+def _count(stats: Optional[Dict], key: str, n: int):
+    if stats is not None:
+        stats[key] = stats.get(key, 0) + n
+
+
+class Reranker:
+    """CrossEncoder re-ranking over a list of candidate documents."""
+
+    def __init__(self, model=None, score_cache=None):
+        self.model = model or get_reranker()
+        # Optional RerankScoreCache; only pairs it misses reach the model
+        self.score_cache = score_cache
+
+    def score(self, query: str, docs: List[Document], stats: Optional[Dict] = None) -> List[float]:
+        """Scores all (query, document) pairs in a single batched predict call.
+
+        When ``stats`` is given, ``pairs_scored`` and ``cache_hits`` are added to it.
+        """
+        return self.score_batch([query], [docs], [stats] if stats is not None else None)[0]
+
+    def score_batch(self, queries: List[str], doc_lists: List[List[Document]],
+                    stats: Optional[List[Dict]] = None) -> List[List[float]]:
+        """Scores the pairs of many queries with one predict call over all cache misses.
+
+        ``stats``, when given, holds one counter dict per query.
+        """
+        per_query = stats or [None] * len(queries)
+        scores: List[Dict[str, float]] = []
+        keys: List[List[str]] = []
+        misses = []  # (query index, key, doc)
+        for i, (query, docs) in enumerate(zip(queries, doc_lists)):
+            doc_keys = [score_key(doc) for doc in docs]
+            cached = self.score_cache.get_many(query, doc_keys) if self.score_cache and docs else {}
+            missing = [(i, key, doc) for key, doc in zip(doc_keys, docs) if key not in cached]
+            _count(per_query[i], "cache_hits", len(docs) - len(missing))
+            _count(per_query[i], "pairs_scored", len(missing))
+            scores.append(cached)
+            keys.append(doc_keys)
+            misses.extend(missing)
+
+        if misses:
+            pairs = [[queries[i], doc.page_content] for i, _, doc in misses]
+            fresh: List[Dict[str, float]] = [{} for _ in queries]
+            for (i, key, _), s in zip(misses, self.model.predict(pairs)):
+                fresh[i][key] = float(s)
+            for i, new_scores in enumerate(fresh):
+                if new_scores and self.score_cache:
+                    self.score_cache.set_many(queries[i], new_scores)
+                scores[i].update(new_scores)
+
+        return [[found[key] for key in doc_keys] for found, doc_keys in zip(scores, keys)]
+
+    @staticmethod
+    def _ranked(docs: List[Document], scores: List[float], top_n: Optional[int]) -> List[Document]:
+        ranked = sorted(zip(docs, scores), key=lambda x: x[1], reverse=True)
+        if top_n is not None:
+            ranked = ranked[:top_n]
+
+        results = []
+        for doc, score in ranked:
+            doc.metadata["rerank_score"] = score
+            results.append(doc)
+        return results
+
+    def rerank(self, query: str, docs: List[Document], top_n: Optional[int] = None,
+               stats: Optional[Dict] = None) -> List[Document]:
+        """Returns documents ordered by CrossEncoder score, with ``rerank_score`` set in metadata."""
+        return self._ranked(docs, self.score(query, docs, stats), top_n)
+
+    def rerank_batch(self, queries: List[str], doc_lists: List[List[Document]], top_n: Optional[int] = None,
+                     stats: Optional[List[Dict]] = None) -> List[List[Document]]:
+        """``rerank`` for many queries, scoring every pair in a single CrossEncoder batch."""
+        score_lists = self.score_batch(queries, doc_lists, stats)
+        return [self._ranked(docs, scores, top_n) for docs, scores in zip(doc_lists, score_lists)]
+
+
+class RerankCascade:
+    """Decides from retrieval scores how much CrossEncoder work a candidate list needs.
+
+    Margins are relative to the score span of the pool, so the same thresholds work
+    for cosine scores and for RRF-fused scores. Pools merged from several sources are
+    judged on their ``merge_score`` (each score relative to its source's best), never
+    on mixed retrieval scores.
+
+    - ``skip``: the top k stand far apart from the rest; keep retrieval order.
+    - ``shrink``: the top k are clearly separated; rerank only those k to order them.
+    - ``widen``: scores are nearly flat; fetch a larger pool before reranking.
+    - ``rerank``: rerank the pool as fetched.
+    """
+
+    def __init__(self, skip_margin: Optional[float] = None, shrink_margin: Optional[float] = None,
+                 ambiguous_spread: Optional[float] = None, widen_factor: Optional[float] = None):
+        self.skip_margin = skip_margin if skip_margin is not None else float(os.getenv("CASCADE_SKIP_MARGIN", "0.5"))
+        self.shrink_margin = shrink_margin if shrink_margin is not None else float(os.getenv("CASCADE_SHRINK_MARGIN", "0.3"))
+        self.ambiguous_spread = ambiguous_spread if ambiguous_spread is not None else float(os.getenv("CASCADE_AMBIGUOUS_SPREAD", "0.05"))
+        self.widen_factor = widen_factor if widen_factor is not None else float(os.getenv("CASCADE_WIDEN_FACTOR", "3.0"))
+
+    def decide(self, scores: List[float], k: int) -> str:
+        scores = sorted(scores, reverse=True)
+        if len(scores) <= k:
+            return "rerank"
+        
+        span = scores[0] - scores[-1]
+        if span <= 0 or span / max(abs(scores[0]), 1e-9) < self.ambiguous_spread:
+            return "widen"
+        
+        boundary_gap = (scores[k - 1] - scores[k]) / span
+        if boundary_gap >= self.skip_margin:
+            return "skip"
+        if boundary_gap >= self.shrink_margin:
+            return "shrink"
+        return "rerank"
+
+    def apply(self, reranker: Reranker, query: str, docs: List[Document], k: int,
+              stats: Dict, widen=None) -> List[Document]:
+        """Runs the cascade over ``docs`` (best first).
+
+        ``widen`` is a callable taking a candidate limit and returning a larger pool.
+        Fills ``stats`` with the decision, candidate count and pairs scored.
+        """
+        scores = [_retrieval_score(doc) for doc in docs]
+        decision = self.decide(scores, k)
+        stats["decision"] = decision
+        stats.setdefault("pairs_scored", 0)
+        
+        if decision == "skip":
+            stats["candidates"] = len(docs)
+            return docs[:k]
+        if decision == "shrink":
+            docs = docs[:k]
+        elif decision == "widen" and widen is not None:
+            docs = widen(int(round(len(docs) * self.widen_factor)))
+        
+        stats["candidates"] = len(docs)
+        return reranker.rerank(query, docs, top_n=k, stats=stats)
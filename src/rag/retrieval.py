@@ -1,104 +1,755 @@
 import os
-from typing import List, Dict, Any
-from qdrant_client import QdrantClient
-from sentence_transformers import SentenceTransformer, CrossEncoder
+import time
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import asdict
+from itertools import zip_longest
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http import models
 from langchain_core.documents import Document
-from src.cache import RedisCache
+from src.cache import RerankScoreCache, RetrievalResultCache, get_cache
+from src.cache.retrieval_cache import RESULT_CACHE_ENABLED
+from src.rag.models import get_embedder, model_id, EMBEDDING_MODEL, RERANKER_MODEL
+from src.rag.rerank import Reranker, RerankCascade, dedupe_documents
+from src.rag.local_index import LocalVectorStore
+from src.rag.filters import RetrievalFilter
+from src.rag.qdrant_handler import QueryProfile, get_query_profile, estimate_response_bytes
+from src.rag.sparse import BM25SparseEncoder, SPARSE_VECTOR_NAME, reciprocal_rank_fusion
+
+RERANK_MODE = os.getenv("RERANK_MODE", "full")  # "full" or "cascade"
+# Cached vectors and pair scores are only valid for the model and backend that produced them
+EMBEDDING_ID = model_id(EMBEDDING_MODEL)
+RERANKER_ID = model_id(RERANKER_MODEL)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "qdrant")  # "qdrant" or "local"
+# Threads for model inference and other blocking work of the async path
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "4"))
+
+_inference_executor: Optional[ThreadPoolExecutor] = None
+_inference_lock = threading.Lock()
+
+def get_inference_executor() -> ThreadPoolExecutor:
+    """Bounded pool the async API off-loads embedding, reranking and Redis calls to."""
+    global _inference_executor
+    if _inference_executor is None:
+        with _inference_lock:
+            if _inference_executor is None:
+                _inference_executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS,
+                                                         thread_name_prefix="inference")
+    return _inference_executor
+
+async def _run_blocking(fn, *args, **kwargs):
+    """Runs a blocking call on the inference pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_inference_executor(), functools.partial(fn, *args, **kwargs))
+
+def _widen_from_loop(loop: asyncio.AbstractEventLoop, make_coro):
+    """Cascade ``widen`` callable for a worker thread that runs the async fetch on ``loop``."""
+    return lambda limit: asyncio.run_coroutine_threadsafe(make_coro(limit), loop).result()
+
+def _new_rerank_totals() -> Dict[str, Any]:
+    return {"queries": 0, "pairs_scored": 0, "cache_hits": 0, "decisions": {}}
+
+def _accumulate(totals: Dict[str, Any], stats: Dict[str, Any]):
+    """Adds one query's rerank counters to the running totals."""
+    totals["queries"] += 1
+    totals["pairs_scored"] += stats.get("pairs_scored", 0)
+    totals["cache_hits"] += stats.get("cache_hits", 0)
+    decision = stats.get("decision", "rerank")
+    totals["decisions"][decision] = totals["decisions"].get(decision, 0) + 1
+
+def _rerank_candidates(reranker: Reranker, cascade: RerankCascade, mode: str, query: str,
+                       docs: List[Document], k: int, widen=None):
+    """Full rerank or cascade over ``docs``; returns the top k and the rerank stats."""
+    stats = {"mode": mode, "pairs_scored": 0}
+    if mode == "cascade":
+        results = cascade.apply(reranker, query, docs, k, stats, widen=widen)
+    else:
+        stats["candidates"] = len(docs)
+        results = reranker.rerank(query, docs, top_n=k, stats=stats)
+    return results, stats
 
 class HybridRetriever:
-    def __init__(self, collection_name: str):
+    def __init__(self, collection_name: str, candidate_factor: Optional[float] = None,
+                 backend: Optional[str] = None, profile: Optional[QueryProfile] = None,
+                 client: Optional[QdrantClient] = None, async_client: Optional[AsyncQdrantClient] = None,
+                 model=None, reranker: Optional[Reranker] = None, cache=None, cache_enabled: bool = True):
+        # client, async_client, model, reranker and cache replace the ones built from the
+        # environment (Qdrant at QDRANT_URL, registry models, the shared Redis cache);
+        # cache_enabled=False runs without any cache
         self.collection_name = collection_name
+        self.backend = backend or VECTOR_BACKEND
+        # Payload projection and HNSW search params for this collection
+        self.profile = profile or get_query_profile(collection_name)
+        self.transfer_stats = {"queries": 0, "bytes": 0, "last_bytes": 0}
+        self._transfer_lock = threading.Lock()
+        # Candidates sent to the CrossEncoder per requested result. Hybrid recall lets us
+        # keep this below the 2x needed by dense-only search.
+        self.candidate_factor = candidate_factor or float(os.getenv("RERANK_CANDIDATE_FACTOR", "1.5"))
         qdrant_url = os.getenv("QDRANT_URL", "http://localhost:6333")
+        self.qdrant_url = qdrant_url
         
-        try:
-            self.client = QdrantClient(url=qdrant_url)
-        except Exception as e:
-            print(f"Failed to connect to Qdrant: {e}")
-            self.client = None
+        # Local backend: in-process memory-mapped index, no Qdrant round trips
+        self.client = client
+        self._async_client = async_client
+        self.local_index = None
+        if client is None and self.backend == "local":
+            try:
+                self.local_index = LocalVectorStore().get_index(collection_name)
+            except Exception as e:
+                print(f"Failed to load local index for '{collection_name}': {e}")
+        elif client is None:
+            try:
+                self.client = QdrantClient(url=qdrant_url)
+            except Exception as e:
+                print(f"Failed to connect to Qdrant: {e}")
             
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
-        # Re-enable CrossEncoder for better re-ranking
-        self.reranker = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2')
+        # Models are shared process-wide through the registry
+        self.model = model or get_embedder()
+        self.sparse_encoder = BM25SparseEncoder()
+        self._has_sparse = None
         
-        # Initialize cache
-        try:
-            self.cache = RedisCache()
-        except Exception as e:
-            print(f"Redis cache not available: {e}")
-            self.cache = None
-
-    def search(self, query: str, k: int = 10) -> List[Document]:
-        """Performs hybrid search with dense retrieval + CrossEncoder re-ranking + vector caching."""
-        if not self.client:
-            print("Qdrant client not initialized.")
-            return []
+        # Process-wide pooled cache; its circuit breaker turns a Redis outage into cache misses
+        self.cache = (cache or get_cache()) if cache_enabled else None
         
-        # Try to get cached vector first (Tier 2)
+        # Pair scores are cached per (query, chunk) so repeated queries skip the CrossEncoder
+        self.reranker = reranker or Reranker(score_cache=RerankScoreCache(self.cache, model_id=RERANKER_ID))
+        self.rerank_mode = RERANK_MODE
+        self.cascade = RerankCascade()
+        # Per-query and running reranker cost counters
+        self.last_rerank_stats: Dict[str, Any] = {}
+        self.rerank_totals = _new_rerank_totals()
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """Returns the query embedding, using the Tier 2 vector cache when possible."""
         query_vector = None
         if self.cache:
-            query_vector = self.cache.get_vector(query)
-            if query_vector:
+            query_vector = self.cache.get_vector(query, model_id=EMBEDDING_ID)
+            if query_vector is not None:
                 print(f"✓ Cache hit: vector for '{query[:30]}...'")
         
         # If not cached, encode and cache it
         if query_vector is None:
-            query_vector = self.model.encode(query).tolist()
+            query_vector = np.asarray(self.model.encode(query), dtype=np.float32)
             if self.cache:
-                self.cache.set_vector(query, query_vector)
+                self.cache.set_vector(query, query_vector, model_id=EMBEDDING_ID)
+        return query_vector
+
+    def embed_queries(self, queries: List[str]) -> List[np.ndarray]:
+        """Embeds many queries: cached vectors come from one MGET, the misses from one encode call."""
+        vectors = self.cache.get_batch_vectors(queries, model_id=EMBEDDING_ID) if self.cache else [None] * len(queries)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            encoded = np.asarray(self.model.encode([queries[i] for i in missing]), dtype=np.float32)
+            for i, vector in zip(missing, encoded):
+                vectors[i] = vector
+            if self.cache:
+                self.cache.set_batch_vectors([queries[i] for i in missing], [vectors[i] for i in missing],
+                                             model_id=EMBEDDING_ID)
+        print(f"✓ Embedded {len(queries)} queries ({len(queries) - len(missing)} from cache)")
+        return vectors
+
+    def has_sparse(self) -> bool:
+        """Whether the collection stores BM25 sparse vectors (checked once)."""
+        if self.local_index is not None:
+            return False
+        if self._has_sparse is None:
+            try:
+                params = self.client.get_collection(self.collection_name).config.params
+                self._has_sparse = SPARSE_VECTOR_NAME in (params.sparse_vectors or {})
+            except Exception as e:
+                print(f"Could not inspect collection '{self.collection_name}': {e}")
+                return False
+        return self._has_sparse
+
+    def _candidate_limit(self, k: int) -> int:
+        factor = self.candidate_factor if self.has_sparse() else 2.0
+        return max(k, int(round(k * factor)))
+
+    def _search_plan(self, query: str, query_vector: List[float], limit: int,
+                     filters: Optional[RetrievalFilter] = None):
+        """query_points arguments for one search, shared by the sync, async and batch paths.
+
+        Returns the primary query (dense-only, or dense + sparse fused server-side) and the
+        separate searches to fuse client-side if server-side fusion fails (empty when dense-only).
+        """
+        # Indexed payload filter, applied by Qdrant during the vector search
+        query_filter = filters.to_qdrant() if filters else None
+        # Cached vectors are NumPy views (possibly float16); Qdrant requests take plain floats
+        query_vector = np.asarray(query_vector, dtype=np.float32).tolist()
+        dense = {"query": query_vector, "limit": limit, "query_filter": query_filter}
+        if not self.has_sparse():
+            return dense, []
+        
+        indices, values = self.sparse_encoder.encode_query(query)
+        sparse_query = models.SparseVector(indices=indices, values=values)
+        fused = {
+            "prefetch": self._hybrid_prefetch(query_vector, sparse_query, limit, query_filter),
+            "query": models.FusionQuery(fusion=models.Fusion.RRF),
+            "limit": limit,
+            "search_params": None
+        }
+        fallback = [dense]
+        if indices:
+            fallback.append({"query": sparse_query, "using": SPARSE_VECTOR_NAME, "limit": limit,
+                             "search_params": None, "query_filter": query_filter})
+        return fused, fallback
+
+    @staticmethod
+    def _fuse(results: List[list], limit: int) -> list:
+        fused = reciprocal_rank_fusion([[(p.id, p) for p in points] for points in results], limit=limit)
+        return [point for _, point, _ in fused]
+
+    def _retrieve_candidates(self, query: str, query_vector: List[float], limit: int,
+                             filters: Optional[RetrievalFilter] = None) -> list:
+        """Dense-only search, or dense + sparse fused server-side with a client-side RRF fallback."""
+        if self.local_index is not None:
+            predicate = filters.matches if filters and not filters.is_empty() else None
+            return self.local_index.search(query_vector, limit, predicate)
         
+        primary, fallback = self._search_plan(query, query_vector, limit, filters)
+        if not fallback:
+            return self._query(**primary)
         try:
-            # 1. Retrieve top 2*k candidates using dense vector search
-            from qdrant_client.models import PointStruct, VectorParams, Distance
-            
-            results = self.client.query_points(
-                collection_name=self.collection_name,
-                query=query_vector,
-                limit=k * 2  # Retrieve more candidates for re-ranking
-            ).points
+            return self._query(**primary)
+        except Exception as e:
+            # Older servers lack the Query API fusion; fuse the two lists here instead
+            print(f"Server-side fusion failed, using client-side RRF: {e}")
+        return self._fuse([self._query(**kwargs) for kwargs in fallback], limit)
+
+    def _hybrid_prefetch(self, query_vector: List[float], sparse_query: models.SparseVector, limit: int,
+                         query_filter: Optional[models.Filter]) -> List[models.Prefetch]:
+        """Dense and BM25 candidate lists for server-side RRF fusion."""
+        return [
+            models.Prefetch(query=query_vector, limit=limit, params=self.profile.search_params(), filter=query_filter),
+            models.Prefetch(query=sparse_query, using=SPARSE_VECTOR_NAME, limit=limit, filter=query_filter),
+        ]
+
+    def _query_request(self, query: str, query_vector: List[float], limit: int,
+                       filters: Optional[RetrievalFilter] = None) -> models.QueryRequest:
+        """The primary search of ``_search_plan`` as one request of a batch query."""
+        primary, _ = self._search_plan(query, query_vector, limit, filters)
+        kwargs = {**self.profile.query_kwargs(), **primary}
+        return models.QueryRequest(
+            prefetch=kwargs.get("prefetch"),
+            query=kwargs["query"],
+            using=kwargs.get("using"),
+            filter=kwargs.get("query_filter"),
+            params=kwargs["search_params"],
+            limit=limit,
+            with_payload=kwargs["with_payload"],
+            with_vector=kwargs["with_vectors"]
+        )
+
+    def _record_transfer(self, size: int, queries: int = 1):
+        with self._transfer_lock:
+            self.transfer_stats["queries"] += queries
+            self.transfer_stats["bytes"] += size
+            self.transfer_stats["last_bytes"] = size
+
+    def _query(self, **kwargs) -> list:
+        """query_points with the collection's query profile, recording bytes transferred."""
+        points = self.client.query_points(
+            collection_name=self.collection_name,
+            **{**self.profile.query_kwargs(), **kwargs}
+        ).points
+        self._record_transfer(estimate_response_bytes(points))
+        return points
+
+    def _to_documents(self, results: list) -> List[Document]:
+        return [
+            Document(
+                page_content=res.payload.get("text", ""),
+                metadata={
+                    **res.payload,
+                    "point_id": res.id,
+                    "collection": self.collection_name,
+                    "retrieval_score": getattr(res, "score", None)
+                }
+            )
+            for res in results
+        ]
+
+    def candidates(self, query: str, k: int = 10, query_vector: Optional[List[float]] = None,
+                   limit: Optional[int] = None, filters: Optional[RetrievalFilter] = None) -> List[Document]:
+        """Returns un-reranked hybrid search candidates for the top k.
+
+        Metadata carries ``point_id``, ``collection`` and ``retrieval_score`` next to the payload.
+        Pass ``query_vector`` to reuse an embedding computed by the caller, ``limit`` to
+        override the candidate pool size, and ``filters`` to restrict by source, title or date.
+        """
+        if not self.client and self.local_index is None:
+            print("Qdrant client not initialized.")
+            return []
+        
+        if query_vector is None:
+            query_vector = self.embed_query(query)
+        
+        try:
+            # Retrieve candidates with dense + BM25 search fused by RRF
+            results = self._retrieve_candidates(query, query_vector, limit or self._candidate_limit(k), filters)
         except Exception as e:
             print(f"Search failed: {e}")
             return []
         
-        if not results:
+        return self._to_documents(results)
+
+    def fetch(self, ids: List[Any]) -> Dict[Any, Document]:
+        """Payloads for known point ids in one batched call, keyed by id (scores unset)."""
+        if self.local_index is not None:
+            points = self.local_index.retrieve(ids)
+        else:
+            points = self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=ids,
+                with_payload=self.profile.query_kwargs()["with_payload"],
+                with_vectors=False
+            )
+            self._record_transfer(estimate_response_bytes(points))
+        return {doc.metadata["point_id"]: doc for doc in self._to_documents(points)}
+
+    def candidates_batch(self, queries: List[str], k: int = 10, query_vectors: Optional[List[List[float]]] = None,
+                         limit: Optional[int] = None, filters: Optional[RetrievalFilter] = None) -> List[List[Document]]:
+        """``candidates`` for many queries; Qdrant answers all of them in one batch query."""
+        if not self.client and self.local_index is None:
+            print("Qdrant client not initialized.")
+            return [[] for _ in queries]
+        
+        if query_vectors is None:
+            query_vectors = self.embed_queries(queries)
+        limit = limit or self._candidate_limit(k)
+        if self.local_index is not None:
+            # In-process search has no round trips to save
+            return [self.candidates(q, k, query_vector=v, limit=limit, filters=filters)
+                    for q, v in zip(queries, query_vectors)]
+        
+        try:
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=[self._query_request(q, v, limit, filters) for q, v in zip(queries, query_vectors)]
+            )
+        except Exception as e:
+            print(f"Batch search failed, searching one query at a time: {e}")
+            return [self.candidates(q, k, query_vector=v, limit=limit, filters=filters)
+                    for q, v in zip(queries, query_vectors)]
+        
+        self._record_transfer(sum(estimate_response_bytes(r.points) for r in responses), queries=len(queries))
+        return [self._to_documents(r.points) for r in responses]
+
+    def search(self, query: str, k: int = 10, query_vector: Optional[List[float]] = None,
+               filters: Optional[RetrievalFilter] = None) -> List[Document]:
+        """Performs hybrid search with dense + sparse retrieval, CrossEncoder re-ranking and vector caching."""
+        if query_vector is None and (self.client or self.local_index is not None):
+            query_vector = self.embed_query(query)
+        docs = self.candidates(query, k, query_vector=query_vector, filters=filters)
+        
+        # Re-rank and return the top k
+        widen = lambda limit: self.candidates(query, k, query_vector=query_vector, limit=limit, filters=filters)
+        results, stats = _rerank_candidates(self.reranker, self.cascade, self.rerank_mode, query, docs, k, widen)
+        
+        self.last_rerank_stats = stats
+        _accumulate(self.rerank_totals, stats)
+        return results
+
+    # ----- Async API -----
+    # Same behaviour as the sync methods above: Qdrant calls go through AsyncQdrantClient,
+    # while embedding, reranking and Redis run on the bounded inference pool.
+
+    def _get_async_client(self) -> AsyncQdrantClient:
+        if self._async_client is None:
+            self._async_client = AsyncQdrantClient(url=self.qdrant_url)
+        return self._async_client
+
+    async def _ahas_sparse(self) -> bool:
+        if self.local_index is None and self._has_sparse is None:
+            try:
+                info = await self._get_async_client().get_collection(self.collection_name)
+                self._has_sparse = SPARSE_VECTOR_NAME in (info.config.params.sparse_vectors or {})
+            except Exception as e:
+                print(f"Could not inspect collection '{self.collection_name}': {e}")
+        return self.has_sparse()
+
+    async def _aquery(self, **kwargs) -> list:
+        response = await self._get_async_client().query_points(
+            collection_name=self.collection_name,
+            **{**self.profile.query_kwargs(), **kwargs}
+        )
+        self._record_transfer(estimate_response_bytes(response.points))
+        return response.points
+
+    async def _aretrieve_candidates(self, query: str, query_vector: List[float], limit: int,
+                                    filters: Optional[RetrievalFilter] = None) -> list:
+        if self.local_index is not None:
+            return await _run_blocking(self._retrieve_candidates, query, query_vector, limit, filters)
+        
+        primary, fallback = self._search_plan(query, query_vector, limit, filters)
+        if not fallback:
+            return await self._aquery(**primary)
+        try:
+            return await self._aquery(**primary)
+        except Exception as e:
+            print(f"Server-side fusion failed, using client-side RRF: {e}")
+        results = await asyncio.gather(*(self._aquery(**kwargs) for kwargs in fallback))
+        return self._fuse(list(results), limit)
+
+    async def aembed_query(self, query: str) -> List[float]:
+        return await _run_blocking(self.embed_query, query)
+
+    async def acandidates(self, query: str, k: int = 10, query_vector: Optional[List[float]] = None,
+                          limit: Optional[int] = None, filters: Optional[RetrievalFilter] = None) -> List[Document]:
+        """Async ``candidates``."""
+        if not self.client and self.local_index is None:
+            print("Qdrant client not initialized.")
             return []
-            
-        # 2. Re-rank results using CrossEncoder
-        documents = []
-        passages = []
-        for res in results:
-            text = res.payload.get("text", "")
-            passages.append([query, text])
-            documents.append(Document(
-                page_content=text,
-                metadata=res.payload
-            ))
-            
-        # Score all query-document pairs
-        scores = self.reranker.predict(passages)
         
-        # Sort by re-ranking score (higher is better)
-        ranked_results = sorted(zip(documents, scores), key=lambda x: x[1], reverse=True)
+        if query_vector is None:
+            query_vector = await self.aembed_query(query)
         
-        # Return top k after re-ranking
-        return [doc for doc, score in ranked_results[:k]]
+        try:
+            await self._ahas_sparse()
+            results = await self._aretrieve_candidates(query, query_vector, limit or self._candidate_limit(k), filters)
+        except Exception as e:
+            print(f"Search failed: {e}")
+            return []
+        return self._to_documents(results)
+
+    async def asearch(self, query: str, k: int = 10, query_vector: Optional[List[float]] = None,
+                      filters: Optional[RetrievalFilter] = None) -> List[Document]:
+        """Async ``search``."""
+        if query_vector is None and (self.client or self.local_index is not None):
+            query_vector = await self.aembed_query(query)
+        docs = await self.acandidates(query, k, query_vector=query_vector, filters=filters)
+        
+        # The cascade may widen the pool from the worker thread; that fetch runs back on this loop
+        widen = _widen_from_loop(asyncio.get_running_loop(), lambda limit: self.acandidates(
+            query, k, query_vector=query_vector, limit=limit, filters=filters))
+        results, stats = await _run_blocking(_rerank_candidates, self.reranker, self.cascade,
+                                             self.rerank_mode, query, docs, k, widen)
+        
+        self.last_rerank_stats = stats
+        _accumulate(self.rerank_totals, stats)
+        return results
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
 
 class MultiSourceRetriever:
-    def __init__(self):
-        self.wiki_retriever = HybridRetriever("wiki_rag")
-        self.arxiv_retriever = HybridRetriever("arxiv_rag")
+    def __init__(self, timeout: Optional[float] = None, top_n: Optional[int] = None,
+                 retrievers: Optional[Dict[str, HybridRetriever]] = None, reranker: Optional[Reranker] = None,
+                 result_cache: Optional[RetrievalResultCache] = None):
+        # Sources by name; the first embeds queries and lends its reranker and cache
+        self.retrievers = retrievers or {"wiki": HybridRetriever("wiki_rag"), "arxiv": HybridRetriever("arxiv_rag")}
+        self.wiki_retriever = self.retrievers.get("wiki") or next(iter(self.retrievers.values()))
+        self.arxiv_retriever = self.retrievers.get("arxiv")
+        
+        # Per-source deadline; a slow source is dropped instead of delaying the answer
+        self.timeout = timeout if timeout is not None else float(os.getenv("RETRIEVAL_TIMEOUT", "5.0"))
+        # Overall cap on documents handed to the LLM, across all sources
+        self.top_n = top_n if top_n is not None else int(os.getenv("RETRIEVAL_TOP_N", "8"))
+        self.reranker = reranker or self.wiki_retriever.reranker
+        self.rerank_mode = RERANK_MODE
+        self.cascade = RerankCascade()
+        self.last_rerank_stats: Dict[str, Any] = {}
+        self.rerank_totals = _new_rerank_totals()
+        # Ranked ids per query and collection versions; repeats skip search and reranking
+        self.result_cache = result_cache
+        if result_cache is None and RESULT_CACHE_ENABLED and self.wiki_retriever.cache:
+            self.result_cache = RetrievalResultCache(self.wiki_retriever.cache)
+        self._by_collection = {r.collection_name: r for r in self.retrievers.values()}
+        # Extra workers so a hung source cannot starve the next request
+        self.executor = ThreadPoolExecutor(max_workers=len(self.retrievers) * 2,
+                                           thread_name_prefix="retrieval")
+        
+    def retrieve(self, query: str, source: str = "all", top_n: Optional[int] = None,
+                 filters: Optional[RetrievalFilter] = None) -> List[Document]:
+        """Searches all selected sources concurrently and reranks the union in one batch.
+
+        Sources that do not finish in time are skipped. ``filters`` restricts every source
+        by payload (source, title, publication date). Returns the globally ranked top_n.
+        """
+        top_n = top_n or self.top_n
+        selected = {name: r for name, r in self.retrievers.items() if source in ["all", name]}
+        if not selected:
+            return []
+        
+        cache_key, cached = self._cached(query, selected, top_n, filters)
+        if cached is not None:
+            return cached
+        
+        # Embed once; every collection uses the same model
+        try:
+            query_vector = self.wiki_retriever.embed_query(query)
+        except Exception as e:
+            print(f"Query embedding failed: {e}")
+            return []
+        
+        start = time.perf_counter()
+        failed: List[str] = []
+        candidates = self._gather(query, query_vector, selected, top_n, filters=filters, failed=failed)
+        
+        # One global CrossEncoder pass over the de-duplicated union
+        # A source dropped from the widened fetch also keeps the ranking out of the result cache
+        per_source = lambda limit: self._gather(query, query_vector, selected, top_n,
+                                                limit=max(limit // len(selected), top_n), filters=filters,
+                                                failed=failed)
+        ranked, stats = _rerank_candidates(self.reranker, self.cascade, self.rerank_mode, query,
+                                           candidates, top_n, per_source)
+        self._record(stats, selected, ranked, start)
+        self._store(cache_key, ranked, failed)
+        return ranked
+
+    async def aretrieve(self, query: str, source: str = "all", top_n: Optional[int] = None,
+                        filters: Optional[RetrievalFilter] = None) -> List[Document]:
+        """Async ``retrieve``: sources are queried concurrently on the event loop."""
+        top_n = top_n or self.top_n
+        selected = {name: r for name, r in self.retrievers.items() if source in ["all", name]}
+        if not selected:
+            return []
+        
+        cache_key, cached = await _run_blocking(self._cached, query, selected, top_n, filters)
+        if cached is not None:
+            return cached
+        
+        try:
+            query_vector = await self.wiki_retriever.aembed_query(query)
+        except Exception as e:
+            print(f"Query embedding failed: {e}")
+            return []
+        
+        start = time.perf_counter()
+        failed: List[str] = []
+        candidates = await self._agather(query, query_vector, selected, top_n, filters=filters, failed=failed)
+        
+        widen = _widen_from_loop(asyncio.get_running_loop(), lambda limit: self._agather(
+            query, query_vector, selected, top_n, limit=max(limit // len(selected), top_n), filters=filters,
+            failed=failed))
+        ranked, stats = await _run_blocking(_rerank_candidates, self.reranker, self.cascade, self.rerank_mode,
+                                            query, candidates, top_n, widen)
+        self._record(stats, selected, ranked, start)
+        await _run_blocking(self._store, cache_key, ranked, failed)
+        return ranked
+
+    # ----- Result cache -----
+
+    def _cached(self, query: str, selected: Dict[str, HybridRetriever], top_n: int,
+                filters: Optional[RetrievalFilter]) -> Tuple[Optional[str], Optional[List[Document]]]:
+        """Result cache key for this request and, on a hit, the rehydrated ranked documents."""
+        if not self.result_cache:
+            return None, None
+        params = {
+            "top_n": top_n,
+            "mode": self.rerank_mode,
+            "filters": asdict(filters) if filters else None
+        }
+        try:
+            key = self.result_cache.key(query, [r.collection_name for r in selected.values()], params)
+            entries = self.result_cache.get(key)
+            if entries is None:
+                return key, None
+            docs = self._rehydrate(entries)
+        except Exception as e:
+            print(f"Result cache lookup failed: {e}")
+            return None, None
+        if docs is None:
+            return key, None
+        
+        stats = {"mode": self.rerank_mode, "decision": "cached", "pairs_scored": 0, "candidates": 0}
+        self.last_rerank_stats = stats
+        _accumulate(self.rerank_totals, stats)
+        print(f"✓ Result cache hit: {len(docs)} documents for '{query[:30]}...'")
+        return key, docs
+
+    def _rehydrate(self, entries: List[Dict[str, Any]]) -> Optional[List[Document]]:
+        """Fetches payloads with one batched call per collection; None if any point is gone."""
+        fetched = {}
+        for collection in {e["collection"] for e in entries}:
+            retriever = self._by_collection.get(collection)
+            if retriever is None:
+                return None
+            ids = [e["id"] for e in entries if e["collection"] == collection]
+            fetched[collection] = retriever.fetch(ids)
+        
+        docs = []
+        for entry in entries:
+            doc = fetched[entry["collection"]].get(entry["id"])
+            if doc is None:
+                return None
+            doc.metadata["retrieval_score"] = entry["retrieval_score"]
+            if entry.get("rerank_score") is not None:
+                doc.metadata["rerank_score"] = entry["rerank_score"]
+            docs.append(doc)
+        return docs
+
+    def _store(self, key: Optional[str], ranked: List[Document], failed: List[str]):
+        # Partial results (a source timed out or failed) are not worth repeating
+        if not key or failed or not ranked or any(d.metadata.get("point_id") is None for d in ranked):
+            return
+        self.result_cache.set(key, [
+            {
+                "collection": d.metadata.get("collection"),
+                "id": d.metadata.get("point_id"),
+                "retrieval_score": d.metadata.get("retrieval_score"),
+                "rerank_score": d.metadata.get("rerank_score")
+            }
+            for d in ranked
+        ])
+
+    def _record(self, stats: Dict[str, Any], selected: Dict[str, HybridRetriever], ranked: List[Document],
+                start: float):
+        stats["bytes_transferred"] = sum(r.transfer_stats["last_bytes"] for r in selected.values())
+        self.last_rerank_stats = stats
+        _accumulate(self.rerank_totals, stats)
+        print(f"Reranked {stats['candidates']} candidates from {len(selected)} sources to {len(ranked)} "
+              f"({stats['pairs_scored']} pairs scored, ~{stats['bytes_transferred']} bytes fetched) "
+              f"in {time.perf_counter() - start:.2f}s")
+
+    def retrieve_batch(self, queries: List[str], source: str = "all", top_n: Optional[int] = None,
+                       filters: Optional[RetrievalFilter] = None) -> List[List[Document]]:
+        """``retrieve`` for many queries at once, for evaluation runs and cache warming.
+
+        Query vectors come from one cache MGET plus one encode call for the misses, each
+        source answers every query with one batch query, and all (query, chunk) pairs are
+        scored in a single CrossEncoder batch. The full candidate pool is always reranked
+        (no cascade), and sources are not held to the per-request deadline.
+        """
+        top_n = top_n or self.top_n
+        selected = {name: r for name, r in self.retrievers.items() if source in ["all", name]}
+        if not selected or not queries:
+            return [[] for _ in queries]
+        
+        try:
+            query_vectors = self.wiki_retriever.embed_queries(queries)
+        except Exception as e:
+            print(f"Query embedding failed: {e}")
+            return [[] for _ in queries]
+        
+        start = time.perf_counter()
+        futures = {
+            name: self.executor.submit(retriever.candidates_batch, queries, top_n,
+                                       query_vectors=query_vectors, filters=filters)
+            for name, retriever in selected.items()
+        }
+        per_query = [[] for _ in queries]
+        for name, future in futures.items():
+            try:
+                for docs, source_docs in zip(per_query, future.result()):
+                    docs.extend(source_docs)
+            except Exception as e:
+                print(f"{name} batch retrieval failed: {e}")
+        candidates = [self._merge(docs) for docs in per_query]
+        
+        stats = [{"mode": "full", "pairs_scored": 0, "candidates": len(docs)} for docs in candidates]
+        ranked = self.reranker.rerank_batch(queries, candidates, top_n=top_n, stats=stats)
+        for query_stats in stats:
+            _accumulate(self.rerank_totals, query_stats)
+        
+        self.last_rerank_stats = {
+            "mode": "batch",
+            "queries": len(queries),
+            "candidates": sum(s["candidates"] for s in stats),
+            "pairs_scored": sum(s["pairs_scored"] for s in stats),
+            "cache_hits": sum(s.get("cache_hits", 0) for s in stats),
+            "bytes_transferred": sum(r.transfer_stats["last_bytes"] for r in selected.values())
+        }
+        print(f"Retrieved {len(queries)} queries from {len(selected)} sources "
+              f"({self.last_rerank_stats['pairs_scored']} pairs scored in one batch) "
+              f"in {time.perf_counter() - start:.2f}s")
+        return ranked
+
+    @staticmethod
+    def _merge(docs: List[Document]) -> List[Document]:
+        """De-duplicated union of the sources' candidates, best first.
+
+        Retrieval scores are not comparable across sources (RRF for hybrid collections,
+        cosine similarity for dense-only ones), so each score is divided by its source's
+        best and the union is ordered by that ``merge_score``. Unlike rank fusion it keeps
+        how far a source's hits fall behind its best one, which the rerank cascade needs
+        to judge confidence. A single source keeps its order.
+        """
+        by_source: Dict[Any, List[Document]] = {}
+        for doc in docs:
+            by_source.setdefault(doc.metadata.get("collection"), []).append(doc)
+        rankings = [sorted(source_docs, key=lambda d: d.metadata.get("retrieval_score") or 0.0, reverse=True)
+                    for source_docs in by_source.values()]
+        if len(rankings) <= 1:
+            return dedupe_documents(rankings[0] if rankings else [])
+        
+        for ranking in rankings:
+            top = ranking[0].metadata.get("retrieval_score") or 0.0
+            for doc in ranking:
+                score = doc.metadata.get("retrieval_score") or 0.0
+                doc.metadata["merge_score"] = max(score, 0.0) / top if top > 0 else 0.0
+        # Interleave by rank first so ties (e.g. every source's best) alternate between sources
+        interleaved = [doc for tier in zip_longest(*rankings) for doc in tier if doc is not None]
+        merged = sorted(interleaved, key=lambda d: d.metadata["merge_score"], reverse=True)
+        return dedupe_documents(merged)
+
+    def _gather(self, query: str, query_vector: List[float], selected: Dict[str, HybridRetriever],
+                k: int, limit: Optional[int] = None, filters: Optional[RetrievalFilter] = None,
+                failed: Optional[List[str]] = None) -> List[Document]:
+        """Collects candidates from the selected sources concurrently, dropping late or failed ones.
+
+        Returns the de-duplicated union in ``_merge`` order; names of dropped
+        sources are appended to ``failed``.
+        """
+        futures = {
+            name: self.executor.submit(retriever.candidates, query, k, query_vector=query_vector,
+                                       limit=limit, filters=filters)
+            for name, retriever in selected.items()
+        }
+        wait(futures.values(), timeout=self.timeout)
         
-    def retrieve(self, query: str, source: str = "all") -> List[Document]:
         docs = []
-        if source in ["all", "wiki"]:
+        for name, future in futures.items():
+            if not future.done():
+                print(f"{name} retrieval timed out after {self.timeout:.1f}s, returning partial results")
+                future.cancel()
+                if failed is not None:
+                    failed.append(name)
+                continue
             try:
-                docs.extend(self.wiki_retriever.search(query))
+                docs.extend(future.result())
             except Exception as e:
-                print(f"Wiki retrieval failed: {e}")
-                
-        if source in ["all", "arxiv"]:
+                print(f"{name} retrieval failed: {e}")
+                if failed is not None:
+                    failed.append(name)
+        
+        return self._merge(docs)
+
+    async def _agather(self, query: str, query_vector: List[float], selected: Dict[str, HybridRetriever],
+                       k: int, limit: Optional[int] = None, filters: Optional[RetrievalFilter] = None,
+                       failed: Optional[List[str]] = None) -> List[Document]:
+        """Async ``_gather``: late sources are cancelled at the deadline."""
+        tasks = {
+            name: asyncio.ensure_future(retriever.acandidates(query, k, query_vector=query_vector,
+                                                              limit=limit, filters=filters))
+            for name, retriever in selected.items()
+        }
+        await asyncio.wait(tasks.values(), timeout=self.timeout)
+        
+        docs = []
+        for name, task in tasks.items():
+            if not task.done():
+                print(f"{name} retrieval timed out after {self.timeout:.1f}s, returning partial results")
+                task.cancel()
+                if failed is not None:
+                    failed.append(name)
+                continue
             try:
-                docs.extend(self.arxiv_retriever.search(query))
+                docs.extend(task.result())
             except Exception as e:
-                print(f"ArXiv retrieval failed: {e}")
-                
-        return docs
+                print(f"{name} retrieval failed: {e}")
+                if failed is not None:
+                    failed.append(name)
+        
+        return self._merge(docs)
+
+    async def aclose(self):
+        """Closes the async Qdrant clients."""
+        for retriever in self.retrievers.values():
+            await retriever.aclose()
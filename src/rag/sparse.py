@@ -0,0 +1,79 @@
+import re
+import zlib
+from collections import Counter
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+SPARSE_VECTOR_NAME = "bm25"
+
+_TOKEN_RE = re.compile(r"[\w][\w.\-]*\w|\w", re.UNICODE)
+
+# Small English stopword list; keeps sparse vectors focused on content terms
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in is it its of on or that the their
+this to was were what when where which who why will with how does do did can
+""".split())
+
+
+class BM25SparseEncoder:
+    """BM25-style sparse encoder for Qdrant sparse vectors.
+
+    Documents get a saturated, length-normalised term frequency per token; the
+    collection is created with the IDF modifier so Qdrant supplies the IDF half of
+    BM25 at query time. Queries are plain binary term vectors.
+    Tokens are hashed to stable 32-bit indices, so no vocabulary has to be stored.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, avg_doc_len: float = 80.0):
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_len = avg_doc_len
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        # Keeps identifiers such as "gpt-4" or "llama-2.1" as single tokens
+        tokens = _TOKEN_RE.findall(text.lower())
+        return [t for t in tokens if t not in STOPWORDS]
+
+    @staticmethod
+    def token_index(token: str) -> int:
+        return zlib.crc32(token.encode("utf-8")) & 0xFFFFFFFF
+
+    def _to_sparse(self, weights: Dict[int, float]) -> Tuple[List[int], List[float]]:
+        indices = sorted(weights)
+        return indices, [weights[i] for i in indices]
+
+    def encode_document(self, text: str) -> Tuple[List[int], List[float]]:
+        """Returns (indices, values) for a document chunk."""
+        tokens = self.tokenize(text)
+        counts = Counter(self.token_index(t) for t in tokens)
+        norm = self.k1 * (1 - self.b + self.b * len(tokens) / self.avg_doc_len)
+        return self._to_sparse({
+            idx: tf * (self.k1 + 1) / (tf + norm) for idx, tf in counts.items()
+        })
+
+    def encode_query(self, text: str) -> Tuple[List[int], List[float]]:
+        """Returns (indices, values) for a query."""
+        return self._to_sparse({self.token_index(t): 1.0 for t in self.tokenize(text)})
+
+    def encode_documents(self, texts: Sequence[str]) -> List[Tuple[List[int], List[float]]]:
+        return [self.encode_document(t) for t in texts]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Tuple[Hashable, object]]],
+                           k: int = 60, limit: int = None) -> List[Tuple[Hashable, object, float]]:
+    """Fuses ranked lists of (key, item) pairs with reciprocal rank fusion.
+
+    Returns (key, item, fused_score) sorted by fused score; the first item seen for
+    a key is kept.
+    """
+    scores: Dict[Hashable, float] = {}
+    items: Dict[Hashable, object] = {}
+    for ranking in rankings:
+        for rank, (key, item) in enumerate(ranking):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank + 1)
+            items.setdefault(key, item)
+
+    fused = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+    if limit is not None:
+        fused = fused[:limit]
+    return [(key, items[key], score) for key, score in fused]
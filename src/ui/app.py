@@ -12,7 +12,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'
 
 import streamlit as st
 from src.agents.graph import RAGGraph
-from src.cache import RedisCache
+from src.cache import get_cache
 from src.observability import get_tracker
 
 st.set_page_config(page_title="Self-Correcting RAG", layout="wide")
@@ -37,10 +37,21 @@ with st.sidebar:
     
     # Cache stats
     try:
-        cache = RedisCache()
+        cache = get_cache()
         cache_stats = cache.get_stats()
-        st.metric("Cache Hit Rate", f"{cache_stats.get('hit_rate', 0):.1%}")
+        tiers = cache_stats.get('tiers', {})
+        answers = tiers.get('answer', {})
+        st.metric("Answer Cache Hit Rate", f"{answers.get('hit_rate', 0):.1%}")
         st.metric("Total Cached Keys", cache_stats.get('total_keys', 0))
+        for tier, tier_stats in tiers.items():
+            st.caption(f"{tier.title()} cache: {tier_stats['hit_rate']:.0%} hits "
+                       f"(L1 {tier_stats['l1_hit_rate']:.0%} / Redis {tier_stats['l2_hit_rate']:.0%}) "
+                       f"of {tier_stats['lookups']:.0f} lookups, get {tier_stats['avg_get_ms']:.1f} ms, "
+                       f"set {tier_stats['avg_set_ms']:.1f} ms, {tier_stats['avg_read_bytes'] / 1e3:.1f} KB/hit, "
+                       f"{tier_stats['evictions']:.0f} L1 evictions")
+        if cache_stats.get('l1'):
+            st.caption(f"L1 memory: {cache_stats['l1']['bytes'] / 1e6:.1f} MB "
+                       f"({cache_stats['l1']['entries']} entries)")
     except:
         st.info("Cache stats unavailable")
     
@@ -68,6 +79,7 @@ if st.button("🚀 Run Query", type="primary"):
         with st.spinner("Processing..."):
             try:
                 result = st.session_state.graph.run(question)
+                st.session_state.last_result = result
                 
                 # Get the latest log file
                 log_dir = Path("logs")
@@ -175,6 +187,16 @@ if st.button("🚀 Run Query", type="primary"):
     else:
         st.warning("Please enter a question")
 
+# Feedback on paraphrase answers; counted as semantic cache false hits
+last_result = st.session_state.get("last_result")
+if last_result and last_result.get("cached_question"):
+    st.caption(f"Answered from the cached answer to \"{last_result['cached_question']}\" "
+               f"(similarity {last_result.get('cache_similarity', 0):.2f})")
+    if st.button("👎 Wrong answer"):
+        st.session_state.graph.report_wrong_answer(last_result)
+        st.session_state.last_result = None
+        st.info("Thanks! That cached answer was dropped; run the question again for a fresh one.")
+
 # Footer
 st.markdown("---")
 st.caption("Self-Correcting RAG with CrossEncoder re-ranking, Redis caching, and full observability")
@@ -0,0 +1,38 @@
+"""Stand-ins for the embedding model and CrossEncoder, shared by the retrieval tests."""
+import time
+import numpy as np
+
+
+class FakeEmbedder:
+    """3-d embeddings from text length and letter counts; records the batch size of each call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def vector(self, text):
+        return [len(text), text.count("a") + 1.0, text.count("e") + 1.0]
+
+    def encode(self, texts):
+        single = isinstance(texts, str)
+        texts = [texts] if single else texts
+        self.calls.append(len(texts))
+        vectors = np.array([self.vector(t) for t in texts], dtype=np.float32)
+        return vectors[0] if single else vectors
+
+
+class OverlapCrossEncoder:
+    """Scores a pair by shared words; counts pairs and predict calls.
+
+    ``delay`` sleeps in every predict call, standing in for a blocking forward pass.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+        self.pairs = 0
+
+    def predict(self, pairs):
+        time.sleep(self.delay)
+        self.calls.append(len(pairs))
+        self.pairs += len(pairs)
+        return np.array([len(set(q.lower().split()) & set(d.lower().split())) for q, d in pairs], dtype=float)
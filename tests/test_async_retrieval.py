@@ -0,0 +1,97 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+import asyncio
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http import models
+from src.rag.rerank import Reranker
+from src.rag.retrieval import HybridRetriever
+from src.rag.sparse import BM25SparseEncoder, SPARSE_VECTOR_NAME
+from fakes import FakeEmbedder, OverlapCrossEncoder
+
+COLLECTION = "async_test"
+TEXTS = [
+    "a transformer model uses attention",
+    "banana bread recipe with walnuts",
+    "qdrant vector search engine",
+    "paris travel guide and museums",
+    "attention heads in transformer layers",
+    "sourdough bread baking guide",
+]
+QUERIES = ["transformer attention", "bread recipe", "vector search"]
+
+def _points():
+    encoder = BM25SparseEncoder()
+    vectors = FakeEmbedder().encode(TEXTS).tolist()
+    return [
+        models.PointStruct(
+            id=i,
+            vector={"": vectors[i], SPARSE_VECTOR_NAME: models.SparseVector(indices=idx, values=val)},
+            payload={"text": text, "source": "test"}
+        )
+        for i, (text, (idx, val)) in enumerate(zip(TEXTS, encoder.encode_documents(TEXTS)))
+    ]
+
+_CONFIG = {
+    "vectors_config": models.VectorParams(size=3, distance=models.Distance.COSINE),
+    "sparse_vectors_config": {SPARSE_VECTOR_NAME: models.SparseVectorParams(modifier=models.Modifier.IDF)},
+}
+
+async def _retriever(delay: float = 0.0) -> HybridRetriever:
+    # Same data in a sync and an async in-memory Qdrant, no server, Redis or models needed
+    client = QdrantClient(":memory:")
+    client.create_collection(COLLECTION, **_CONFIG)
+    client.upsert(COLLECTION, points=_points())
+    async_client = AsyncQdrantClient(":memory:")
+    await async_client.create_collection(COLLECTION, **_CONFIG)
+    await async_client.upsert(COLLECTION, points=_points())
+
+    retriever = HybridRetriever(COLLECTION, client=client, async_client=async_client, model=FakeEmbedder(),
+                                reranker=Reranker(model=OverlapCrossEncoder(delay)), cache_enabled=False)
+    retriever.rerank_mode = "full"
+    return retriever
+
+def _summary(docs):
+    return [(d.metadata["point_id"], round(d.metadata.get("rerank_score", 0.0), 4)) for d in docs]
+
+def test_async_matches_sync():
+    async def run():
+        retriever = await _retriever()
+        for mode in ("full", "cascade"):
+            retriever.rerank_mode = mode
+            for query in QUERIES:
+                sync_docs = retriever.search(query, k=2)
+                sync_stats = retriever.last_rerank_stats
+                async_docs = await retriever.asearch(query, k=2)
+                assert _summary(sync_docs) == _summary(async_docs), (mode, query)
+                assert sync_stats == retriever.last_rerank_stats
+        await retriever.aclose()
+    asyncio.run(run())
+    print(f"✓ asearch returns the same documents and stats as search for {len(QUERIES)} queries")
+
+def test_event_loop_stays_responsive():
+    async def run():
+        retriever = await _retriever(delay=0.3)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.ensure_future(ticker())
+        await asyncio.gather(*(retriever.asearch(q, k=2) for q in QUERIES))
+        task.cancel()
+        await retriever.aclose()
+        return ticks
+    ticks = asyncio.run(run())
+    assert ticks > 10, ticks
+    print(f"✓ Event loop ticked {ticks} times while the reranker was busy")
+
+if __name__ == "__main__":
+    print("Testing async retrieval...")
+    test_async_matches_sync()
+    test_event_loop_stays_responsive()
+    print("\n✅ Async retrieval works!")
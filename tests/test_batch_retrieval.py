@@ -0,0 +1,60 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+from qdrant_client import QdrantClient
+from langchain_core.documents import Document
+from src.rag.qdrant_handler import QdrantHandler
+from src.rag.rerank import Reranker
+from src.rag.retrieval import HybridRetriever
+from src.rag.sparse import BM25SparseEncoder
+from fakes import FakeEmbedder, OverlapCrossEncoder
+
+def _retriever(client):
+    return HybridRetriever("batch_test", client=client, model=FakeEmbedder(), cache_enabled=False,
+                           reranker=Reranker(model=OverlapCrossEncoder()))
+
+def test_rerank_batch_uses_one_predict():
+    model = OverlapCrossEncoder()
+    reranker = Reranker(model=model)
+    queries = ["transformer attention", "capital of france"]
+    docs = [
+        [Document(page_content="attention is all you need"), Document(page_content="transformer attention layers")],
+        [Document(page_content="paris is the capital of france"), Document(page_content="berlin")],
+    ]
+    stats = [{}, {}]
+    ranked = reranker.rerank_batch(queries, docs, top_n=1, stats=stats)
+
+    assert model.calls == [4]
+    assert ranked[0][0].page_content == "transformer attention layers"
+    assert ranked[1][0].page_content == "paris is the capital of france"
+    assert [s["pairs_scored"] for s in stats] == [2, 2]
+    print(f"✓ 2 queries reranked with {len(model.calls)} predict call")
+
+def test_candidates_batch_matches_single_queries():
+    handler = QdrantHandler.__new__(QdrantHandler)
+    handler.client = QdrantClient(":memory:")
+    texts = ["a transformer model", "banana bread recipe", "qdrant vector search", "paris travel guide"]
+    embedder = FakeEmbedder()
+    encoder = BM25SparseEncoder()
+    handler.create_collection("batch_test", vector_size=3)
+    handler.add_documents("batch_test", texts, [{"source": "test"} for _ in texts],
+                          embedder.encode(texts).tolist(), sparse_vectors=encoder.encode_documents(texts))
+
+    retriever = _retriever(handler.client)
+    queries = ["transformer", "banana recipe", "vector search"]
+    batched = retriever.candidates_batch(queries, k=2)
+    assert retriever.model.calls == [3]  # all queries embedded in one call
+
+    vectors = retriever.embed_queries(queries)
+    single = [retriever.candidates(q, 2, query_vector=v) for q, v in zip(queries, vectors)]
+    assert [[d.metadata["point_id"] for d in docs] for docs in batched] == \
+           [[d.metadata["point_id"] for d in docs] for docs in single]
+    assert batched[1][0].page_content == "banana bread recipe"
+    print(f"✓ Batch query returns the same candidates as {len(queries)} single queries")
+
+if __name__ == "__main__":
+    print("Testing batch retrieval...")
+    test_rerank_batch_uses_one_predict()
+    test_candidates_batch_matches_single_queries()
+    print("\n✅ Batch retrieval works!")
@@ -0,0 +1,126 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+import time
+from collections import defaultdict
+from src.cache import CacheMetrics, LocalCache, RedisCache
+
+class HashRedis:
+    """Dict-backed Redis with the hash and set commands the metrics use."""
+
+    def __init__(self):
+        self.data = {}
+        self.hashes = defaultdict(dict)
+        self.sets = defaultdict(set)
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def hincrby(self, key, field, n):
+        self.hashes[key][field] = int(self.hashes[key].get(field, 0)) + n
+
+    def hincrbyfloat(self, key, field, n):
+        self.hashes[key][field] = float(self.hashes[key].get(field, 0)) + n
+
+    def hgetall(self, key):
+        return {k.encode(): str(v).encode() for k, v in self.hashes[key].items()}
+
+    def sadd(self, key, member):
+        self.sets[key].add(member.encode())
+
+    def smembers(self, key):
+        return set(self.sets[key])
+
+    def publish(self, channel, message):
+        return 0
+
+    def pubsub(self, **kwargs):
+        class SilentPubSub:
+            def subscribe(self, channel):
+                pass
+
+            def get_message(self, timeout=0.0):
+                time.sleep(timeout)
+
+            def close(self):
+                pass
+
+        return SilentPubSub()
+
+    def info(self, section=None):
+        return {}
+
+    def dbsize(self):
+        return len(self.data)
+
+    def unlink(self, key):
+        self.hashes.pop(key, None)
+        self.sets.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        redis, ops = self, []
+
+        class Pipeline:
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: ops.append((name, args, kwargs))
+
+            def execute(self):
+                return [getattr(redis, name)(*args, **kwargs) for name, args, kwargs in ops]
+
+        return Pipeline()
+
+def test_counters_aggregate_across_processes():
+    redis = HashRedis()
+    a, b = CacheMetrics(redis, flush_interval=3600), CacheMetrics(redis, flush_interval=3600)
+    a.record("answer", "l2_hits", 3)
+    a.record("answer", "misses", 1)
+    b.record("answer", "l1_hits", 4)
+    b.record("retrieval", "misses", 2)
+    b.observe("answer", "get", 0.002, nbytes=500, calls=2)
+
+    assert a.get_stats()["answer"]["lookups"] == 4, "b has not flushed yet"
+    b.flush()
+    stats = a.get_stats()
+    answer = stats["answer"]
+    assert (answer["hits"], answer["misses"], answer["lookups"]) == (7, 1, 8)
+    assert answer["l1_hit_rate"] == 0.5 and abs(answer["avg_get_ms"] - 1.0) < 1e-6
+    assert stats["retrieval"]["misses"] == 2, "new tiers appear without configuration"
+    assert a.local_stats()["answer"]["lookups"] == 4
+    print(f"✓ Two processes aggregate to {answer['hits']:.0f}/{answer['lookups']:.0f} answer hits "
+          f"({answer['hit_rate']:.0%})")
+
+def test_redis_unreachable_keeps_local_counts():
+    metrics = CacheMetrics(client=object(), flush_interval=3600)
+    metrics.record("vector", "misses", 2)
+    stats = metrics.get_stats()
+    assert stats["vector"]["misses"] == 2
+    assert metrics._pending["vector"]["misses"] == 2, "unflushed deltas are kept for the next flush"
+    print("✓ Without Redis, stats fall back to this process and deltas are retried")
+
+def test_cache_records_latency_bytes_and_evictions():
+    redis = HashRedis()
+    cache = RedisCache(client=redis, local=LocalCache(max_entries=2), l1_enabled=True)
+    cache.set_answer("q1", "a" * 100)
+    cache.get_answer("q1")
+    cache.get_answer("q2")
+    cache.set_vector("t1", [0.1] * 8)
+    cache.set_vector("t2", [0.2] * 8)
+
+    answer = cache.get_stats()["tiers"]["answer"]
+    assert (answer["l1_hits"], answer["misses"], answer["sets"]) == (1, 1, 1)
+    assert answer["bytes_written"] > 100 and answer["avg_read_bytes"] > 100
+    assert answer["evictions"] == 1, "q1 was evicted from the two-entry L1 by the vectors"
+    assert answer["get_ms"] > 0 and answer["set_ms"] > 0
+    print(f"✓ Answer tier: {answer['avg_get_ms']:.3f} ms/get, {answer['avg_write_bytes']:.0f} B/set, "
+          f"{answer['evictions']:.0f} eviction")
+
+if __name__ == "__main__":
+    print("Testing per-tier cache metrics...")
+    test_counters_aggregate_across_processes()
+    test_redis_unreachable_keeps_local_counts()
+    test_cache_records_latency_bytes_and_evictions()
+    print("\n✅ Cache metrics work!")
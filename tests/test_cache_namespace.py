@@ -0,0 +1,158 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+import time
+import fnmatch
+from qdrant_client import QdrantClient
+from src.cache import RedisCache, RerankScoreCache, RetrievalResultCache, SemanticAnswerCache
+from src.cache.namespace import CacheReaper, NamespaceGenerations
+
+class CountingRedis:
+    """Dict-backed Redis that counts round trips, to check what invalidation costs."""
+
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+        self.scans = 0
+
+    def get(self, key):
+        self.round_trips += 1
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.round_trips += 1
+        self.data[key] = value
+
+    def incr(self, key):
+        self.round_trips += 1
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(k) for k in keys]
+
+    def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+
+    def hmget(self, key, fields):
+        self.round_trips += 1
+        return [self.data.get(key, {}).get(f) for f in fields]
+
+    def expire(self, key, ttl):
+        return True
+
+    def unlink(self, key):
+        return int(self.data.pop(key, None) is not None)
+
+    def scan_iter(self, match="*", count=None):
+        self.scans += 1
+        return iter([k for k in list(self.data) if fnmatch.fnmatchcase(k, match)])
+
+    def pipeline(self, transaction=True):
+        redis, ops = self, []
+
+        class Pipeline:
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: ops.append((name, args, kwargs))
+
+            def execute(self):
+                redis.round_trips += 1
+                return [getattr(redis, name)(*args, **kwargs) for name, args, kwargs in ops]
+
+        return Pipeline()
+
+def _cache(redis) -> RedisCache:
+    cache = RedisCache(client=redis, l1_enabled=False)
+    cache.reaper = None  # reaped explicitly below
+    return cache
+
+def test_tier_invalidation_is_constant_time():
+    redis = CountingRedis()
+    cache = _cache(redis)
+    for i in range(2000):
+        cache.set_answer(f"question {i}", f"answer {i}")
+    cache.set_vector("transformer", [0.1, 0.2])
+
+    before = redis.round_trips
+    cache.invalidate_pattern("answer:*")
+    cost = redis.round_trips - before
+    assert cost == 1 and redis.scans == 0, "one INCR, no SCAN"
+    assert cache.get_answer("question 7") is None
+    assert cache.get_vector("transformer") is not None, "other tiers are untouched"
+    print(f"✓ Invalidated 2000 answers with {cost} round trip")
+
+    cache.set_answer("question 7", "new answer")
+    assert cache.get_answer("question 7") == "new answer"
+    print("✓ New writes land in the new generation")
+
+def test_reaper_unlinks_old_generations_in_batches():
+    redis = CountingRedis()
+    cache = _cache(redis)
+    for i in range(1200):
+        cache.set_answer(f"question {i}", f"answer {i}")
+    cache.invalidate_tier("answer")
+    cache.set_answer("kept", "current generation")
+
+    reaper = CacheReaper(redis, cache.generations, batch_size=500, pause=0)
+    before = redis.round_trips
+    assert reaper.reap("answer") == 1200
+    assert redis.round_trips - before <= 4, "one pipelined round trip per batch"
+    assert [k for k in redis.data if k.startswith("answer:")] == [cache._key("answer", "kept")]
+    print(f"✓ Reaper removed 1200 old keys in {redis.round_trips - before} pipelined batches")
+
+def test_other_workers_follow_the_generation():
+    redis = CountingRedis()
+    a, b = _cache(redis), _cache(redis)
+    b.generations.refresh = 0.05
+    a.set_answer("Who wrote Dune?", "Frank Herbert")
+    assert b.get_answer("Who wrote Dune?") == "Frank Herbert"
+
+    a.invalidate_tier("answer")
+    time.sleep(0.06)
+    assert b.get_answer("Who wrote Dune?") is None
+    print("✓ Other workers pick up the new generation")
+
+    stale = NamespaceGenerations(redis)
+    stale.update("answer", 1)
+    stale.update("answer", 0)
+    assert stale.get("answer") == 1, "generations never move backwards"
+    print("✓ Older generation updates are ignored")
+
+def test_clear_all_misses_in_every_tier():
+    redis = CountingRedis()
+    cache = _cache(redis)
+    results = RetrievalResultCache(cache)
+    scores = RerankScoreCache(cache=cache, model_id="reranker")
+    semantic = SemanticAnswerCache(embed=lambda text: [1.0, float(len(text)), 0.5],
+                                   client=QdrantClient(":memory:"), cache=cache, threshold=0.99)
+
+    cache.set_answer("What is RAG?", "Retrieval-augmented generation.")
+    cache.set_vector("transformer", [0.1, 0.2])
+    key = results.key("What is RAG?", ["docs"])
+    results.set(key, [{"collection": "docs", "id": 1}])
+    scores.set_many("What is RAG?", {"docs:1#abc": 0.9})
+    semantic.store("What is RAG?", "Retrieval-augmented generation.")
+    assert cache.get_answer("What is RAG?") and cache.get_vector("transformer") is not None
+    assert results.get(key) and scores.get_many("What is RAG?", ["docs:1#abc"]) and semantic.lookup("What is RAG?")
+
+    cache.clear_all()
+    assert cache.get_answer("What is RAG?") is None
+    assert cache.get_vector("transformer") is None
+    assert results.get(results.key("What is RAG?", ["docs"])) is None
+    scores.stats = {"local_hits": 0, "redis_hits": 0, "misses": 0}
+    assert scores.get_many("What is RAG?", ["docs:1#abc"]) == {}  # neither the LRU nor Redis
+    assert scores.stats["misses"] == 1
+    assert semantic.lookup("What is RAG?") is None
+    semantic.evict()
+    assert semantic.client.count(semantic.collection_name).count == 0  # old generation evicted
+    print("✓ clear_all leaves no hits in the answer, vector, retrieval, rerank or semantic tiers")
+
+if __name__ == "__main__":
+    print("Testing namespace-versioned invalidation...")
+    test_tier_invalidation_is_constant_time()
+    test_reaper_unlinks_old_generations_in_batches()
+    test_other_workers_follow_the_generation()
+    test_clear_all_misses_in_every_tier()
+    print("\n✅ Namespace invalidation works!")
@@ -0,0 +1,82 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+from src.rag.qdrant_handler import (COLLECTION_PROFILES, MEMMAP_THRESHOLD_KB, QdrantHandler,
+                                    collection_profile_config)
+
+def _handler() -> QdrantHandler:
+    handler = QdrantHandler.__new__(QdrantHandler)
+    handler.client = QdrantClient(":memory:")
+    return handler
+
+def test_profile_configs():
+    memory = collection_profile_config("memory")
+    assert not memory["on_disk"] and memory["quantization"] is None and not memory["hnsw_on_disk"]
+
+    int8 = collection_profile_config("int8")
+    assert int8["on_disk"] and int8["on_disk_payload"] and not int8["hnsw_on_disk"]
+    scalar = int8["quantization"].scalar
+    assert scalar.type == models.ScalarType.INT8 and scalar.always_ram  # quantized copy stays in RAM
+
+    on_disk = collection_profile_config("on_disk")
+    assert on_disk["on_disk"] and on_disk["hnsw_on_disk"] and on_disk["on_disk_payload"]
+    assert on_disk["quantization"] is None and on_disk["memmap_threshold"] == MEMMAP_THRESHOLD_KB
+
+    try:
+        collection_profile_config("ssd")
+        assert False, "unknown profiles must be rejected"
+    except ValueError:
+        pass
+    print(f"✓ Storage settings for {', '.join(COLLECTION_PROFILES)}")
+
+class RecordingClient:
+    """In-memory Qdrant that records create_collection arguments (local mode drops most of them)."""
+
+    def __init__(self):
+        self._client = QdrantClient(":memory:")
+        self.created = {}
+
+    def create_collection(self, collection_name, **kwargs):
+        self.created[collection_name] = kwargs
+        return self._client.create_collection(collection_name, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+def test_create_with_profile():
+    handler = _handler()
+    handler.client = RecordingClient()
+    for profile in COLLECTION_PROFILES:
+        handler.create_collection(f"docs_{profile}", vector_size=3, profile=profile)
+        kwargs = handler.client.created[f"docs_{profile}"]
+        config = collection_profile_config(profile)
+        assert kwargs["vectors_config"].on_disk == config["on_disk"]
+        assert kwargs["quantization_config"] == config["quantization"]
+        assert kwargs["hnsw_config"].on_disk == config["hnsw_on_disk"]
+        assert kwargs["on_disk_payload"] == config["on_disk_payload"]
+        assert (kwargs["optimizers_config"] is None) == (config["memmap_threshold"] is None)
+        assert handler.collection_info(f"docs_{profile}")["vectors_on_disk"] == config["on_disk"]
+        assert handler.has_sparse(f"docs_{profile}")
+    print("✓ create_collection applies every profile's storage settings")
+
+def test_batches_use_start_id():
+    handler = _handler()
+    handler.create_collection("docs", vector_size=3, sparse=False)
+    texts = ["a", "b", "c", "d", "e"]
+    vectors = [[1.0, float(i), 0.0] for i in range(len(texts))]
+    for i in range(0, len(texts), 2):
+        handler.add_documents("docs", texts[i:i + 2], [{} for _ in texts[i:i + 2]], vectors[i:i + 2], start_id=i)
+    assert handler.client.count("docs").count == len(texts)  # no batch overwrote another
+    points = handler.client.retrieve("docs", ids=list(range(len(texts))))
+    assert sorted((p.id, p.payload["text"]) for p in points) == list(enumerate(texts))
+    print("✓ Batched uploads with start_id keep every chunk")
+
+if __name__ == "__main__":
+    print("Testing collection profiles...")
+    test_profile_configs()
+    test_create_with_profile()
+    test_batches_use_start_id()
+    print("\n✅ Collection profiles work!")
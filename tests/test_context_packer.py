@@ -0,0 +1,67 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+from langchain_core.documents import Document
+from src.rag.context import ContextPacker, TokenCounter
+
+# Two neighbouring splitter chunks sharing a 50-character overlap
+OVERLAP = "the encoder maps an input sequence to embeddings."
+CHUNK_A = "The transformer uses stacked self-attention layers and " + OVERLAP
+CHUNK_B = OVERLAP + " The decoder then generates the output one token at a time."
+
+def _doc(text, score):
+    return Document(page_content=text, metadata={"rerank_score": score})
+
+def test_overlap_and_duplicates_removed():
+    packer = ContextPacker(max_tokens=1000)
+    docs = [
+        _doc(CHUNK_B, 0.5),
+        _doc(CHUNK_A, 0.9),
+        _doc(CHUNK_A.upper(), 0.7),  # same chunk from the other collection
+    ]
+    context, packed = packer.pack(docs)
+
+    assert len(packed) == 2
+    assert packed[0].metadata["rerank_score"] == 0.9  # rerank order kept
+    assert context.count(OVERLAP) == 1
+    print(f"✓ Packed {len(packed)} of {len(docs)} chunks, overlap kept once")
+
+def test_token_budget():
+    packer = ContextPacker(max_tokens=40, headroom=0.0)
+    docs = [_doc(f"Chunk number {i} talks about topic {i} " * 4, 1.0 - i / 10) for i in range(10)]
+    context, packed = packer.pack(docs)
+
+    assert packer.counter.count(context) <= 40
+    assert 0 < len(packed) < len(docs)
+    print(f"✓ {len(packed)} chunks fit in a 40-token budget ({packer.counter.count(context)} tokens)")
+
+def test_headroom_under_estimated_counts():
+    packer = ContextPacker(max_tokens=100, headroom=0.2)
+    docs = [_doc(f"Chunk number {i} talks about topic {i} " * 4, 1.0 - i / 10) for i in range(10)]
+    context, packed = packer.pack(docs)
+
+    assert packer.limit == 80
+    assert packer.counter.count(context) <= 80
+    print(f"✓ 20% headroom: {packer.counter.count(context)} estimated tokens packed into a 100-token budget")
+
+def test_character_estimate_fallback():
+    counter = TokenCounter(encoding="no-such-encoding")  # as if tiktoken were missing
+    assert counter.count("") == 0
+    assert counter.count("abcd") == 1
+    assert counter.count("abcde") == 2  # rounds up
+    assert counter.count("x" * 400) == 100
+
+    packer = ContextPacker(max_tokens=50, headroom=0.0, counter=counter)
+    docs = [_doc(chr(ord("a") + i) * 80, 1.0 - i / 10) for i in range(5)]  # 20 tokens each
+    context, packed = packer.pack(docs)
+    assert len(packed) == 2 and counter.count(context) == 41  # two chunks and a separator
+    print("✓ Without tiktoken, tokens are estimated at 4 characters each")
+
+if __name__ == "__main__":
+    print("Testing context packer...")
+    test_overlap_and_duplicates_removed()
+    test_token_budget()
+    test_headroom_under_estimated_counts()
+    test_character_estimate_fallback()
+    print("\n✅ Context packing works!")
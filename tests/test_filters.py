@@ -0,0 +1,118 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+from datetime import datetime, timedelta, timezone
+from langchain_core.documents import Document
+from qdrant_client.http import models
+from src.rag.filters import RetrievalFilter, _parse_date
+
+def test_parse_date():
+    assert _parse_date("2024-03-01T12:00:00Z") == datetime(2024, 3, 1, 12, tzinfo=timezone.utc)
+    assert _parse_date("2024-03-01") == datetime(2024, 3, 1, tzinfo=timezone.utc)  # naive means UTC
+    assert _parse_date("2024-03-01T12:00:00+02:00") == datetime(2024, 3, 1, 10, tzinfo=timezone.utc)
+    assert _parse_date(datetime(2024, 3, 1)).tzinfo == timezone.utc
+    print("✓ ISO dates parse to aware UTC datetimes")
+
+def test_to_qdrant():
+    assert RetrievalFilter().to_qdrant() is None and RetrievalFilter().is_empty()
+
+    query_filter = RetrievalFilter(source="arxiv", title=["A", "B"], published_after="2024-01-01",
+                                   published_before="2024-12-31").to_qdrant()
+    source, title, published = query_filter.must
+    assert source.key == "source" and source.match == models.MatchValue(value="arxiv")
+    assert title.key == "title" and title.match == models.MatchAny(any=["A", "B"])
+    assert published.key == "published"
+    assert published.range.gte == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert published.range.lte == datetime(2024, 12, 31, tzinfo=timezone.utc)
+
+    open_ended = RetrievalFilter(published_after="2024-01-01").to_qdrant().must[0]
+    assert open_ended.range.lte is None
+    print("✓ Filters map to Qdrant match and datetime range conditions")
+
+def test_matches():
+    query_filter = RetrievalFilter(source=["arxiv", "wikipedia"], published_after="2024-01-01",
+                                   published_before="2024-06-30")
+    assert query_filter.matches({"source": "arxiv", "published": "2024-03-01T00:00:00Z"})
+    assert query_filter.matches({"source": "arxiv", "published": "2024-06-30"})  # bounds are inclusive
+    assert not query_filter.matches({"source": "web", "published": "2024-03-01"})
+    assert not query_filter.matches({"source": "arxiv", "published": "2023-12-31"})
+    assert not query_filter.matches({"source": "arxiv"})  # undated chunks fail a date filter
+    assert not query_filter.matches({"source": "arxiv", "published": "not a date"})
+    assert RetrievalFilter(title="GPT-4").matches({"title": "GPT-4"})
+    assert RetrievalFilter().matches({})
+    print("✓ matches() agrees with the Qdrant filter semantics")
+
+def test_recent_window():
+    recent = RetrievalFilter.recent(30, source="arxiv")
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    assert recent.source == "arxiv" and recent.published_before is None
+    assert recent.published_after == today - timedelta(days=30)
+    assert recent == RetrievalFilter.recent(30, source="arxiv")  # stable within a day, so cacheable
+
+    inside = (today - timedelta(days=29)).isoformat()
+    outside = (today - timedelta(days=31)).isoformat()
+    assert recent.matches({"source": "arxiv", "published": inside})
+    assert not recent.matches({"source": "arxiv", "published": outside})
+    print("✓ recent() keeps the last N days from the start of today (UTC)")
+
+def test_recent_arxiv_answer_keeps_normal_ttl():
+    from src.agents.graph import RAGGraph
+
+    class RecentRetriever:
+        def __init__(self, papers=3):
+            self.papers = papers
+
+        def retrieve(self, question, source="all", filters=None):
+            return [Document(page_content=f"paper {i}", metadata={"title": "T", "published": "2025-01-01",
+                                                                    "rerank_score": 2.0}) for i in range(self.papers)]
+
+    class WebExecutor:
+        def __init__(self, found=True):
+            self.found = found
+
+        def run_plan(self, gaps, queries):
+            return ("web results" if self.found else "No additional information found."), self.found
+
+    class RecordingCache:
+        def __init__(self):
+            self.calls = []
+
+        def set_answer(self, question, answer):
+            self.calls.append("answer")
+
+        def set_web_answer(self, question, answer):
+            self.calls.append("web")
+
+    graph = RAGGraph.__new__(RAGGraph)
+    graph.retriever = RecentRetriever()
+    graph.executor = WebExecutor()
+    graph.semantic_cache = None
+    graph.cache = RecordingCache()
+
+    outdated = {"question": "Latest LLM?", "validation_report": {"is_outdated": True}}
+    from_arxiv = graph.execute_node(outdated)
+    assert from_arxiv["new_info"] and from_arxiv["from_web"] is False
+    from_web = graph.execute_node({"question": "Latest LLM?", "validation_report": {"is_outdated": False}})
+    assert from_web["from_web"] is True
+
+    # Too few recent papers to skip the web, and the web search finds nothing
+    graph.retriever, graph.executor = RecentRetriever(papers=1), WebExecutor(found=False)
+    arxiv_only = graph.execute_node(outdated)
+    assert arxiv_only["from_web"] is False and arxiv_only["new_info"].startswith("Recent ArXiv papers")
+    assert "No additional information" not in arxiv_only["new_info"]
+
+    for update in (from_arxiv, from_web):
+        graph.app = type("App", (), {"invoke": lambda self, inputs, u=update: {**inputs, **u, "final_answer": "x"}})()
+        graph._execute("Latest LLM?")
+    assert graph.cache.calls == ["answer", "web"]
+    print("✓ Answers refreshed from recent arXiv chunks keep the normal TTL; web answers get the short one")
+
+if __name__ == "__main__":
+    print("Testing retrieval filters...")
+    test_parse_date()
+    test_to_qdrant()
+    test_matches()
+    test_recent_window()
+    test_recent_arxiv_answer_keeps_normal_ttl()
+    print("\n✅ Retrieval filters work!")
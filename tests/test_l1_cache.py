@@ -0,0 +1,168 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+import time
+import queue
+import fnmatch
+import threading
+import numpy as np
+from src.cache import RedisCache
+from src.cache.local_cache import LocalCache
+
+class FakeRedis:
+    """Shared in-memory Redis with pub/sub, so several RedisCache 'workers' can share it."""
+
+    def __init__(self):
+        self.data = {}
+        self.calls = 0
+        self.subscribers = []
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        self.calls += 1
+        return self.data.get(key)
+
+    def mget(self, keys):
+        self.calls += 1
+        return [self.data.get(k) for k in keys]
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def set(self, key, value, keepttl=False):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    def unlink(self, key):
+        return int(self.data.pop(key, None) is not None)
+
+    def scan_iter(self, match="*", count=None):
+        return [k for k in list(self.data) if fnmatch.fnmatchcase(k, match)]
+
+    def flushdb(self):
+        self.data.clear()
+
+    def dbsize(self):
+        return len(self.data)
+
+    def info(self, section=None):
+        return {}
+
+    def publish(self, channel, message):
+        with self.lock:
+            for subscriber in self.subscribers:
+                subscriber.put({"type": "message", "channel": channel, "data": message.encode()})
+
+    def pubsub(self, ignore_subscribe_messages=True):
+        return FakePubSub(self)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.messages = queue.Queue()
+
+    def subscribe(self, channel):
+        with self.redis.lock:
+            self.redis.subscribers.append(self.messages)
+
+    def get_message(self, timeout=0.0):
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        pass
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.ops.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.ops]
+
+def _worker(redis) -> RedisCache:
+    return RedisCache(client=redis)
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_lru_ttl_and_memory_bounds():
+    local = LocalCache(max_entries=3, max_bytes=100, ttl=0.05)
+    for i in range(4):
+        local.set(f"answer:n1p:{i}", b"x" * 10)
+    assert local.get("answer:n1p:0") is None, "least recently used entry is evicted"
+    local.set("vector:n1p:big", b"y" * 80)
+    stats = local.get_stats()
+    assert stats["bytes"] <= 100 and stats["tier_bytes"]["vector"] == 80
+    time.sleep(0.06)
+    assert local.get("vector:n1p:big") is None, "entries expire after the L1 TTL"
+    print(f"✓ LRU bounded by entries and bytes, TTL honoured ({stats['evictions']} evictions)")
+
+def test_l1_serves_repeats_without_redis():
+    redis = FakeRedis()
+    cache = _worker(redis)
+    cache.set_answer("What is a transformer?", "An architecture.")
+    cache.set_vector("transformer", [0.1, 0.2, 0.3], model_id="m")
+
+    calls = redis.calls
+    for _ in range(5):
+        assert cache.get_answer("what is a transformer") == "An architecture."
+        assert np.allclose(cache.get_vector("transformer", model_id="m"), [0.1, 0.2, 0.3])
+    assert redis.calls == calls, "repeats must not reach Redis"
+
+    tiers = cache.metrics.local_stats()
+    assert tiers["answer"]["l1_hits"] == 5 and tiers["vector"]["l1_hit_rate"] == 1.0
+    print("✓ Repeated answer and vector lookups are served from L1")
+
+    # A fresh worker fills its L1 from Redis on first read
+    other = _worker(redis)
+    assert other.get_batch_vectors(["transformer", "unknown"], model_id="m")[1] is None
+    other.get_batch_vectors(["transformer"], model_id="m")
+    vector_stats = other.metrics.local_stats()["vector"]
+    assert (vector_stats["l1_hits"], vector_stats["l2_hits"], vector_stats["misses"]) == (1, 1, 1)
+    print("✓ Redis hits populate L1; per-tier L1/L2 counts recorded")
+
+def test_invalidation_reaches_other_workers():
+    redis = FakeRedis()
+    a, b = _worker(redis), _worker(redis)
+    assert _wait_for(lambda: len(redis.subscribers) == 2)
+
+    a.set_answer("Who wrote Dune?", "Frank Herbert")
+    assert b.get_answer("Who wrote Dune?") == "Frank Herbert"  # now in b's L1
+
+    a.set_answer("Who wrote Dune?", "Frank Herbert (1965)")
+    assert _wait_for(lambda: b.get_answer("Who wrote Dune?") == "Frank Herbert (1965)")
+    print("✓ Overwriting an answer drops other workers' L1 copies")
+
+    a.invalidate_pattern("answer:*")
+    assert _wait_for(lambda: b.local.get_stats()["tier_bytes"].get("answer", 0) == 0)
+    assert b.get_answer("Who wrote Dune?") is None
+    print("✓ invalidate_pattern clears matching keys in every worker")
+
+    b.set_vector("dune", [1.0, 2.0])
+    a.get_vector("dune")
+    b.clear_all()
+    assert _wait_for(lambda: a.local.get_stats()["entries"] == 0)
+    print("✓ clear_all empties every worker's L1")
+
+if __name__ == "__main__":
+    print("Testing in-process L1 cache...")
+    test_lru_ttl_and_memory_bounds()
+    test_l1_serves_repeats_without_redis()
+    test_invalidation_reaches_other_workers()
+    print("\n✅ L1 cache works!")
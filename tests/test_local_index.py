@@ -0,0 +1,85 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+import tempfile
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+from src.rag.local_index import LocalIndex, LocalVectorStore
+
+def test_matches_exact_cosine():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(500, 32))
+    query = rng.normal(size=32)
+    expected = np.argsort(-(vectors @ query) / np.linalg.norm(vectors, axis=1))[:5]
+
+    for dtype in ["float32", "float16"]:
+        with tempfile.TemporaryDirectory() as tmp:
+            index = LocalIndex.build(tmp, list(range(500)), vectors, [{"i": i} for i in range(500)], dtype=dtype)
+            hits = index.search(query, limit=5)
+            assert isinstance(index.vectors, np.memmap)
+            assert [h.id for h in hits] == list(expected)
+            assert hits[0].payload == {"i": int(expected[0])}
+            print(f"✓ {dtype} index returns the exact cosine top-5")
+
+def test_store_and_qdrant_export():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalVectorStore(tmp)
+        store.create_collection("docs", vector_size=3)
+        store.add_documents("docs", ["a", "b"], [{"source": "x"}, {"source": "y"}], [[1, 0, 0], [0, 1, 0]])
+        store.add_documents("docs", ["c"], [{"source": "z"}], [[0, 0, 1]])
+        assert store.search("docs", [0, 0.1, 1], limit=1)[0].payload["text"] == "c"
+        print("✓ LocalVectorStore appends and searches like QdrantHandler")
+
+        client = QdrantClient(":memory:")
+        client.create_collection("docs", vectors_config=models.VectorParams(size=3, distance=models.Distance.COSINE))
+        client.upsert("docs", points=[
+            models.PointStruct(id=i, vector=v, payload={"text": t})
+            for i, (t, v) in enumerate([("a", [1, 0, 0]), ("b", [0, 1, 0])])
+        ])
+        index = LocalIndex.from_qdrant(client, "docs", os.path.join(tmp, "export"))
+        assert len(index) == 2 and index.search([0, 1, 0], limit=1)[0].payload["text"] == "b"
+        print("✓ Qdrant collection exported to a local index")
+
+def test_store_start_id_upserts():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalVectorStore(tmp)
+        store.create_collection("docs", vector_size=3)
+        store.create_payload_indexes("docs")  # same call sequence as the Qdrant ingest scripts
+        store.add_documents("docs", ["a", "b"], [{}, {}], [[1, 0, 0], [0, 1, 0]], start_id=0)
+        store.add_documents("docs", ["c"], [{}], [[0, 0, 1]], start_id=2)
+        store.add_documents("docs", ["d"], [{}], [[1, 1, 0]])  # appended after the highest id
+        index = store.get_index("docs")
+        assert index.ids == [0, 1, 2, 3]
+
+        # Re-ingest from id 0 replaces points instead of colliding with them
+        store.add_documents("docs", ["a2"], [{}], [[0, 1, 1]], start_id=0)
+        index = store.get_index("docs")
+        assert index.ids == [0, 1, 2, 3] and index.retrieve([0])[0].payload["text"] == "a2"
+        assert store.search("docs", [0, 1, 1], limit=1)[0].id == 0
+    print("✓ start_id upserts by id like QdrantHandler")
+
+class ShortHNSW:
+    """hnswlib stand-in that fails filtered queries like a graph walk finding fewer than k hits."""
+
+    def knn_query(self, query, k, filter=None):
+        if filter is not None:
+            raise RuntimeError("Cannot return the results in a contiguous 2D array. Probably ef or M is too small")
+        return np.zeros((1, k), dtype=np.int64), np.zeros((1, k), dtype=np.float32)
+
+def test_filtered_hnsw_falls_back_to_exact():
+    vectors = np.eye(4, dtype=np.float32)
+    payloads = [{"source": "wiki"}, {"source": "arxiv"}, {"source": "wiki"}, {"source": "arxiv"}]
+    index = LocalIndex("unused", [10, 11, 12, 13], vectors, payloads, hnsw=ShortHNSW())
+    hits = index.search([0, 1, 0, 0.5], limit=3, predicate=lambda p: p["source"] == "arxiv")
+    assert [h.id for h in hits] == [11, 13]
+    print("✓ Filtered HNSW search with too few matches falls back to an exact scan")
+
+if __name__ == "__main__":
+    print("Testing local vector index...")
+    test_matches_exact_cosine()
+    test_store_and_qdrant_export()
+    test_store_start_id_upserts()
+    test_filtered_hnsw_falls_back_to_exact()
+    print("\n✅ Local vector index works!")
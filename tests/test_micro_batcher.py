@@ -0,0 +1,47 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+from concurrent.futures import ThreadPoolExecutor
+from src.rag.batching import MicroBatcher
+
+def test_concurrent_requests_share_batches():
+    calls = []
+
+    def double(items):
+        calls.append(len(items))
+        return [x * 2 for x in items]
+
+    batcher = MicroBatcher(double, max_batch_size=64, max_wait_ms=50)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda i: batcher([i, i + 100]), range(16)))
+
+    # Every caller gets exactly its own results back, in order
+    assert results == [[i * 2, (i + 100) * 2] for i in range(16)]
+    assert sum(calls) == 32
+    assert len(calls) < 16
+    print(f"✓ 16 requests served by {len(calls)} forward passes: {calls}")
+
+    stats = batcher.get_stats()
+    assert stats["batch_size"]["count"] == len(calls)
+    assert stats["queue_wait_ms"]["count"] == 16
+    print(f"✓ Mean batch size: {stats['batch_size']['mean']:.1f}, "
+          f"mean queue wait: {stats['queue_wait_ms']['mean']:.2f} ms")
+
+def test_errors_reach_every_caller():
+    def fail(items):
+        raise RuntimeError("model crashed")
+
+    batcher = MicroBatcher(fail, max_wait_ms=1)
+    try:
+        batcher([1])
+        assert False, "expected the model error to propagate"
+    except RuntimeError as e:
+        print(f"✓ Error propagated: {e}")
+    assert batcher([]) == []
+
+if __name__ == "__main__":
+    print("Testing micro-batching...")
+    test_concurrent_requests_share_batches()
+    test_errors_reach_every_caller()
+    print("\n✅ Micro-batching works!")
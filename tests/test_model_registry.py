@@ -0,0 +1,118 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+import types
+import threading
+import time
+from src.rag.models import MODEL_BACKEND, ModelRegistry, _load_model, model_id
+
+class FakeModel:
+    """Stands in for SentenceTransformer/CrossEncoder; counts constructions."""
+    loads = 0
+
+    def __init__(self, model_name, **kwargs):
+        FakeModel.loads += 1
+        time.sleep(0.05)  # widen the window for concurrent loads
+        self.model_name = model_name
+        self.kwargs = kwargs
+
+def _fake_sentence_transformers():
+    """Installs a fake sentence_transformers module; returns the previous one to restore."""
+    previous = sys.modules.get("sentence_transformers")
+    module = types.ModuleType("sentence_transformers")
+    module.SentenceTransformer = FakeModel
+    module.CrossEncoder = FakeModel
+    sys.modules["sentence_transformers"] = module
+    FakeModel.loads = 0
+    return previous
+
+def _restore(previous):
+    if previous is None:
+        sys.modules.pop("sentence_transformers", None)
+    else:
+        sys.modules["sentence_transformers"] = previous
+
+def _unwrap(model):
+    # BATCHING_ENABLED wraps models in a micro-batcher
+    return getattr(model, "model", model)
+
+def test_models_load_lazily():
+    previous = _fake_sentence_transformers()
+    try:
+        registry = ModelRegistry()
+        assert FakeModel.loads == 0 and registry.get_stats() == {}  # nothing loaded up front
+        registry.get_embedder("embed-model", backend="torch")
+        assert FakeModel.loads == 1
+        registry.get_reranker("rerank-model", backend="torch")
+        assert FakeModel.loads == 2
+        assert set(registry.get_stats()) == {"embedder:embed-model:torch", "reranker:rerank-model:torch"}
+    finally:
+        _restore(previous)
+    print("✓ Models load on first use, one entry per model")
+
+def test_models_are_shared():
+    previous = _fake_sentence_transformers()
+    try:
+        registry = ModelRegistry()
+        first = registry.get_embedder("embed-model", backend="torch")
+        second = registry.get_embedder("embed-model", backend="torch")
+        assert first is second and FakeModel.loads == 1
+    finally:
+        _restore(previous)
+    print("✓ Repeated lookups return the same instance")
+
+def test_concurrent_first_use_loads_once():
+    previous = _fake_sentence_transformers()
+    try:
+        registry = ModelRegistry()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get_reranker("rerank-model",
+                                                                                       backend="torch")))
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert FakeModel.loads == 1
+        assert len({id(_unwrap(m)) for m in results}) == 1
+    finally:
+        _restore(previous)
+    print("✓ 8 threads racing on first use share one load")
+
+def test_backend_selects_model_and_key():
+    previous = _fake_sentence_transformers()
+    try:
+        registry = ModelRegistry()
+        torch = _unwrap(registry.get_embedder("embed-model", backend="torch"))
+        onnx = _unwrap(registry.get_embedder("embed-model", backend="onnx"))
+        assert torch is not onnx and FakeModel.loads == 2
+        assert torch.kwargs == {} and onnx.kwargs == {"backend": "onnx"}
+        assert set(registry.get_stats()) == {"embedder:embed-model:torch", "embedder:embed-model:onnx"}
+        # No backend means MODEL_BACKEND, sharing that backend's entry
+        default = _unwrap(registry.get_embedder("embed-model"))
+        assert default is {"torch": torch, "onnx": onnx}.get(MODEL_BACKEND, default)
+        assert f"embedder:{model_id('embed-model')}" in registry.get_stats()
+    finally:
+        _restore(previous)
+    print("✓ Each backend gets its own registry entry; no backend means MODEL_BACKEND")
+
+def test_model_id_and_backend_validation():
+    assert model_id("embed-model", "onnx-int8") == "embed-model:onnx-int8"
+    assert model_id("embed-model") == f"embed-model:{MODEL_BACKEND}"
+    assert model_id("embed-model", "torch") != model_id("embed-model", "onnx")  # separate cache entries
+    try:
+        _load_model(FakeModel, "embed-model", "tensorrt")
+        assert False, "unknown backends must be rejected"
+    except ValueError:
+        pass
+    print("✓ Cache model ids carry the backend; unknown backends are rejected")
+
+if __name__ == "__main__":
+    print("Testing model registry...")
+    test_models_load_lazily()
+    test_models_are_shared()
+    test_concurrent_first_use_loads_once()
+    test_backend_selects_model_and_key()
+    test_model_id_and_backend_validation()
+    print("\n✅ Model registry works!")
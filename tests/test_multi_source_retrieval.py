@@ -0,0 +1,178 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+import time
+import asyncio
+from langchain_core.documents import Document
+from src.rag.rerank import Reranker, RerankCascade
+from src.rag.retrieval import MultiSourceRetriever
+from fakes import OverlapCrossEncoder
+
+class FakeSource:
+    """A retriever that answers after ``delay`` seconds, or raises when ``fail`` is set."""
+
+    def __init__(self, name, texts, delay=0.0, fail=False, scores=None):
+        self.collection_name = name
+        self.texts = texts
+        self.delay = delay
+        self.fail = fail
+        self.scores = scores or [1.0 / (i + 1) for i in range(len(texts))]
+        self.transfer_stats = {"queries": 0, "bytes": 0, "last_bytes": 0}
+        self.cache = None
+
+    def embed_query(self, query):
+        return [1.0, 0.0, 0.0]
+
+    async def aembed_query(self, query):
+        return self.embed_query(query)
+
+    def _docs(self):
+        if self.fail:
+            raise RuntimeError(f"{self.collection_name} is down")
+        return [Document(page_content=text, metadata={"point_id": i, "collection": self.collection_name,
+                                                      "retrieval_score": score})
+                for i, (text, score) in enumerate(zip(self.texts, self.scores))]
+
+    def candidates(self, query, k=10, query_vector=None, limit=None, filters=None):
+        time.sleep(self.delay)
+        return self._docs()
+
+    async def acandidates(self, query, k=10, query_vector=None, limit=None, filters=None):
+        await asyncio.sleep(self.delay)
+        return self._docs()
+
+def _retriever(sources, timeout=0.3) -> MultiSourceRetriever:
+    retriever = MultiSourceRetriever(timeout=timeout, top_n=3, retrievers={s.collection_name: s for s in sources},
+                                     reranker=Reranker(model=OverlapCrossEncoder()))
+    retriever.rerank_mode = "full"
+    return retriever
+
+def _sources():
+    return [
+        FakeSource("wiki", ["transformer attention explained", "banana bread"]),
+        FakeSource("arxiv", ["attention is all you need"], delay=2.0),
+        FakeSource("web", ["transformer news"], fail=True),
+    ]
+
+def test_slow_and_failed_sources_are_dropped():
+    retriever = _retriever(_sources())
+    failed = []
+    start = time.perf_counter()
+    docs = retriever._gather("transformer attention", [1.0, 0.0, 0.0], retriever.retrievers, 3, failed=failed)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1.0, elapsed  # did not wait for the 2s source
+    assert sorted(failed) == ["arxiv", "web"]
+    assert {d.metadata["collection"] for d in docs} == {"wiki"}
+
+    ranked = retriever.retrieve("transformer attention")
+    assert ranked[0].page_content == "transformer attention explained"
+    print(f"✓ Partial results from 1 of 3 sources in {elapsed * 1000:.0f} ms")
+
+def test_async_slow_and_failed_sources_are_dropped():
+    async def run():
+        retriever = _retriever(_sources())
+        failed = []
+        start = time.perf_counter()
+        docs = await retriever._agather("transformer attention", [1.0, 0.0, 0.0], retriever.retrievers, 3,
+                                        failed=failed)
+        return docs, failed, time.perf_counter() - start
+    docs, failed, elapsed = asyncio.run(run())
+    assert elapsed < 1.0, elapsed
+    assert sorted(failed) == ["arxiv", "web"]
+    assert [d.page_content for d in docs] == ["transformer attention explained", "banana bread"]
+    print(f"✓ Async fan-out cancels the late source after {elapsed * 1000:.0f} ms")
+
+def test_sources_run_concurrently():
+    sources = [FakeSource("wiki", ["a"], delay=0.2), FakeSource("arxiv", ["b"], delay=0.2)]
+    retriever = _retriever(sources, timeout=1.0)
+    failed = []
+    start = time.perf_counter()
+    docs = retriever._gather("q", [1.0, 0.0, 0.0], retriever.retrievers, 3, failed=failed)
+    elapsed = time.perf_counter() - start
+    assert len(docs) == 2 and not failed
+    assert elapsed < 0.35, elapsed  # both 0.2s sources overlapped
+    print(f"✓ Two 200 ms sources answered together in {elapsed * 1000:.0f} ms")
+
+def test_merge_fuses_sources_by_relative_score():
+    # Hybrid collections score with RRF (~0.03), dense-only ones with cosine (~0.8)
+    hybrid = FakeSource("wiki", ["w0", "w1", "w2"], scores=[0.033, 0.032, 0.031])
+    dense = FakeSource("arxiv", ["a0", "a1", "a2"], scores=[0.81, 0.80, 0.79])
+    merged = MultiSourceRetriever._merge(hybrid.candidates("q") + dense.candidates("q"))
+
+    order = [d.page_content for d in merged]
+    assert order[:2] == ["w0", "a0"], order  # both bests lead; raw cosine does not win on scale
+    assert merged[0].metadata["merge_score"] == merged[1].metadata["merge_score"] == 1.0
+    assert order == ["w0", "a0", "a1", "a2", "w1", "w2"], order  # w1 trails wiki's best by 3%, a2 arxiv's by 2.5%
+    assert merged[0].metadata["retrieval_score"] == 0.033  # raw score kept
+
+    single = MultiSourceRetriever._merge(list(reversed(dense.candidates("q"))))
+    assert [d.page_content for d in single] == ["a0", "a1", "a2"]
+    assert "merge_score" not in single[0].metadata
+    print(f"✓ RRF and cosine sources merged by score relative to each source's best: {order}")
+
+def test_cascade_skips_and_shrinks_separated_multi_source_pools():
+    wiki_texts = [f"wiki chunk {i}" for i in range(6)]
+    arxiv_texts = [f"arxiv chunk {i}" for i in range(6)]
+    cases = {
+        # Four clear hits per source, then a cliff: the top 8 need no reranking
+        "skip": ([0.033, 0.0325, 0.032, 0.0318, 0.012, 0.011], [0.82, 0.81, 0.80, 0.79, 0.30, 0.28]),
+        # Separated but spread out: rerank only the top 8 to order them
+        "shrink": ([0.033, 0.030, 0.028, 0.026, 0.018, 0.016], [0.82, 0.76, 0.71, 0.66, 0.47, 0.44]),
+    }
+    for decision, (wiki_scores, arxiv_scores) in cases.items():
+        retriever = _retriever([FakeSource("wiki", wiki_texts, scores=wiki_scores),
+                                FakeSource("arxiv", arxiv_texts, scores=arxiv_scores)])
+        retriever.rerank_mode = "cascade"
+        docs = retriever.retrieve("chunk", top_n=8)
+        stats = retriever.last_rerank_stats
+        assert stats["decision"] == decision, stats
+        assert stats["pairs_scored"] == (0 if decision == "skip" else 8)
+        assert sorted(d.metadata["point_id"] for d in docs) == [0, 0, 1, 1, 2, 2, 3, 3]
+    print("✓ Well-separated multi-source pools skip or shrink the rerank (rank fusion always reranked)")
+
+class FailsWhenWidened(FakeSource):
+    def candidates(self, query, k=10, query_vector=None, limit=None, filters=None):
+        if limit is not None:
+            raise RuntimeError(f"{self.collection_name} failed the widened fetch")
+        return super().candidates(query, k, query_vector, limit, filters)
+
+    async def acandidates(self, query, k=10, query_vector=None, limit=None, filters=None):
+        return self.candidates(query, k, query_vector, limit, filters)
+
+class RecordingResultCache:
+    def __init__(self):
+        self.stored = []
+
+    def key(self, query, collections, params=None):
+        return f"retrieval:{query}"
+
+    def get(self, key):
+        return None
+
+    def set(self, key, entries):
+        self.stored.append(key)
+
+def test_failure_while_widening_is_not_cached():
+    flat = [0.5, 0.5, 0.49, 0.49]
+    for use_async in (False, True):
+        retriever = _retriever([FakeSource("wiki", [f"w{i}" for i in range(4)], scores=flat),
+                                FailsWhenWidened("arxiv", [f"a{i}" for i in range(4)], scores=flat)])
+        retriever.rerank_mode = "cascade"
+        retriever.result_cache = RecordingResultCache()
+        docs = asyncio.run(retriever.aretrieve("w0")) if use_async else retriever.retrieve("w0")
+        assert retriever.last_rerank_stats["decision"] == "widen" and docs
+        assert {d.metadata["collection"] for d in docs} == {"wiki"}  # arxiv dropped while widening
+        assert retriever.result_cache.stored == [], "a partial widened ranking must not be cached"
+    print("✓ A source failing during the widened fetch keeps the ranking out of the result cache")
+
+if __name__ == "__main__":
+    print("Testing multi-source fan-out...")
+    test_slow_and_failed_sources_are_dropped()
+    test_async_slow_and_failed_sources_are_dropped()
+    test_sources_run_concurrently()
+    test_merge_fuses_sources_by_relative_score()
+    test_cascade_skips_and_shrinks_separated_multi_source_pools()
+    test_failure_while_widening_is_not_cached()
+    print("\n✅ Multi-source fan-out works!")
@@ -0,0 +1,40 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+from src.cache.normalize import QueryNormalizer
+from src.cache import RerankScoreCache
+
+def test_variants_share_a_key():
+    normalizer = QueryNormalizer(strip_punctuation=True, strip_stopwords=False)
+    variants = ["What is BERT?", "  what is   bert ", "WHAT IS BERT", "What is ＢＥＲＴ?", "What is BERT ?!"]
+    forms = {normalizer.normalize(v) for v in variants}
+    assert forms == {"what is bert"}, forms
+    print(f"✓ {len(variants)} variants normalise to '{forms.pop()}'")
+
+    # Punctuation inside tokens carries meaning
+    assert normalizer.normalize("Is GPT-3.5 better than Llama-2?") == "is gpt-3.5 better than llama-2"
+    assert normalizer.normalize("What's new?") == "what's new"
+    print("✓ Model names and contractions survive punctuation stripping")
+
+def test_stopwords_and_versions():
+    plain = QueryNormalizer(strip_punctuation=True, strip_stopwords=False)
+    stripped = QueryNormalizer(strip_punctuation=True, strip_stopwords=True)
+    assert stripped.normalize("Can you explain the transformer?") == stripped.normalize("transformer")
+    # Question words are kept: they change the answer
+    assert stripped.normalize("When was BERT released?") != stripped.normalize("Who released BERT?")
+    assert stripped.normalize("the") == "the"
+    assert plain.version != stripped.version
+    print(f"✓ Stopword stripping is versioned separately ({plain.version} vs {stripped.version})")
+
+    # Score cache keys follow the normaliser version
+    a = RerankScoreCache(model_id="m", normalizer=plain)._query_key("What is BERT?")
+    b = RerankScoreCache(model_id="m", normalizer=stripped)._query_key("What is BERT?")
+    assert a.startswith(plain.version + ":") and a != b
+    print("✓ Rerank score keys carry the normaliser version")
+
+if __name__ == "__main__":
+    print("Testing query normalisation...")
+    test_variants_share_a_key()
+    test_stopwords_and_versions()
+    print("\n✅ Query normalisation works!")
@@ -0,0 +1,85 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+from qdrant_client import QdrantClient
+from src.rag.qdrant_handler import QdrantHandler, QueryProfile, get_query_profile
+from src.rag.rerank import Reranker
+from src.rag.retrieval import HybridRetriever
+from src.rag.sparse import BM25SparseEncoder
+from fakes import FakeEmbedder, OverlapCrossEncoder
+
+TEXTS = ["a transformer model uses attention", "banana bread recipe", "qdrant vector search engine"]
+
+class RecordingClient:
+    """In-memory Qdrant that records the keyword arguments of every query."""
+
+    def __init__(self, client):
+        self._client = client
+        self.queries = []
+        self.batches = []
+
+    def query_points(self, **kwargs):
+        self.queries.append(kwargs)
+        return self._client.query_points(**kwargs)
+
+    def query_batch_points(self, **kwargs):
+        self.batches.append(kwargs)
+        return self._client.query_batch_points(**kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+def _retriever(profile: QueryProfile, sparse: bool) -> HybridRetriever:
+    handler = QdrantHandler.__new__(QdrantHandler)
+    handler.client = QdrantClient(":memory:")
+    handler.create_collection("profile_test", vector_size=3, sparse=sparse)
+    handler.add_documents("profile_test", TEXTS, [{"source": "test", "title": "t"} for _ in TEXTS],
+                          FakeEmbedder().encode(TEXTS).tolist(),
+                          sparse_vectors=BM25SparseEncoder().encode_documents(TEXTS) if sparse else None)
+
+    # In-memory Qdrant wrapped to record queries; no server, Redis or model download is needed
+    return HybridRetriever("profile_test", client=RecordingClient(handler.client), model=FakeEmbedder(),
+                           profile=profile, cache_enabled=False, reranker=Reranker(model=OverlapCrossEncoder()))
+
+def test_search_params():
+    assert QueryProfile().search_params() is None  # collection defaults
+    params = QueryProfile(hnsw_ef=128, rescore=True, oversampling=2.0).search_params()
+    assert params.hnsw_ef == 128 and not params.exact
+    assert params.quantization.rescore and params.quantization.oversampling == 2.0
+    assert QueryProfile(exact=True).search_params().exact
+    assert get_query_profile("wiki_rag").hnsw_ef is not None
+    assert get_query_profile("unknown").payload_fields == QueryProfile().payload_fields
+    print("✓ Profiles map to Qdrant SearchParams")
+
+def test_dense_query_uses_profile():
+    retriever = _retriever(QueryProfile(payload_fields=["text"], hnsw_ef=32), sparse=False)
+    docs = retriever.candidates("transformer", k=2)
+
+    kwargs = retriever.client.queries[-1]
+    assert kwargs["search_params"].hnsw_ef == 32
+    assert kwargs["with_payload"].include == ["text"] and kwargs["with_vectors"] is False
+    assert set(docs[0].metadata) == {"text", "point_id", "collection", "retrieval_score"}  # no "source"/"title"
+    print("✓ Dense query sends the profile's ef, payload projection and no vectors")
+
+def test_hybrid_and_batch_queries_use_profile():
+    retriever = _retriever(QueryProfile(payload_fields=["text", "title"], hnsw_ef=48), sparse=True)
+    retriever.candidates("banana recipe", k=2)
+
+    kwargs = retriever.client.queries[-1]
+    dense, sparse = kwargs["prefetch"]
+    assert dense.params.hnsw_ef == 48 and sparse.params is None  # ef only applies to the HNSW graph
+    assert kwargs["with_payload"].include == ["text", "title"] and kwargs["with_vectors"] is False
+
+    retriever.candidates_batch(["banana recipe", "vector search"], k=2)
+    requests = retriever.client.batches[-1]["requests"]
+    assert all(r.prefetch[0].params.hnsw_ef == 48 for r in requests)
+    assert all(r.with_payload.include == ["text", "title"] and r.with_vector is False for r in requests)
+    print("✓ Hybrid prefetch and batch requests carry the profile")
+
+if __name__ == "__main__":
+    print("Testing query profiles...")
+    test_search_params()
+    test_dense_query_uses_profile()
+    test_hybrid_and_batch_queries_use_profile()
+    print("\n✅ Query profiles work!")
@@ -0,0 +1,88 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+import time
+import redis
+from src.cache import RedisCache, CircuitOpenError, get_redis_client
+from src.cache.redis_client import REDIS_BULK_SOCKET_TIMEOUT, REDIS_SOCKET_TIMEOUT, CircuitBreaker, GuardedRedis
+
+def test_breaker_states():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    try:
+        breaker.before_call()
+        assert False, "open breaker must reject calls"
+    except CircuitOpenError:
+        pass
+
+    time.sleep(0.25)
+    assert breaker.state == "half-open"
+    breaker.before_call()  # the single trial call
+    try:
+        breaker.before_call()
+        assert False, "only one trial call while half-open"
+    except CircuitOpenError:
+        pass
+    breaker.record_success()
+    assert breaker.state == "closed"
+    print("✓ closed -> open -> half-open -> closed")
+
+class WrongTypeRedis:
+    """Answers every command with a server error, as Redis does for WRONGTYPE."""
+
+    def get(self, key):
+        raise redis.ResponseError("WRONGTYPE Operation against a key holding the wrong kind of value")
+
+def test_trial_ends_on_any_error():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.1)
+    breaker.record_failure()
+    time.sleep(0.15)
+    client = GuardedRedis(WrongTypeRedis(), breaker)
+    try:
+        client.get("answer:key")  # the half-open trial
+        assert False, "server errors must propagate"
+    except redis.ResponseError:
+        pass
+    assert breaker.state == "closed" and not breaker._trial_running  # Redis answered, so it is up
+    breaker.before_call()  # later calls are not rejected
+    print("✓ A server error during the half-open trial ends the trial and closes the circuit")
+
+def test_bulk_client_has_longer_timeout():
+    url = "redis://127.0.0.1:6391/0"
+    fast, bulk = get_redis_client(url), get_redis_client(url, bulk=True)
+    assert bulk is not fast and bulk is get_redis_client(url, bulk=True)
+    assert fast._client.connection_pool.connection_kwargs["socket_timeout"] == REDIS_SOCKET_TIMEOUT
+    assert bulk._client.connection_pool.connection_kwargs["socket_timeout"] == REDIS_BULK_SOCKET_TIMEOUT
+    assert bulk.breaker is fast.breaker  # an outage opens the circuit for both
+    cache = RedisCache(redis_url=url)
+    assert cache.bulk_client is bulk and (cache.reaper is None or cache.reaper.client is bulk)
+    print(f"✓ Reaper and batch writes use a {REDIS_BULK_SOCKET_TIMEOUT:g}s pool, requests a "
+          f"{REDIS_SOCKET_TIMEOUT:g}s one")
+
+def test_redis_down_fails_fast():
+    # Nothing listens on this port: every call is a refused connection
+    cache = RedisCache(redis_url="redis://127.0.0.1:6390/0")
+    assert cache.client is get_redis_client("redis://127.0.0.1:6390/0")  # one pooled client per URL
+
+    start = time.perf_counter()
+    for i in range(20):
+        assert cache.get_answer(f"question {i}") is None
+        cache.set_vector(f"question {i}", [0.1, 0.2, 0.3])
+    elapsed = time.perf_counter() - start
+    breaker = cache.client.breaker
+    assert breaker.state == "open" and breaker.stats["rejected"] >= 30
+    assert elapsed < 1.0, elapsed
+    print(f"✓ 40 cache calls against a dead Redis took {elapsed * 1000:.0f} ms, "
+          f"{breaker.stats['rejected']} skipped by the open circuit")
+
+if __name__ == "__main__":
+    print("Testing Redis circuit breaker...")
+    test_breaker_states()
+    test_trial_ends_on_any_error()
+    test_bulk_client_has_longer_timeout()
+    test_redis_down_fails_fast()
+    print("\n✅ Redis circuit breaker works!")
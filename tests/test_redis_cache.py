@@ -33,7 +33,7 @@ cache.set_vector(text, vector)
 print(f"✓ Cached vector for: {text}")
 
 cached_vector = cache.get_vector(text)
-if cached_vector and len(cached_vector) == 300:
+if cached_vector is not None and len(cached_vector) == 300:
     print(f"✓ Retrieved cached vector (length: {len(cached_vector)})")
 else:
     print("✗ Failed to retrieve vector")
@@ -42,8 +42,8 @@ else:
 print("\n=== Cache Statistics ===")
 stats = cache.get_stats()
 print(f"Total keys: {stats.get('total_keys', 0)}")
-print(f"Cache hits: {stats.get('hits', 0)}")
-print(f"Cache misses: {stats.get('misses', 0)}")
-print(f"Hit rate: {stats.get('hit_rate', 0):.2%}")
+for tier, tier_stats in stats.get('tiers', {}).items():
+    print(f"{tier}: {tier_stats['hits']:.0f} hits, {tier_stats['misses']:.0f} misses, "
+          f"hit rate {tier_stats['hit_rate']:.2%}")
 
 print("\n✅ Redis caching system is operational!")
@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+from langchain_core.documents import Document
+from src.rag.rerank import Reranker, RerankCascade
+from fakes import OverlapCrossEncoder
+
+def _docs(scores, texts=None):
+    texts = texts or [f"chunk {i}" for i in range(len(scores))]
+    return [Document(page_content=t, metadata={"point_id": i, "collection": "c", "retrieval_score": s})
+            for i, (t, s) in enumerate(zip(texts, scores))]
+
+def _cascade():
+    return RerankCascade(skip_margin=0.5, shrink_margin=0.3, ambiguous_spread=0.05, widen_factor=2.0)
+
+def test_decisions():
+    cascade = _cascade()
+    assert cascade.decide([0.9, 0.85, 0.2, 0.15, 0.1], k=2) == "skip"      # boundary gap 81% of the span
+    assert cascade.decide([0.9, 0.8, 0.6, 0.5, 0.4], k=2) == "shrink"      # 40%
+    assert cascade.decide([0.9, 0.8, 0.75, 0.7, 0.6], k=2) == "rerank"     # 17%
+    assert cascade.decide([0.50, 0.50, 0.49, 0.49], k=2) == "widen"        # nearly flat
+    assert cascade.decide([0.9, 0.1], k=2) == "rerank"                     # nothing to cut
+    print("✓ skip / shrink / rerank / widen chosen from the score gaps")
+
+def test_zero_thresholds_are_kept():
+    cascade = RerankCascade(skip_margin=0.5, shrink_margin=0.0, ambiguous_spread=0.0, widen_factor=2.0)
+    assert cascade.shrink_margin == 0.0 and cascade.ambiguous_spread == 0.0
+    assert cascade.decide([0.50, 0.50, 0.49, 0.49], k=2) == "skip"        # no widening when spread is 0
+    assert cascade.decide([0.9, 0.8, 0.75, 0.7, 0.6], k=2) == "shrink"    # any gap shrinks
+    print("✓ Explicit zero thresholds are not replaced by the defaults")
+
+def test_skip_keeps_retrieval_order_without_scoring():
+    model = OverlapCrossEncoder()
+    stats = {}
+    docs = _docs([0.9, 0.85, 0.2, 0.15, 0.1])
+    kept = _cascade().apply(Reranker(model=model), "chunk", docs, 2, stats)
+    assert [d.metadata["point_id"] for d in kept] == [0, 1]
+    assert model.pairs == 0 and stats["decision"] == "skip" and stats["pairs_scored"] == 0
+    print("✓ Early exit keeps the separated top k and scores no pairs")
+
+def test_shrink_reranks_only_top_k():
+    model = OverlapCrossEncoder()
+    stats = {}
+    docs = _docs([0.9, 0.8, 0.6, 0.5, 0.4], texts=["other", "query words", "a", "b", "c"])
+    kept = _cascade().apply(Reranker(model=model), "query words", docs, 2, stats)
+    assert stats["decision"] == "shrink" and model.pairs == 2 and stats["candidates"] == 2
+    assert [d.page_content for d in kept] == ["query words", "other"]  # reordered by the model
+    print("✓ Shrink scores only the k kept candidates")
+
+def test_widen_fetches_larger_pool():
+    model = OverlapCrossEncoder()
+    stats = {}
+    limits = []
+
+    def widen(limit):
+        limits.append(limit)
+        return _docs([0.5] * limit, texts=[f"chunk {i}" for i in range(limit - 1)] + ["best match here"])
+
+    kept = _cascade().apply(Reranker(model=model), "best match", _docs([0.50, 0.50, 0.49, 0.49]), 2, stats, widen=widen)
+    assert limits == [8] and stats["decision"] == "widen" and stats["candidates"] == 8
+    assert model.pairs == 8 and kept[0].page_content == "best match here"
+    print("✓ Flat scores widen the pool before reranking")
+
+if __name__ == "__main__":
+    print("Testing rerank cascade...")
+    test_decisions()
+    test_zero_thresholds_are_kept()
+    test_skip_keeps_retrieval_order_without_scoring()
+    test_shrink_reranks_only_top_k()
+    test_widen_fetches_larger_pool()
+    print("\n✅ Rerank cascade works!")
@@ -0,0 +1,104 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+from dataclasses import asdict
+from qdrant_client import QdrantClient
+from src.cache import RedisCache, RetrievalResultCache
+from src.cache.normalize import QueryNormalizer
+from src.rag.filters import RetrievalFilter
+from src.rag.qdrant_handler import QdrantHandler
+from src.rag.rerank import Reranker
+from src.rag.retrieval import HybridRetriever, MultiSourceRetriever
+from src.rag.sparse import BM25SparseEncoder
+from fakes import FakeEmbedder, OverlapCrossEncoder
+
+TEXTS = ["a transformer model uses attention", "banana bread recipe", "qdrant vector search engine",
+         "attention heads in transformer layers", "paris travel guide"]
+
+class DictRedis:
+    """The few Redis commands the result cache uses, backed by a dict."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+def _retriever() -> MultiSourceRetriever:
+    handler = QdrantHandler.__new__(QdrantHandler)
+    handler.client = QdrantClient(":memory:")
+    handler.create_collection("wiki_rag", vector_size=3)
+    handler.add_documents("wiki_rag", TEXTS, [{"source": "wikipedia"} for _ in TEXTS],
+                          FakeEmbedder().encode(TEXTS).tolist(),
+                          sparse_vectors=BM25SparseEncoder().encode_documents(TEXTS))
+
+    cache = RedisCache(client=DictRedis(), normalizer=QueryNormalizer(), l1_enabled=False)
+
+    wiki = HybridRetriever("wiki_rag", client=handler.client, model=FakeEmbedder(), cache_enabled=False,
+                           reranker=Reranker(model=OverlapCrossEncoder()))
+    retriever = MultiSourceRetriever(timeout=5.0, top_n=2, retrievers={"wiki": wiki},
+                                     result_cache=RetrievalResultCache(cache))
+    retriever.rerank_mode = "full"
+    return retriever
+
+def _summary(docs):
+    return [(d.metadata["point_id"], d.metadata["rerank_score"], d.page_content) for d in docs]
+
+def test_repeat_is_served_from_cache():
+    retriever = _retriever()
+    model = retriever.reranker.model
+
+    first = retriever.retrieve("transformer attention")
+    pairs = model.pairs
+    again = retriever.retrieve("  Transformer attention?")
+    assert model.pairs == pairs, "cached retrieval must not rerank"
+    assert _summary(again) == _summary(first)
+    assert retriever.last_rerank_stats["decision"] == "cached"
+    print(f"✓ Normalised repeat rehydrated {len(again)} documents without search or rerank")
+
+    # Other parameters are other entries
+    retriever.retrieve("transformer attention", top_n=3)
+    assert model.pairs > pairs
+    print("✓ Different top_n misses the cache")
+
+def test_ingestion_invalidates():
+    retriever = _retriever()
+    model = retriever.reranker.model
+    retriever.retrieve("vector search")
+    pairs = model.pairs
+
+    retriever.result_cache.bump_version("wiki_rag")
+    retriever.retrieve("vector search")
+    assert model.pairs > pairs
+    assert retriever.result_cache.stats == {"hits": 0, "misses": 2}
+    print("✓ Bumping the collection version invalidates cached results")
+
+def test_filter_values_keep_case():
+    results = RetrievalResultCache(RedisCache(client=DictRedis(), normalizer=QueryNormalizer(), l1_enabled=False))
+
+    def key(query, **filters):
+        return results.key(query, ["wiki_rag"], {"top_n": 2, "filters": asdict(RetrievalFilter(**filters))})
+
+    assert key("Who made it?", title="GPT-3") != key("Who made it?", title="gpt-3")
+    assert key("Who made it?", title="BERT") != key("Who made it?", title="Bert")
+    assert key("Who made it?", title=["A", "B"]) != key("Who made it?", title="A B")
+    assert key("Who made it?", title="GPT-3") == key("  who made it", title="GPT-3")  # the query is normalised
+    print("✓ Filters are keyed exactly; only the query text is normalised")
+
+if __name__ == "__main__":
+    print("Testing retrieval result cache...")
+    test_repeat_is_served_from_cache()
+    test_ingestion_invalidates()
+    test_filter_values_keep_case()
+    print("\n✅ Retrieval result cache works!")
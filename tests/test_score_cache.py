@@ -0,0 +1,56 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+from qdrant_client import QdrantClient
+from src.cache import RerankScoreCache
+from src.cache.normalize import QueryNormalizer
+from src.rag.qdrant_handler import QdrantHandler
+from src.rag.rerank import Reranker
+from src.rag.retrieval import HybridRetriever
+from src.rag.sparse import BM25SparseEncoder
+from fakes import FakeEmbedder, OverlapCrossEncoder
+
+class NearIdenticalEmbedder(FakeEmbedder):
+    """Nearly the same vector for every text, so both chunks are always candidates."""
+
+    def vector(self, text):
+        return [1.0, 1.0, 1.0 + 0.01 * len(text)]
+
+def _ingest(handler, texts):
+    handler.add_documents("score_test", texts, [{"source": "test"} for _ in texts],
+                          NearIdenticalEmbedder().encode(texts).tolist(),
+                          sparse_vectors=BM25SparseEncoder().encode_documents(texts))
+
+def _retriever(client, model):
+    return HybridRetriever("score_test", client=client, model=NearIdenticalEmbedder(), cache_enabled=False,
+                           reranker=Reranker(model=model, score_cache=RerankScoreCache(normalizer=QueryNormalizer())))
+
+def test_reingest_does_not_reuse_scores():
+    handler = QdrantHandler.__new__(QdrantHandler)
+    handler.client = QdrantClient(":memory:")
+    handler.create_collection("score_test", vector_size=3)
+    _ingest(handler, ["transformer attention layers", "banana bread recipe"])
+
+    model = OverlapCrossEncoder()
+    retriever = _retriever(handler.client, model)
+    query = "transformer attention"
+    docs = retriever.candidates(query, k=2, limit=2)
+    first = {d.page_content: s for d, s in zip(docs, retriever.reranker.score(query, docs))}
+    assert model.pairs == 2
+    retriever.reranker.score(query, retriever.candidates(query, k=2, limit=2))
+    assert model.pairs == 2  # same chunks: served from the score cache
+
+    # Re-ingest restarts ids at 0, so the same point ids now hold other chunks
+    _ingest(handler, ["banana bread recipe", "transformer attention layers"])
+    docs = retriever.candidates(query, k=2, limit=2)
+    stats = {}
+    scores = {d.page_content: s for d, s in zip(docs, retriever.reranker.score(query, docs, stats))}
+    assert stats["pairs_scored"] == 2 and stats["cache_hits"] == 0
+    assert scores == first  # every chunk keeps its own score
+    print("✓ Scores cached before a re-ingest are not attached to the chunks now under those ids")
+
+if __name__ == "__main__":
+    print("Testing rerank score cache...")
+    test_reingest_does_not_reuse_scores()
+    print("\n✅ Rerank score cache works!")
@@ -0,0 +1,131 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+import re
+import time
+import zlib
+import numpy as np
+from qdrant_client import QdrantClient
+from types import SimpleNamespace
+from src.cache import CacheMetrics, SemanticAnswerCache
+
+def bag_of_words(text: str):
+    """Toy embedding: hashed word counts, blind to digits like real embedders nearly are."""
+    vector = np.zeros(64, dtype=np.float32)
+    for word in text.lower().replace("?", " ").replace("'s", " is").split():
+        vector[zlib.crc32(re.sub(r"\d", "", word).encode()) % 64] += 1
+    return vector.tolist()
+
+def _cache(**kwargs):
+    return SemanticAnswerCache(embed=bag_of_words, client=QdrantClient(":memory:"), threshold=0.9, **kwargs)
+
+def test_paraphrase_hits_and_guard():
+    cache = _cache()
+    cache.store("What is BERT?", "BERT is an encoder-only transformer.")
+    cache.store("What is GPT-3?", "GPT-3 is a 175B parameter model.")
+
+    hit = cache.lookup("what's BERT")
+    assert hit and hit.answer.startswith("BERT"), hit
+    print(f"✓ Paraphrase hit: '{hit.question}' ({hit.similarity:.3f})")
+
+    # Near-identical wording, different model version
+    assert cache.lookup("What is GPT-4?") is None
+    assert cache.lookup("How do transformers scale?") is None
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2 and stats["guard_rejections"] == 1
+    print(f"✓ GPT-4 did not match GPT-3; stats: {stats}")
+
+    cache.mark_false_hit(hit)
+    assert cache.lookup("what's BERT") is None
+    assert cache.get_stats()["false_hits"] == 1
+    print("✓ False hit recorded and entry dropped")
+
+def test_zero_threshold_is_kept():
+    cache = SemanticAnswerCache(embed=bag_of_words, client=QdrantClient(":memory:"), threshold=0.0)
+    assert cache.threshold == 0.0
+    print("✓ An explicit zero threshold is not replaced by the default")
+
+def test_ttl_and_lru_eviction():
+    cache = _cache(max_entries=2, ttl=60, web_ttl=1, evict_every=1)
+    cache.store("What is a web fact?", "Fresh from the web.", web=True)
+    time.sleep(1.1)
+    assert cache.lookup("What is a web fact?") is None
+    print("✓ Web answers expire after their shorter TTL")
+
+    cache.store("What is BERT?", "BERT answer")
+    cache.store("What is RoBERTa?", "RoBERTa answer")
+    assert cache.lookup("What is BERT?")  # BERT is now the most recently used
+    cache.store("What is ALBERT?", "ALBERT answer")
+    assert cache.lookup("What is RoBERTa?") is None
+    assert cache.lookup("What is BERT?") and cache.lookup("What is ALBERT?")
+    print("✓ Least recently hit entry evicted past max_entries")
+
+def test_eviction_runs_every_n_stores():
+    cache = _cache(max_entries=2, evict_every=3)
+    counts = []
+    original = cache.client.count
+    cache.client.count = lambda *args, **kwargs: counts.append(1) or original(*args, **kwargs)
+
+    for name in ["BERT", "RoBERTa", "ALBERT", "T5", "BART"]:
+        cache.store(f"What is {name}?", f"{name} answer")
+    assert len(counts) == 1  # one exact count for five stores
+    assert original(cache.collection_name).count == 4  # 2 over the limit until the next eviction
+    cache.store("What is XLNet?", "XLNet answer")
+    assert len(counts) == 2 and original(cache.collection_name).count == 2
+    print("✓ Eviction runs once per evict_every stores, not on every store")
+
+def test_hits_recorded_in_shared_metrics():
+    metrics = CacheMetrics()
+    shared = SimpleNamespace(metrics=metrics, ANSWER_TTL=3600, WEB_DATA_TTL=1800,
+                             generations=SimpleNamespace(get=lambda tier: 0))
+    cache = SemanticAnswerCache(embed=bag_of_words, client=QdrantClient(":memory:"), cache=shared, threshold=0.9)
+    cache.store("What is BERT?", "BERT answer")
+    assert cache.lookup("what's BERT")
+    assert cache.lookup("What is GPT-4?") is None
+
+    tier = metrics.local_stats()["semantic"]  # what RedisCache.get_stats reports as tiers["semantic"]
+    assert tier["hits"] == 1 and tier["misses"] == 1 and tier["gets"] == 2 and tier["hit_rate"] == 0.5
+    assert cache.get_stats()["hits"] == 1
+    print(f"✓ Tier 0 hits and misses land in the shared cache metrics: {tier['hit_rate']:.0%} hit rate")
+
+def test_wrong_answer_feedback_counts_false_hit():
+    from src.agents.graph import RAGGraph
+
+    graph = RAGGraph.__new__(RAGGraph)
+    graph.cache = None
+    graph.single_flight = None
+    graph.semantic_cache = _cache()
+    graph.semantic_cache.store("What is BERT?", "BERT is an encoder-only transformer.")
+
+    result = graph.run("what's BERT")
+    assert result["cached_question"] == "What is BERT?"
+    assert graph.report_wrong_answer(result)
+    assert graph.semantic_cache.get_stats()["false_hits"] == 1
+    assert graph.semantic_cache.lookup("what's BERT") is None  # next time the pipeline answers
+    assert not graph.report_wrong_answer({"final_answer": "fresh", "question": "what's BERT"})
+    print("✓ A wrong-answer report on a paraphrase hit is counted as a false hit")
+
+def test_semantic_cache_shares_retriever_client():
+    from src.agents.graph import RAGGraph
+
+    graph = RAGGraph.__new__(RAGGraph)
+    graph.cache = None
+    client = QdrantClient(":memory:")
+    graph.retriever = SimpleNamespace(wiki_retriever=SimpleNamespace(client=client, embed_query=bag_of_words))
+    assert graph._semantic_cache().client is client
+
+    graph.retriever.wiki_retriever.client = None  # VECTOR_BACKEND=local
+    assert graph._semantic_cache() is None
+    print("✓ Tier 0 reuses the retriever's Qdrant client and is off for the local backend")
+
+if __name__ == "__main__":
+    print("Testing semantic answer cache...")
+    test_paraphrase_hits_and_guard()
+    test_zero_threshold_is_kept()
+    test_ttl_and_lru_eviction()
+    test_eviction_runs_every_n_stores()
+    test_hits_recorded_in_shared_metrics()
+    test_wrong_answer_feedback_counts_false_hit()
+    test_semantic_cache_shares_retriever_client()
+    print("\n✅ Semantic answer cache works!")
@@ -0,0 +1,176 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.cache import RedisCache, SingleFlight
+from src.cache.single_flight import _RELEASE, _RENEW
+
+class LeaseRedis:
+    """Thread-safe fake with key expiry, SET NX PX, the lease scripts and pattern pub/sub."""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.subscribers = []
+        self.lock = threading.RLock()
+
+    def _alive(self, key):
+        if key in self.expires and self.expires[key] <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def get(self, key):
+        with self.lock:
+            return self.data.get(key) if self._alive(key) else None
+
+    def exists(self, key):
+        with self.lock:
+            return int(self._alive(key))
+
+    def set(self, key, value, nx=False, px=None, keepttl=False):
+        with self.lock:
+            if nx and self._alive(key):
+                return None
+            self.data[key] = value
+            if px:
+                self.expires[key] = time.monotonic() + px / 1000
+            return True
+
+    def setex(self, key, ttl, value):
+        self.set(key, value, px=ttl * 1000)
+
+    def eval(self, script, numkeys, key, token, arg):
+        with self.lock:
+            if self.get(key) != token:
+                return 0
+            if script == _RENEW:
+                self.expires[key] = time.monotonic() + arg / 1000
+                return 1
+            assert script == _RELEASE
+            del self.data[key]
+            self.publish(arg, token)
+            return 1
+
+    def publish(self, channel, message):
+        with self.lock:
+            for subscriber in self.subscribers:
+                subscriber.put({"type": "pmessage", "channel": channel.encode(), "data": message})
+
+    def pubsub(self, ignore_subscribe_messages=True):
+        redis, messages = self, queue.Queue()
+
+        class PubSub:
+            def psubscribe(self, pattern):
+                with redis.lock:
+                    redis.subscribers.append(messages)
+
+            def get_message(self, timeout=0.0):
+                try:
+                    return messages.get(timeout=timeout)
+                except queue.Empty:
+                    return None
+
+            def close(self):
+                pass
+
+        return PubSub()
+
+    def pipeline(self, transaction=True):
+        redis, ops = self, []
+
+        class Pipeline:
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: ops.append((name, args, kwargs))
+
+            def execute(self):
+                return [getattr(redis, name)(*args, **kwargs) for name, args, kwargs in ops]
+
+        return Pipeline()
+
+def _run(flight, cache, question, pipeline):
+    """The coalescing part of RAGGraph.run."""
+    answer, lease = flight.join(question, lambda: cache.get_answer(question))
+    if answer is not None:
+        return answer
+    try:
+        answer = pipeline()
+        if answer is not None:
+            cache.set_answer(question, answer)
+        return answer
+    finally:
+        lease.release()
+
+def test_concurrent_requests_run_once():
+    cache = RedisCache(client=LeaseRedis(), l1_enabled=False)
+    flight = SingleFlight(cache, lease_ttl=1.0)
+    runs = []
+
+    def pipeline():
+        runs.append(1)
+        time.sleep(0.3)
+        return "Paris"
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        answers = list(pool.map(lambda _: _run(flight, cache, "Capital of France?", pipeline), range(8)))
+    elapsed = time.perf_counter() - start
+    assert answers == ["Paris"] * 8
+    assert len(runs) == 1, f"pipeline ran {len(runs)} times"
+    assert flight.stats["coalesced"] == 7
+    assert elapsed < 0.6, "followers are woken by the release notification, not by the timeout"
+    print(f"✓ 8 concurrent identical questions ran the pipeline once ({elapsed * 1000:.0f} ms)")
+
+def test_leader_crash_recovery():
+    cache = RedisCache(client=LeaseRedis(), l1_enabled=False)
+    flight = SingleFlight(cache, lease_ttl=0.3, poll_interval=0.05)
+
+    crashed = flight.acquire("Who wrote Dune?")
+    crashed._stop.set()  # the leader's process dies: no renewals, no release
+
+    start = time.perf_counter()
+    answer = _run(flight, cache, "Who wrote Dune?", lambda: "Frank Herbert")
+    elapsed = time.perf_counter() - start
+    assert answer == "Frank Herbert"
+    assert flight.stats["takeovers"] == 1
+    assert 0.2 < elapsed < 1.0
+    print(f"✓ Follower took over {elapsed * 1000:.0f} ms after the leader crashed")
+
+def test_renewal_keeps_slow_leader():
+    cache = RedisCache(client=LeaseRedis(), l1_enabled=False)
+    flight = SingleFlight(cache, lease_ttl=0.3, poll_interval=0.05)
+    lease = flight.acquire("slow question")
+    time.sleep(0.7)
+    assert flight.acquire("slow question") is None, "a live leader keeps renewing its lease"
+    lease.release()
+    assert flight.acquire("slow question") is not None
+    print("✓ Lease renewal keeps a slow but live leader in charge")
+
+def test_failed_leader_hands_over():
+    cache = RedisCache(client=LeaseRedis(), l1_enabled=False)
+    flight = SingleFlight(cache, lease_ttl=1.0, poll_interval=0.05)
+    calls = []
+
+    def pipeline():
+        calls.append(1)
+        time.sleep(0.1)
+        if len(calls) == 1:
+            return None  # first run produces no answer
+        return "42"
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        answers = list(pool.map(lambda _: _run(flight, cache, "meaning of life", pipeline), range(3)))
+    assert "42" in answers and len(calls) == 2
+    print("✓ When the leader produces no answer, one follower takes over")
+
+if __name__ == "__main__":
+    print("Testing single-flight coalescing...")
+    test_concurrent_requests_run_once()
+    test_leader_crash_recovery()
+    test_renewal_keeps_slow_leader()
+    test_failed_leader_hands_over()
+    print("\n✅ Single-flight coalescing works!")
@@ -0,0 +1,62 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+from src.rag.qdrant_handler import QdrantHandler
+from src.rag.sparse import BM25SparseEncoder, SPARSE_VECTOR_NAME, reciprocal_rank_fusion
+
+def test_sparse_encoder():
+    encoder = BM25SparseEncoder()
+
+    # Model names must survive tokenization as single terms
+    tokens = encoder.tokenize("What is GPT-4 and how does Llama-2.1 compare?")
+    assert "gpt-4" in tokens and "llama-2.1" in tokens
+    assert "what" not in tokens
+    print(f"✓ Tokens: {tokens}")
+
+    doc_indices, doc_values = encoder.encode_document("GPT-4 GPT-4 was released by OpenAI")
+    query_indices, _ = encoder.encode_query("gpt-4")
+    assert query_indices[0] in doc_indices
+    assert doc_indices == sorted(doc_indices)
+    assert max(doc_values) < encoder.k1 + 1  # BM25 term saturation
+    print("✓ Query terms map to the same sparse indices as documents")
+
+def test_reciprocal_rank_fusion():
+    dense = [("a", "A"), ("b", "B"), ("c", "C")]
+    sparse = [("c", "C"), ("a", "A"), ("d", "D")]
+
+    fused = reciprocal_rank_fusion([dense, sparse], limit=3)
+    keys = [key for key, _, _ in fused]
+    assert keys[0] == "a"  # ranked high in both lists
+    assert set(keys) == {"a", "c", "b"}
+    print(f"✓ RRF order: {keys}")
+
+def test_ingest_into_dense_only_collection():
+    handler = QdrantHandler.__new__(QdrantHandler)
+    handler.client = QdrantClient(":memory:")
+    # A collection created before hybrid search: one unnamed dense vector, no BM25
+    handler.client.create_collection("legacy", vectors_config=models.VectorParams(size=3, distance=models.Distance.COSINE))
+    texts = ["gpt-4 release notes", "banana bread"]
+    sparse = BM25SparseEncoder().encode_documents(texts)
+
+    handler.create_collection("legacy", vector_size=3)  # kept as is
+    assert not handler.has_sparse("legacy")
+    handler.add_documents("legacy", texts, [{} for _ in texts], [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], sparse)
+    assert handler.client.count("legacy").count == 2
+    print("✓ Dense-only collection ingests without its missing sparse vector")
+
+    handler.create_collection("legacy", vector_size=3, recreate=True)
+    assert handler.has_sparse("legacy") and handler.client.count("legacy").count == 0
+    handler.add_documents("legacy", texts, [{} for _ in texts], [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], sparse)
+    point = handler.client.retrieve("legacy", ids=[0], with_vectors=True)[0]
+    assert SPARSE_VECTOR_NAME in point.vector
+    print("✓ recreate=True adds the BM25 vector")
+
+if __name__ == "__main__":
+    print("Testing sparse retrieval helpers...")
+    test_sparse_encoder()
+    test_reciprocal_rank_fusion()
+    test_ingest_into_dense_only_collection()
+    print("\n✅ Sparse retrieval helpers work!")
@@ -0,0 +1,175 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+import time
+import json
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.cache import RedisCache
+from src.cache.redis_cache import decode_answer
+
+class ExpiringRedis:
+    """Dict-backed Redis with key expiry, enough for the answer tier."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+        self.ttls[key] = ttl
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def eval(self, script, numkeys, key, token, *args):
+        if self.data.get(key) == token:
+            del self.data[key]
+        return 1
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def pipeline(self, transaction=True):
+        redis, ops = self, []
+
+        class Pipeline:
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: ops.append((name, args, kwargs))
+
+            def execute(self):
+                return [getattr(redis, name)(*args, **kwargs) for name, args, kwargs in ops]
+
+        return Pipeline()
+
+def _cache() -> RedisCache:
+    return RedisCache(client=ExpiringRedis(), l1_enabled=False)
+
+def test_soft_and_hard_ttl():
+    cache = _cache()
+    cache.set_answer("What is RAG?", "Retrieval-augmented generation.", ttl=1)
+    key = cache._key("answer", "What is RAG?")
+    assert cache.client.ttls[key] == cache.ANSWER_HARD_TTL, "Redis keeps the entry until the hard TTL"
+
+    fresh = cache.get_answer_entry("What is RAG?")
+    assert not fresh.stale and cache.get_answer("What is RAG?") == fresh.answer
+
+    stale = decode_answer(cache.client.data[key], now=time.time() + 2)
+    assert stale.stale and stale.answer == "Retrieval-augmented generation."
+    print("✓ Entries are fresh until the soft TTL, stale until the hard TTL")
+
+    cache.set_web_answer("Latest LLM?", "Something new")
+    assert cache.client.ttls[cache._key("answer", "Latest LLM?")] == cache.WEB_DATA_HARD_TTL
+    print("✓ Web answers use the shorter web TTLs")
+
+def test_stale_entry_is_not_a_plain_hit():
+    cache = _cache()
+    cache.set_answer("Who wrote Dune?", "Frank Herbert", ttl=1)
+    time.sleep(1.05)
+    assert cache.get_answer("Who wrote Dune?") is None
+    entry = cache.get_answer_entry("Who wrote Dune?")
+    assert entry.stale and entry.answer == "Frank Herbert"
+    print("✓ get_answer treats stale entries as misses; get_answer_entry flags them")
+
+def test_legacy_plain_answers_are_fresh():
+    cache = _cache()
+    cache.client.data[cache._key("answer", "old question")] = "old answer".encode("utf-8")
+    assert cache.get_answer("old question") == "old answer"
+    print("✓ Answers cached before soft TTLs still read as fresh")
+
+def test_graph_serves_stale_and_refreshes_once():
+    from src.agents.graph import RAGGraph
+
+    calls = []
+    done = threading.Event()
+
+    class SlowApp:
+        def invoke(self, inputs):
+            calls.append(inputs["question"])
+            time.sleep(0.3)
+            done.set()
+            return {"question": inputs["question"], "final_answer": "Frank Herbert (1965)"}
+
+    graph = RAGGraph.__new__(RAGGraph)
+    graph.cache = _cache()
+    graph.semantic_cache = None
+    graph.single_flight = None
+    graph.app = SlowApp()
+    graph.refresher = ThreadPoolExecutor(max_workers=2)
+    graph._refreshing = set()
+    graph._refreshing_lock = threading.Lock()
+
+    graph.cache.set_answer("Who wrote Dune?", "Frank Herbert", ttl=1)
+    time.sleep(1.05)
+    start = time.perf_counter()
+    results = [graph.run("Who wrote Dune?") for _ in range(3)]
+    elapsed = time.perf_counter() - start
+    assert all(r["stale"] and r["final_answer"] == "Frank Herbert" for r in results)
+    assert elapsed < 0.2, "stale answers are returned without waiting for the refresh"
+
+    assert done.wait(2.0)
+    graph.refresher.shutdown(wait=True)
+    assert len(calls) == 1, "one background refresh per question"
+    refreshed = graph.run("Who wrote Dune?")
+    assert not refreshed["stale"] and refreshed["final_answer"] == "Frank Herbert (1965)"
+    print(f"✓ Stale answer served in {elapsed * 1000:.0f} ms for 3 requests, refreshed once in the background")
+
+def test_refresh_logs_to_its_own_run():
+    from src.agents.graph import RAGGraph
+    from src.observability import RAGTracker, tracker as tracker_module
+
+    tracker = RAGTracker(log_dir=tempfile.mkdtemp())
+    previous, tracker_module._tracker = tracker_module._tracker, tracker
+    foreground_started, refresh_logged = threading.Event(), threading.Event()
+
+    class LoggingApp:
+        def invoke(self, inputs):
+            foreground_started.wait(2.0)
+            tracker.log_generation("refreshed answer", tokens=7)
+            refresh_logged.set()
+            return {"question": inputs["question"], "final_answer": "refreshed answer"}
+
+    graph = RAGGraph.__new__(RAGGraph)
+    graph.cache = _cache()
+    graph.semantic_cache = None
+    graph.single_flight = None
+    graph.app = LoggingApp()
+    graph._refreshing = set()
+    graph._refreshing_lock = threading.Lock()
+    try:
+        refresh = threading.Thread(target=graph._refresh, args=("Who wrote Dune?", "key"))
+        refresh.start()
+        tracker.start_run("What is RAG?")  # a foreground request overlapping the refresh
+        foreground_started.set()
+        assert refresh_logged.wait(2.0)
+        tracker.log_generation("foreground answer", tokens=3)
+        foreground = tracker.end_run()
+        refresh.join(2.0)
+    finally:
+        tracker_module._tracker = previous
+
+    assert [step["answer"] for step in foreground["steps"]] == ["foreground answer"]
+    assert foreground["metrics"]["total_tokens"] == 3 and not foreground["refresh"]
+    runs = [json.load(open(f, encoding="utf-8")) for f in tracker.log_dir.glob("*.json")]
+    background = [r for r in runs if r["refresh"]]
+    assert len(runs) == 2 and len(background) == 1
+    assert background[0]["question"] == "Who wrote Dune?" and background[0]["metrics"]["total_tokens"] == 7
+    assert tracker.get_summary_stats()["total_runs"] == 1  # refreshes are not requests
+    print("✓ A background refresh logs to its own run, not the overlapping request's")
+
+if __name__ == "__main__":
+    print("Testing stale-while-revalidate answers...")
+    test_soft_and_hard_ttl()
+    test_stale_entry_is_not_a_plain_hit()
+    test_legacy_plain_answers_are_fresh()
+    test_graph_serves_stale_and_refreshes_once()
+    test_refresh_logs_to_its_own_run()
+    print("\n✅ Stale-while-revalidate works!")
@@ -0,0 +1,57 @@
+import sys
+import os
+sys.path.append(os.path.abspath('.'))
+
+import pickle
+import numpy as np
+from src.cache import RedisCache
+from src.cache.vector_codec import VectorFormatError, decode_vector, encode_vector
+
+def test_round_trip():
+    vector = np.random.default_rng(0).standard_normal(384).astype(np.float32)
+
+    data = encode_vector(vector, model_id="all-MiniLM-L6-v2", dtype="float32")
+    decoded, model_id = decode_vector(data)
+    assert model_id == "all-MiniLM-L6-v2"
+    assert decoded.dtype == np.float32 and np.array_equal(decoded, vector)
+    assert not decoded.flags.owndata  # a view over the Redis bytes, not a copy
+    print(f"✓ float32: {len(data)} bytes vs {len(pickle.dumps(vector.tolist()))} pickled")
+
+    half, _ = decode_vector(encode_vector(vector, dtype="float16"))
+    assert half.dtype == np.float16 and np.allclose(half, vector, atol=1e-2)
+    print(f"✓ float16: {len(encode_vector(vector, dtype='float16'))} bytes")
+
+class DictRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+def test_unencoded_values_are_misses():
+    for bad in (pickle.dumps([0.1, 0.2, 0.3]), b"garbage"):
+        try:
+            decode_vector(bad)
+            assert False, "expected the value to be rejected"
+        except VectorFormatError:
+            pass
+
+    redis = DictRedis()
+    cache = RedisCache(client=redis, l1_enabled=False)
+    redis.data[cache._key("vector", "old text")] = pickle.dumps([0.1, 0.2, 0.3])
+    assert cache.get_vector("old text") is None
+    assert cache.get_batch_vectors(["old text"]) == [None]
+    assert redis.data[cache._key("vector", "old text")] == pickle.dumps([0.1, 0.2, 0.3])  # nothing rewritten
+    print("✓ Pickled or garbage values read as misses and are never unpickled")
+
+if __name__ == "__main__":
+    print("Testing vector cache encoding...")
+    test_round_trip()
+    test_unencoded_values_are_misses()
+    print("\n✅ Vector cache encoding works!")